@@ -0,0 +1,371 @@
+# --- Imports ---
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+
+from sqlalchemy import DateTime, Float, Integer, and_, false, or_, select
+from sqlalchemy.orm import Session
+
+from ..models.transaction_model import TransactionModel
+from ..models.block_model import BlockModel
+from ..models.chain_head_model import ChainHeadModel
+from ..utils.id_generator import EPOCH_MS, SEQUENCE_BITS, WORKER_BITS
+
+# --- Optional dependency: pyarrow enables Arrow IPC and Parquet output (CSV works without it) ---
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# --- Output formats and their file extensions ---
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "arrow", "csv": "csv.gz"}
+
+# --- Transactions ingested more recently than this are left for the next run (ingested_at is set before commit) ---
+EXPORT_SETTLE_SECONDS = float(os.getenv("EXPORT_SETTLE_SECONDS", "5"))
+
+# --- File in the export directory holding the per-table watermarks ---
+WATERMARK_FILE = "_watermark.json"
+
+# --- Exported tables: columns in output order (the first DateTime column picks the partition) ---
+EXPORT_TABLES = {
+    "transactions": (
+        TransactionModel.id,
+        TransactionModel.uid,
+        TransactionModel.mid,
+        TransactionModel.amount,
+        TransactionModel.timestamp,
+        TransactionModel.ingested_at,
+    ),
+    "blockchain": (
+        BlockModel.shard,
+        BlockModel.height,
+        BlockModel.id,
+        BlockModel.transaction_id,
+        BlockModel.prev_hash,
+        BlockModel.timestamp,
+    ),
+}
+
+
+# --- Pick Parquet when pyarrow is installed, compact CSV otherwise ---
+def default_format() -> str:
+    return "parquet" if pa is not None else "csv"
+
+
+def check_format(fmt: str):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (choose from {', '.join(EXPORT_FORMATS)})")
+    if fmt != "csv" and pa is None:
+        raise ValueError(f"The '{fmt}' format needs pyarrow; install it or use --format csv")
+
+
+# --- Arrow schema matching a table's export columns ---
+def arrow_schema(table: str):
+    fields = []
+    for column in EXPORT_TABLES[table]:
+        if isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.key, arrow_type))
+    return pa.schema(fields)
+
+
+# --- Convert a chunk of row tuples into one Arrow record batch (column at a time) ---
+def to_record_batch(rows: list, schema):
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.record_batch([pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                           schema=schema)
+
+
+# --- Export window: rows after a watermark, up to a bound fixed before reading ---
+def export_window(db: Session, table: str, since: str | None,
+                  settle_seconds: float = EXPORT_SETTLE_SECONDS) -> tuple[object, str]:
+    """
+    Builds the query for one incremental export and the watermark that
+    follows it. The upper bound is taken before any row is read, so the
+    next export starts exactly where this one stops.
+
+    Watermarks are plain strings:
+        transactions: ISO-8601 ingestion time up to which rows were
+            exported. The bound is ingested_at, set by the database at
+            insert, so back-dated bulk imports and payments that commit
+            late are still picked up. The payment timestamp and ID do not
+            follow insertion order.
+        blockchain: "shard:height" pairs ("0:1200,1:987"). Heights only
+            grow within a shard, and a block is visible once its head is.
+
+    Args:
+        db (Session): DB session used to read the current bounds
+        table (str): "transactions" or "blockchain"
+        since (str | None): Watermark of the previous export (None = everything)
+        settle_seconds (float): Leave transactions younger than this for later
+
+    Returns:
+        tuple: (select ordered for streaming, watermark after this export)
+    """
+    columns = EXPORT_TABLES[table]
+
+    if table == "transactions":
+        until = datetime.now(timezone.utc) - timedelta(seconds=settle_seconds)
+        previous = parse_export_time(since) if since is not None else None
+        if previous is not None:
+            until = max(until, previous)    # Never move the watermark backwards
+        query = (
+            select(*columns)
+            .where(TransactionModel.ingested_at <= _db_time(db, until))
+            .order_by(TransactionModel.ingested_at, TransactionModel.id)
+        )
+        if previous is not None:
+            query = query.where(TransactionModel.ingested_at > _db_time(db, previous))
+        # "Z" rather than "+00:00", so the watermark can be passed back in a URL unescaped
+        return query, until.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+    previous = parse_heights(since)
+    heads = dict(db.execute(select(ChainHeadModel.shard, ChainHeadModel.height)).all())
+    heads = {shard: max(height, previous.get(shard, 0)) for shard, height in heads.items()}
+    ranges = [
+        and_(BlockModel.shard == shard, BlockModel.height > previous.get(shard, 0), BlockModel.height <= height)
+        for shard, height in sorted(heads.items()) if height > previous.get(shard, 0)
+    ]
+    query = (
+        select(*columns)
+        .where(or_(*ranges) if ranges else false())
+        .order_by(BlockModel.shard, BlockModel.height)
+    )
+    return query, ",".join(f"{shard}:{height}" for shard, height in sorted(heads.items()))
+
+
+# --- Parse a transactions watermark (older exports stored a generator ID; its time prefix is used) ---
+def parse_export_time(since: str) -> datetime:
+    try:
+        moment = datetime.fromisoformat(since)
+    except ValueError:
+        try:
+            created_ms = (int(since, 16) >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+        except ValueError:
+            raise ValueError(f"Invalid transactions watermark '{since}'")
+        # IDs at the watermark were not exported yet, so resume just before it
+        return datetime.fromtimestamp(created_ms / 1000, timezone.utc) - timedelta(microseconds=1)
+    return moment if moment.tzinfo is not None else moment.astimezone()
+
+
+# --- Bound comparable with ingested_at (SQLite stores the naive UTC wall clock) ---
+def _db_time(db: Session, moment: datetime) -> datetime:
+    if db.get_bind().dialect.name == "sqlite":
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+# --- Parse a blockchain watermark ("0:1200,1:987") into shard -> height ---
+def parse_heights(since: str | None) -> dict:
+    heights = {}
+    for pair in (since or "").split(","):
+        if not pair.strip():
+            continue
+        try:
+            shard, height = pair.split(":")
+            heights[int(shard)] = int(height)
+        except ValueError:
+            raise ValueError(f"Invalid blockchain watermark '{since}'")
+    return heights
+
+
+# --- Day partition of a row from its timestamp (UTC when the value is aware) ---
+def partition_key(value) -> str:
+    if value is None:
+        return "unknown"
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().isoformat()
+
+
+# --- One output file, written chunk by chunk and renamed into place when complete ---
+class PartitionWriter:
+    """
+    Writes Parquet (zstd), Arrow IPC file or gzip CSV. The file is built
+    under a .tmp name so readers globbing the partition never see a
+    half-written part.
+    """
+
+    def __init__(self, path: str, table: str, fmt: str):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.fmt = fmt
+        self.rows = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if fmt == "csv":
+            self.handle = gzip.open(self.tmp_path, "wt", newline="", compresslevel=6)
+            self.writer = csv.writer(self.handle)
+            self.writer.writerow([column.key for column in EXPORT_TABLES[table]])
+        else:
+            self.schema = arrow_schema(table)
+            if fmt == "parquet":
+                self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression="zstd")
+            else:
+                self.handle = pa.OSFile(self.tmp_path, "wb")
+                self.writer = pa_ipc.new_file(self.handle, self.schema)
+
+    def write(self, rows: list):
+        if self.fmt == "csv":
+            self.writer.writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+            )
+        else:
+            self.writer.write_batch(to_record_batch(rows, self.schema))
+        self.rows += len(rows)
+
+    def close(self, keep: bool = True):
+        if self.fmt == "parquet":
+            self.writer.close()
+        else:
+            if self.fmt == "arrow":
+                self.writer.close()
+            self.handle.close()
+        if keep:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+
+# --- Read / atomically replace the watermark file ---
+def load_watermarks(directory: str) -> dict:
+    path = os.path.join(directory, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_watermarks(directory: str, watermarks: dict):
+    path = os.path.join(directory, WATERMARK_FILE)
+    with open(path + ".tmp", "w") as handle:
+        json.dump(watermarks, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+# --- Incremental, day-partitioned export of the analytics tables into a directory ---
+def export_tables(db: Session, directory: str, tables: list[str] | None = None, fmt: str | None = None,
+                  chunk_rows: int = 50000, full: bool = False,
+                  settle_seconds: float = EXPORT_SETTLE_SECONDS) -> dict:
+    """
+    Streams each table through a server-side cursor in chunks of
+    `chunk_rows`, appending every chunk to the file of its day:
+        <directory>/<table>/date=YYYY-MM-DD/part-<run>.<ext>
+
+    Only rows after the table's watermark are read, and the watermark is
+    advanced once the table's files are in place. <run> is derived from
+    the starting watermark, so re-running an interrupted export overwrites
+    its partial parts instead of duplicating rows.
+
+    Args:
+        db (Session): DB session (read replica is fine)
+        directory (str): Export root (created if missing)
+        tables (list[str] | None): Tables to export (default: all)
+        fmt (str | None): "parquet", "arrow" or "csv" (default: parquet if pyarrow is installed)
+        chunk_rows (int): Rows fetched and written per chunk
+        full (bool): Ignore the stored watermarks and export everything again
+        settle_seconds (float): Leave transactions younger than this for the next run
+
+    Returns:
+        dict: Per table: rows written, partitions touched, old and new watermark
+    """
+    fmt = fmt or default_format()
+    check_format(fmt)
+    tables = tables or list(EXPORT_TABLES)
+    unknown = [table for table in tables if table not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown export table(s): {', '.join(unknown)}")
+
+    os.makedirs(directory, exist_ok=True)
+    if db.get_bind().dialect.name == "postgresql":
+        # Bounds and rows come from the same view of the database
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    watermarks = load_watermarks(directory)
+    summary = {}
+    for table in tables:
+        since = None if full else watermarks.get(table)
+        query, until = export_window(db, table, since, settle_seconds)
+        run = sha256(f"{table}|{since}".encode()).hexdigest()[:12]
+        timestamp_index = next(index for index, column in enumerate(EXPORT_TABLES[table])
+                               if isinstance(column.type, DateTime))
+
+        writers = {}
+        rows = 0
+        result = db.execute(query.execution_options(stream_results=True, yield_per=chunk_rows))
+        try:
+            for partition in result.partitions(chunk_rows):
+                by_day = {}
+                for row in partition:
+                    by_day.setdefault(partition_key(row[timestamp_index]), []).append(row)
+                for day, day_rows in by_day.items():
+                    if day not in writers:
+                        path = os.path.join(directory, table, f"date={day}", f"part-{run}.{EXPORT_FORMATS[fmt]}")
+                        writers[day] = PartitionWriter(path, table, fmt)
+                    writers[day].write(day_rows)
+                rows += len(partition)
+        except BaseException:
+            for writer in writers.values():
+                writer.close(keep=False)
+            raise
+        finally:
+            result.close()
+
+        for writer in writers.values():
+            writer.close()
+        watermarks[table] = until
+        save_watermarks(directory, watermarks)
+        summary[table] = {"rows": rows, "partitions": sorted(writers), "since": since, "until": until}
+
+    db.rollback()   # End the read transaction
+    return summary
+
+
+# --- Stream one table as Arrow IPC (stream format) or CSV bytes, chunk by chunk ---
+def stream_export(db: Session, query, table: str, fmt: str, chunk_rows: int = 10000):
+    """
+    Yields the encoded output of each chunk as soon as it is fetched, so
+    memory stays at one chunk however many rows the export covers.
+    Parquet needs its footer at the end of a seekable file, so only the
+    directory export writes it.
+    """
+    result = db.execute(query.execution_options(stream_results=True, yield_per=chunk_rows))
+    try:
+        if fmt == "arrow":
+            schema = arrow_schema(table)
+            buffer = io.BytesIO()
+            writer = pa_ipc.new_stream(buffer, schema)
+            for partition in result.partitions(chunk_rows):
+                writer.write_batch(to_record_batch(partition, schema))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            writer.close()
+            yield buffer.getvalue()
+        else:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow([column.key for column in EXPORT_TABLES[table]])
+            for partition in result.partitions(chunk_rows):
+                writer.writerows(
+                    [value.isoformat() if isinstance(value, datetime) else value for value in row]
+                    for row in partition
+                )
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue().encode()
+    finally:
+        result.close()
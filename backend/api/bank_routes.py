@@ -1,30 +1,63 @@
 # --- FastAPI and dependencies ---
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 from hashlib import sha256
 from datetime import datetime
 
 # --- Import LWC decryption function ---
-from encryption.lwc_speck import decrypt_speck
+from ..encryption.lwc_speck import decrypt_speck
+
+# --- PIN verification (bcrypt or legacy SHA-256 hashes) ---
+from ..encryption.password_context import verify_pin
+
+# --- Sealed batches from offline UPI machines ---
+from ..encryption.offline_batch import open_batch
 
 # --- Database session ---
 from ..database.database import get_db
 
 # --- Schema for request validation ---
 from ..schemas.transaction_request_schema import TransactionRequest
+from ..schemas.offline_batch_schema import OfflineBatchEnvelope, OfflineBatch
 
 # --- ORM Models ---
 from ..models.user_model import UserModel
 from ..models.merchant_model import MerchantModel
 from ..models.transaction_model import TransactionModel
-from ..models.block_model import BlockModel
+
+# --- Durable queue drained by the background block builder ---
+from ..blockchain.block_builder import enqueue_block
+
+# --- Profile cache (balances change on every payment) ---
+from ..cache.profile_cache import profile_cache
+
+# --- Time-ordered ID generator ---
+from ..utils.id_generator import next_id
+
+# --- Admission control (token buckets per MMID, merchant and client) ---
+from ..utils.rate_limiter import payment_limiter, client_identities
+
+# --- Settlement rollups ---
+from ..settlement.rollups import record_payment
+
+# --- Set-based settlement of offline batches ---
+from ..settlement.batch_payments import OFFLINE_BATCH_MAX_INTENTS, is_retryable_conflict, settle_offline_batch
 
 # --- Initialize router ---
 router = APIRouter(prefix="/bank", tags=["Bank"])
 
 # --- UPI Transaction Processor ---
 @router.post("/process-transaction/")
-def process_transaction(data: TransactionRequest, db: Session = Depends(get_db)):
+def process_transaction(data: TransactionRequest, request: Request, db: Session = Depends(get_db)):
+    # Step 0: Reject floods before any PIN hashing or DB work (429 + Retry-After)
+    payment_limiter.enforce({
+        "mmid": data.mmid,
+        "merchant": data.encrypted_mid,      # Deterministic per merchant, no decryption needed
+        **client_identities(request)
+    })
+
     # Step 1: Decrypt the encrypted MID from QR
     try:
         merchant_id = decrypt_speck(data.encrypted_mid)
@@ -42,9 +75,8 @@ def process_transaction(data: TransactionRequest, db: Session = Depends(get_db))
     if not matched_user:
         raise HTTPException(status_code=404, detail="User with MMID not found")
 
-    # Step 3: Validate PIN using SHA256 (consider bcrypt for production)
-    hashed_pin = sha256(data.pin.encode()).hexdigest()
-    if hashed_pin != matched_user.pin:
+    # Step 3: Validate PIN against its stored hash
+    if not verify_pin(data.pin, matched_user.pin):
         raise HTTPException(status_code=401, detail="Invalid PIN")
 
     # Step 4: Ensure user has enough balance
@@ -60,9 +92,9 @@ def process_transaction(data: TransactionRequest, db: Session = Depends(get_db))
     matched_user.balance -= data.amount
     merchant.balance += data.amount
 
-    # Step 7: Generate unique Transaction ID using SHA256
+    # Step 7: Generate unique, time-ordered Transaction ID
     now = datetime.now()
-    tid = sha256(f"{matched_user.id}{merchant.id}{now.timestamp()}".encode()).hexdigest()[:16]
+    tid = next_id()
 
     # --- Step 8: Create and store transaction record ---
     transaction = TransactionModel(
@@ -74,26 +106,19 @@ def process_transaction(data: TransactionRequest, db: Session = Depends(get_db))
     )
 
     db.add(transaction)
-    db.commit()  # Commit transaction so its ID exists before referencing in blockchain
-
-    # --- Step 9: Create Blockchain Block ---
-    # Fetch last block to get previous hash
-    last_block = db.query(BlockModel).order_by(BlockModel.timestamp.desc()).first()
-    prev_hash = last_block.id if last_block else "0"
-
-    # Generate current block hash
-    block_content = f"{tid}{prev_hash}{now.timestamp()}"
-    current_hash = sha256(block_content.encode()).hexdigest()
-
-    # Create block record
-    block = BlockModel(
-        id=current_hash,
-        transaction_id=tid,
-        prev_hash=prev_hash
-    )
 
-    db.add(block)
-    db.commit()  # Commit block separately
+    # --- Step 8b: Update merchant settlement rollups in the same DB transaction ---
+    record_payment(db, merchant.id, data.amount, now)
+
+    # --- Step 9: Queue the blockchain block in the same DB transaction ---
+    # The block builder appends it in the background, so ledger work stays off this response
+    enqueue_block(db, tid, now, merchant.id)     # Sharded ledgers route by merchant ID
+
+    db.commit()  # Money movement, rollups and the queued block commit together
+
+    # --- Step 8c: Invalidate cached profiles whose balances just changed ---
+    profile_cache.invalidate("user", matched_user.id)
+    profile_cache.invalidate("merchant", merchant.id)
 
     return {
         "message": "Transaction successful",
@@ -102,3 +127,50 @@ def process_transaction(data: TransactionRequest, db: Session = Depends(get_db))
         "to_merchant": merchant.id,
         "amount": data.amount
     }
+
+# --- Offline UPI machine sync: settle a sealed batch of queued payment intents ---
+@router.post("/process-batch/")
+def process_offline_batch(envelope: OfflineBatchEnvelope, request: Request, db: Session = Depends(get_db)):
+    # Step 0: One admission check per batch, keyed by the sealing terminal
+    payment_limiter.enforce({**client_identities(request), "terminal": envelope.terminal_id})
+
+    # Step 1: Decrypt and authenticate the batch with the terminal's derived key
+    try:
+        payload = open_batch(envelope.terminal_id, envelope.nonce, envelope.ciphertext)
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Offline batches are not enabled")
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Batch failed authentication")
+
+    # Step 2: Validate the decrypted contents
+    try:
+        batch = OfflineBatch(**payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    if len(batch.intents) > OFFLINE_BATCH_MAX_INTENTS:
+        raise HTTPException(status_code=413, detail=f"At most {OFFLINE_BATCH_MAX_INTENTS} intents per batch")
+
+    # Step 3: Resolve, verify and settle every new intent in one DB transaction
+    try:
+        outcome = settle_offline_batch(db, envelope.terminal_id, batch.intents)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Batch is already being processed; retry to get its results")
+    except OperationalError as e:
+        if not is_retryable_conflict(e):
+            raise
+        raise HTTPException(status_code=409, detail="Batch conflicted with concurrent payments; retry it")
+
+    # Step 4: Invalidate cached profiles whose balances just changed
+    for uid in outcome["users"]:
+        profile_cache.invalidate("user", uid)
+    for mid in outcome["merchants"]:
+        profile_cache.invalidate("merchant", mid)
+
+    results = outcome["results"]
+    return {
+        "batch_id": batch.batch_id,
+        "settled": sum(result["status"] == "settled" for result in results),
+        "rejected": sum(result["status"] == "rejected" for result in results),
+        "duplicates": sum(result["status"] == "duplicate" for result in results),
+        "results": results
+    }
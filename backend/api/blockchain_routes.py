@@ -1,42 +1,60 @@
 # --- FastAPI and dependencies ---
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+import orjson
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from hashlib import sha256
 
 # --- Local imports ---
-from ..database.database import get_db
+from ..database.database import get_db, get_read_db
 from ..models.block_model import BlockModel
 from ..schemas.block_schema import Block
+from ..models.chain_head_model import ChainHeadModel
+from ..blockchain.block_builder import queue_lag
+from ..blockchain.checkpoints import localize_tampering
+from ..blockchain.validation import validate_ledger
 
 router = APIRouter(prefix="/blockchain", tags=["Blockchain"])
 
-# --- Get entire blockchain ---
+# --- Columns returned by the blockchain list endpoint (same fields as the Block schema) ---
+BLOCK_LIST_COLUMNS = (
+    BlockModel.id,
+    BlockModel.shard,
+    BlockModel.height,
+    BlockModel.transaction_id,
+    BlockModel.prev_hash,
+    BlockModel.timestamp
+)
+
+# --- Get entire blockchain (shard by shard) ---
 @router.get("/", response_model=list[Block])
-def get_full_blockchain(db: Session = Depends(get_db)):
-    blocks = db.query(BlockModel).order_by(BlockModel.timestamp).all()
-    return blocks
-
-# --- Validate blockchain integrity ---
+def get_full_blockchain(db: Session = Depends(get_read_db)):
+    # --- Plain row tuples straight to orjson: no ORM objects, no per-row Pydantic validation ---
+    rows = db.execute(select(*BLOCK_LIST_COLUMNS).order_by(BlockModel.shard, BlockModel.height)).all()
+    keys = [column.key for column in BLOCK_LIST_COLUMNS]
+    body = orjson.dumps([dict(zip(keys, row)) for row in rows], option=orjson.OPT_UTC_Z)   # UTC as "Z", like Pydantic
+    return Response(body, media_type="application/json")
+
+# --- How far block creation trails committed payments ---
+@router.get("/lag")
+def get_blockchain_lag(db: Session = Depends(get_db)):
+    heights = dict(db.execute(select(ChainHeadModel.shard, ChainHeadModel.height).order_by(ChainHeadModel.shard)).all())
+    return {
+        "head_height": sum(heights.values()),       # Total blocks across shards
+        "shard_heights": heights,
+        **queue_lag(db)
+    }
+
+# --- Validate blockchain integrity (shards in parallel, then the global anchors) ---
 @router.get("/validate")
-def validate_blockchain(db: Session = Depends(get_db)):
-    blocks = db.query(BlockModel).order_by(BlockModel.timestamp).all()
-
-    if not blocks:
-        return {"valid": True, "message": "Blockchain is empty"}
-
-    for i in range(1, len(blocks)):
-        prev = blocks[i - 1]
-        curr = blocks[i]
-
-        # Recalculate expected hash of current block
-        expected_hash = sha256(
-            f"{curr.transaction_id}{prev.id}{curr.timestamp.timestamp()}".encode()
-        ).hexdigest()
-
-        if curr.id != expected_hash:
-            return {
-                "valid": False,
-                "message": f"Tampering detected at block {i} (ID: {curr.id})"
-            }
-
-    return {"valid": True, "message": "Blockchain is valid and untampered"}
+def validate_blockchain(
+    processes: bool | None = None,                 # Shards in worker processes / threads (default: processes if sharded)
+    workers: int | None = Query(None, ge=1),       # Parallel shard validations
+    db: Session = Depends(get_read_db)
+):
+    return validate_ledger(db, workers=workers, processes=processes)
+
+# --- Locate where tampering starts in a shard, checking checkpoints before individual blocks ---
+@router.get("/localize-tampering")
+def localize_blockchain_tampering(shard: int = 0, db: Session = Depends(get_read_db)):
+    return localize_tampering(db, shard)
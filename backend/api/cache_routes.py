@@ -0,0 +1,16 @@
+# --- FastAPI imports ---
+from fastapi import APIRouter
+
+# --- Local imports ---
+from ..cache.profile_cache import profile_cache
+
+# --- Initialize router for cache introspection ---
+router = APIRouter(
+    prefix="/cache",
+    tags=["Cache"]
+)
+
+# --- Hit/miss metrics of the profile cache (per worker) ---
+@router.get("/stats")
+def get_cache_stats():
+    return profile_cache.stats()
@@ -0,0 +1,42 @@
+# --- FastAPI and dependencies ---
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+# --- Local imports ---
+from ..database.database import get_read_db
+from ..analytics.export import EXPORT_TABLES, check_format, export_window, stream_export
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# --- Media types of the streamable formats (Parquet is only written by the CLI export) ---
+STREAM_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "csv": "text/csv",
+}
+
+# --- Stream a table in chunks for analytics, optionally only rows after a watermark ---
+@router.get("/{table}")
+def export_table(
+    table: str,
+    format: str = Query("csv"),                          # "arrow" (IPC stream) or "csv"
+    since: str | None = Query(None),                     # X-Export-Watermark of the previous export
+    chunk_rows: int = Query(10000, ge=100, le=100000),   # Rows fetched and encoded per chunk
+    db: Session = Depends(get_read_db)
+):
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export table '{table}'")
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Streaming exports support 'arrow' and 'csv'")
+    try:
+        check_format(format)
+        query, until = export_window(db, table, since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # --- Watermark is fixed before streaming starts, so it can go in the headers ---
+    return StreamingResponse(
+        stream_export(db, query, table, format, chunk_rows),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"X-Export-Watermark": until}
+    )
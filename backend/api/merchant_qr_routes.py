@@ -2,10 +2,6 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 
-# --- Local utilities ---
-from encryption.lwc_speck import encrypt_speck
-from utils.qr_generator import generate_qr_code, qr_image_to_base64
-
 # --- Create QR route group ---
 router = APIRouter(
     prefix="/merchant-qr",
@@ -15,6 +11,10 @@ router = APIRouter(
 # --- Generate QR from given MID ---
 @router.get("/{mid}")
 def generate_merchant_qr(mid: str):
+    # --- Heavy QR/crypto dependencies are imported on first use, not at startup ---
+    from ..encryption.lwc_speck import encrypt_speck
+    from ..utils.qr_generator import generate_qr_code, qr_image_to_base64
+
     try:
         encrypted_mid = encrypt_speck(mid)               # Step 1: Encrypt MID
         qr_img = generate_qr_code(encrypted_mid)         # Step 2: Generate QR image
@@ -1,15 +1,18 @@
 # --- FastAPI and typing imports ---
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from uuid import uuid4  # For generating unique IDs if needed (alternative to SHA256)
-from hashlib import sha256
 from datetime import datetime
 
 # --- Local project imports ---
 from ..models.merchant_model import MerchantModel
+from ..models.settlement_model import SettlementRollupModel
 from ..schemas.merchant_schema import MerchantCreate, Merchant, MerchantUpdate
-from ..database.database import get_db  # Dependency that provides DB session
-from passlib.context import CryptContext  # For password hashing
+from ..schemas.settlement_schema import Settlement
+from ..settlement.rollups import GRANULARITIES
+from ..database.database import get_db, get_read_db  # Primary / read-replica DB sessions
+from ..cache.profile_cache import profile_cache, profile_to_dict  # Read-through profile cache
+from ..utils.id_generator import next_id  # Time-ordered unique MIDs
+from ..encryption.password_context import get_pwd_context  # Lazily built bcrypt context
 
 # --- Initialize the router for merchant endpoints ---
 router = APIRouter(
@@ -17,17 +20,9 @@ router = APIRouter(
     tags=["Merchant"]
 )
 
-# --- Initialize a password hashing context (using bcrypt) ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # --- Utility function to hash password ---
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-# --- Generate unique Merchant ID using SHA256 hash ---
-def generate_merchant_id(name: str, password: str, created_at: datetime) -> str:
-    seed = f"{name}{password}{created_at.timestamp()}"
-    return sha256(seed.encode()).hexdigest()[:16]  # Take first 16 hex characters
+    return get_pwd_context().hash(password)
 
 # --- Create a new merchant ---
 @router.post("/", response_model=Merchant)
@@ -35,17 +30,12 @@ def create_merchant(merchant: MerchantCreate, db: Session = Depends(get_db)):
     # --- Generate creation timestamp ---
     created_at = datetime.now()
 
-    # --- Generate unique MID (16-character hex from SHA256) ---
-    mid = generate_merchant_id(merchant.name, merchant.password, created_at)
+    # --- Generate unique, time-ordered MID (16-character hex) ---
+    mid = next_id()
 
     # --- Hash the password before storing ---
     hashed_password = hash_password(merchant.password)
 
-    # --- Check if MID already exists (should be unique) ---
-    existing = db.query(MerchantModel).filter(MerchantModel.id == mid).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Merchant ID collision. Try again.")
-
     # --- Create the ORM merchant object ---
     db_merchant = MerchantModel(
         id=mid,
@@ -66,11 +56,40 @@ def create_merchant(merchant: MerchantCreate, db: Session = Depends(get_db)):
 # --- Get a merchant by ID ---
 @router.get("/{merchant_id}", response_model=Merchant)
 def get_merchant(merchant_id: str, db: Session = Depends(get_db)):
-    merchant = db.query(MerchantModel).filter(MerchantModel.id == merchant_id).first()
+    # --- Served from the profile cache, loading from the DB on a miss ---
+    def load_merchant():
+        merchant = db.query(MerchantModel).filter(MerchantModel.id == merchant_id).first()
+        return profile_to_dict(merchant, Merchant) if merchant else None
+
+    merchant = profile_cache.get_or_load("merchant", merchant_id, load_merchant)
     if not merchant:
         raise HTTPException(status_code=404, detail="Merchant not found")
     return merchant
 
+# --- Get hourly/daily settlement totals for a merchant (served from rollups) ---
+@router.get("/{merchant_id}/settlements", response_model=list[Settlement])
+def get_merchant_settlements(
+    merchant_id: str,
+    granularity: str = "day",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    db: Session = Depends(get_read_db)
+):
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    # --- Reads only the rollup buckets, never the transactions table ---
+    query = db.query(SettlementRollupModel).filter(
+        SettlementRollupModel.mid == merchant_id,
+        SettlementRollupModel.granularity == granularity
+    )
+    if start is not None:
+        query = query.filter(SettlementRollupModel.bucket_start >= start)
+    if end is not None:
+        query = query.filter(SettlementRollupModel.bucket_start < end)
+
+    return query.order_by(SettlementRollupModel.bucket_start).all()
+
 # --- Update merchant details ---
 @router.put("/{merchant_id}", response_model=Merchant)
 def update_merchant(merchant_id: str, updates: MerchantUpdate, db: Session = Depends(get_db)):
@@ -89,6 +108,7 @@ def update_merchant(merchant_id: str, updates: MerchantUpdate, db: Session = Dep
         merchant.password = hash_password(updates.password)
 
     db.commit()
+    profile_cache.invalidate("merchant", merchant_id)   # Drop the stale cached profile
     db.refresh(merchant)
     return merchant
 
@@ -101,4 +121,5 @@ def delete_merchant(merchant_id: str, db: Session = Depends(get_db)):
 
     db.delete(merchant)
     db.commit()
+    profile_cache.invalidate("merchant", merchant_id)
     return {"detail": "Merchant deleted successfully"}
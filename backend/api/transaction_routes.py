@@ -1,13 +1,19 @@
 # --- FastAPI imports for routing and dependency injection ---
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool   # Runs blocking DB work off the event loop
+from fastapi.responses import Response
+import orjson                                       # Fast JSON parsing/encoding for bulk bodies and large lists
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
-from hashlib import sha256                     # For generating unique transaction IDs
 from datetime import datetime                  # To generate timestamp for each transaction
 
 # --- Local imports (relative paths) ---
-from ..database.database import get_db         # Dependency to get DB session
+from ..database.database import get_db, get_read_db  # Primary / read-replica DB sessions
 from ..models.transaction_model import TransactionModel  # SQLAlchemy ORM model
-from ..schemas.transaction_schema import TransactionCreate, Transaction  # Pydantic schemas
+from ..schemas.transaction_schema import TransactionCreate, Transaction, TransactionBulkRecord  # Pydantic schemas
+from ..settlement.rollups import record_payment, record_payments  # Keeps merchant settlement rollups in sync
+from ..utils.id_generator import next_id                # Time-ordered unique transaction IDs
 
 # --- Initialize API router with prefix and tags for grouping in docs ---
 router = APIRouter(
@@ -15,11 +21,6 @@ router = APIRouter(
     tags=["Transactions"]                      # Group label in Swagger UI
 )
 
-# --- Utility function to generate a SHA256-based unique transaction ID ---
-def generate_transaction_id(uid: str, mid: str, amount: float, timestamp: datetime) -> str:
-    seed = f"{uid}{mid}{amount}{timestamp.timestamp()}"     # Combine core transaction fields
-    return sha256(seed.encode()).hexdigest()[:16]            # Return first 16 hex chars
-
 # --- Route to create a new transaction ---
 @router.post("/", response_model=Transaction)
 def create_transaction(
@@ -27,20 +28,7 @@ def create_transaction(
     db: Session = Depends(get_db)                          # DB session injected via dependency
 ):
     now = datetime.now()                                   # Generate current timestamp
-    tid = generate_transaction_id(                         # Generate transaction ID
-        transaction.uid,
-        transaction.mid,
-        transaction.amount,
-        now
-    )
-
-    # --- Check for rare collision of transaction ID ---
-    existing = db.query(TransactionModel).filter(TransactionModel.id == tid).first()
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail="Transaction ID conflict. Try again."
-        )
+    tid = next_id()                                        # Unique by construction, no collision lookup needed
 
     # --- Construct a TransactionModel instance with the data ---
     db_transaction = TransactionModel(
@@ -53,16 +41,200 @@ def create_transaction(
 
     # --- Add transaction to database and persist ---
     db.add(db_transaction)
+    record_payment(db, transaction.mid, transaction.amount, now)   # Same commit as the row
     db.commit()
     db.refresh(db_transaction)   # Refresh to return updated DB object
 
     return db_transaction        # Response will match the Transaction Pydantic schema
 
+# --- INSERT for bulk imports that skips IDs already present, if the dialect supports it ---
+def _insert_new_statement(dialect_name: str):
+    table = TransactionModel.__table__
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(table).on_conflict_do_nothing(index_elements=["id"]).returning(table.c.id)
+
+
+# --- Insert rows and their rollups (caller owns the commit); returns the IDs actually inserted ---
+def _insert_rows(db: Session, rows: list[dict]) -> set[str]:
+    statement = _insert_new_statement(db.get_bind().dialect.name)
+    if statement is not None:
+        inserted = set(db.execute(statement, rows).scalars())
+    else:
+        ids = [row["id"] for row in rows]
+        existing = set(db.scalars(select(TransactionModel.id).where(TransactionModel.id.in_(ids))))
+        rows = [row for row in rows if row["id"] not in existing]
+        if rows:
+            db.execute(insert(TransactionModel.__table__), rows)   # Core insert: no ORM bookkeeping per row
+        inserted = {row["id"] for row in rows}
+
+    record_payments(db, [(row["mid"], row["amount"], row["timestamp"]) for row in rows if row["id"] in inserted])
+    return inserted
+
+
+# --- Insert one chunk of a bulk import with a single commit ---
+def insert_transaction_chunk(db: Session, chunk: list[tuple[int, object]]) -> list[dict]:
+    """
+    Validates and inserts one chunk of bulk-import records.
+
+    A record carrying a partner transaction ID that already exists (or
+    repeats within the chunk) is reported as a duplicate and skipped, so a
+    reconciliation file can be re-imported safely. If the database still
+    rejects the chunk, it is retried one record per commit so only the
+    offending records are rejected.
+
+    Args:
+        db (Session): Active DB session
+        chunk (list[tuple[int, object]]): (index in the import, parsed JSON record)
+
+    Returns:
+        list[dict]: One result per record, with its index and status
+    """
+    results = []
+    rows = []
+    indexes = {}                                  # Transaction ID -> index of the record that claimed it
+    now = datetime.now()
+
+    # --- Validate records and assign IDs ---
+    for index, raw in chunk:
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError("Record must be a JSON object")
+            record = TransactionBulkRecord(**raw)
+        except Exception as e:
+            results.append({"index": index, "status": "rejected", "detail": str(e)})
+            continue
+
+        tid = record.id or next_id()
+        if tid in indexes:
+            results.append({"index": index, "status": "duplicate", "transaction_id": tid,
+                            "detail": f"Same transaction ID as record {indexes[tid]}"})
+            continue
+        indexes[tid] = index
+        rows.append({
+            "id": tid,
+            "uid": record.uid,
+            "mid": record.mid,
+            "amount": record.amount,
+            "timestamp": record.timestamp or now
+        })
+
+    if not rows:
+        return results
+
+    # --- Bulk insert the chunk and update rollups in the same commit ---
+    try:
+        inserted = _insert_rows(db, rows)
+        db.commit()
+    except DBAPIError:
+        db.rollback()
+        inserted = set()
+        # --- Isolate the bad records: one commit per record ---
+        for row in rows:
+            try:
+                inserted |= _insert_rows(db, [row])
+                db.commit()
+            except DBAPIError as e:
+                db.rollback()
+                results.append({"index": indexes.pop(row["id"]), "status": "rejected",
+                                "detail": f"Insert failed: {e.orig}"})
+
+    for row in rows:
+        if row["id"] not in indexes:
+            continue
+        if row["id"] in inserted:
+            results.append({"index": indexes[row["id"]], "status": "created", "transaction_id": row["id"]})
+        else:
+            results.append({"index": indexes[row["id"]], "status": "duplicate", "transaction_id": row["id"],
+                            "detail": "Transaction ID already exists"})
+    return results
+
+# --- Route to bulk-import transactions (JSON array or NDJSON stream) ---
+@router.post("/bulk")
+async def create_transactions_bulk(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=10000),       # Records inserted per commit
+    db: Session = Depends(get_db)
+):
+    results = []
+    chunk = []
+
+    async def flush():
+        results.extend(await run_in_threadpool(insert_transaction_chunk, db, chunk[:]))
+        chunk.clear()
+
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        # --- NDJSON: parse line by line as the body streams in ---
+        index = 0
+        buffer = b""
+        async for piece in request.stream():
+            buffer += piece
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    chunk.append((index, orjson.loads(line)))
+                except ValueError as e:
+                    results.append({"index": index, "status": "rejected", "detail": f"Invalid JSON: {e}"})
+                index += 1
+                if len(chunk) >= chunk_size:
+                    await flush()
+        if buffer.strip():
+            try:
+                chunk.append((index, orjson.loads(buffer)))
+            except ValueError as e:
+                results.append({"index": index, "status": "rejected", "detail": f"Invalid JSON: {e}"})
+    else:
+        # --- JSON array body ---
+        try:
+            records = orjson.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON stream")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON stream")
+        for index, raw in enumerate(records):
+            chunk.append((index, raw))
+            if len(chunk) >= chunk_size:
+                await flush()
+
+    if chunk:
+        await flush()
+
+    results.sort(key=lambda result: result["index"])
+    created = sum(1 for result in results if result["status"] == "created")
+    duplicates = sum(1 for result in results if result["status"] == "duplicate")
+    body = orjson.dumps({                          # Skips jsonable_encoder, which walks every result dict
+        "received": len(results),
+        "created": created,
+        "duplicates": duplicates,
+        "rejected": len(results) - created - duplicates,
+        "results": results
+    })
+    return Response(body, media_type="application/json")
+
+# --- Columns returned by the transaction list endpoint (same fields as the Transaction schema) ---
+TRANSACTION_LIST_COLUMNS = (
+    TransactionModel.id,
+    TransactionModel.uid,
+    TransactionModel.mid,
+    TransactionModel.amount,
+    TransactionModel.timestamp
+)
+
 # --- Route to fetch all transactions ---
 @router.get("/", response_model=list[Transaction])
-def get_all_transactions(db: Session = Depends(get_db)):
-    transactions = db.query(TransactionModel).all()         # Fetch all rows from DB
-    return transactions                                     # Return list of transactions
+def get_all_transactions(db: Session = Depends(get_read_db)):
+    # --- Plain row tuples straight to orjson: no ORM objects, no per-row Pydantic validation ---
+    rows = db.execute(select(*TRANSACTION_LIST_COLUMNS)).all()
+    keys = [column.key for column in TRANSACTION_LIST_COLUMNS]
+    body = orjson.dumps([dict(zip(keys, row)) for row in rows], option=orjson.OPT_UTC_Z)   # UTC as "Z", like Pydantic
+    return Response(body, media_type="application/json")
 
 # --- Route to fetch a single transaction by its ID ---
 @router.get("/{transaction_id}", response_model=Transaction)
@@ -1,11 +1,8 @@
 # --- FastAPI imports for handling file uploads ---
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 
-# --- PIL for image handling ---
-from PIL import Image
-
-# --- Local utility to decode and decrypt QR ---
-from ..utils.qr_scanner import scan_qr_and_decrypt
+# --- Admission control (token buckets per client/terminal) ---
+from ..utils.rate_limiter import scan_limiter, client_identities
 
 # --- Define router for UPI machine-related routes ---
 router = APIRouter(
@@ -15,7 +12,14 @@ router = APIRouter(
 
 # --- Endpoint to accept QR image and return decrypted Merchant ID ---
 @router.post("/scan-qr/")
-async def scan_merchant_qr(file: UploadFile = File(...)):
+async def scan_merchant_qr(request: Request, file: UploadFile = File(...)):
+    # --- Reject floods before decoding the image (429 + Retry-After) ---
+    scan_limiter.enforce(client_identities(request))
+
+    # --- PIL and pyzbar are imported on first use, not at startup ---
+    from PIL import Image
+    from ..utils.qr_scanner import scan_qr_and_decrypt
+
     try:
         # Load uploaded file as image
         image = Image.open(file.file)
@@ -3,8 +3,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from hashlib import sha256
 
-# --- Password hashing ---
-from passlib.context import CryptContext
+# --- Password hashing (bcrypt context is built on first use) ---
+from ..encryption.password_context import get_pwd_context
 
 # --- Pydantic schemas ---
 from ..schemas.user_schema import UserCreate, User, UserUpdate
@@ -12,11 +12,14 @@ from ..schemas.user_schema import UserCreate, User, UserUpdate
 # --- SQLAlchemy model ---
 from ..models.user_model import UserModel
 
+# --- Time-ordered ID generator ---
+from ..utils.id_generator import next_id
+
 # --- DB session provider ---
 from ..database.database import get_db
 
-# --- Initialize password context using bcrypt ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# --- Profile cache ---
+from ..cache.profile_cache import profile_cache, profile_to_dict
 
 # --- Initialize router for user routes ---
 router = APIRouter(
@@ -26,12 +29,7 @@ router = APIRouter(
 
 # --- Utility to hash passwords and PINs securely ---
 def hash_secret(secret: str) -> str:
-    return pwd_context.hash(secret)
-
-# --- Utility to generate UID (User ID) as 16-digit hex string ---
-def generate_uid(name: str, password: str, timestamp: float) -> str:
-    seed = f"{name}{password}{timestamp}"
-    return sha256(seed.encode()).hexdigest()[:16]
+    return get_pwd_context().hash(secret)
 
 # --- Utility to generate MMID (Mobile Money Identifier) ---
 def generate_mmid(uid: str, mobile_number: str) -> str:
@@ -46,10 +44,8 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     if existing_user:
         raise HTTPException(status_code=400, detail="Mobile number already registered.")
 
-    # --- Generate UID using hashed inputs and current time ---
-    from time import time
-    timestamp = time()
-    uid = generate_uid(user.name, user.password, timestamp)
+    # --- Generate unique, time-ordered UID (16-digit hex string) ---
+    uid = next_id()
 
     # --- Hash password and pin before storing ---
     hashed_password = hash_secret(user.password)
@@ -76,7 +72,12 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
 # --- Get user details by UID ---
 @router.get("/{user_id}", response_model=User)
 def get_user_by_id(user_id: str, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    # --- Served from the profile cache, loading from the DB on a miss ---
+    def load_user():
+        user = db.query(UserModel).filter(UserModel.id == user_id).first()
+        return profile_to_dict(user, User) if user else None
+
+    user = profile_cache.get_or_load("user", user_id, load_user)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
     return user
@@ -103,5 +104,6 @@ def update_user(user_id: str, updates: UserUpdate, db: Session = Depends(get_db)
         user.pin = hash_secret(updates.pin)
 
     db.commit()
+    profile_cache.invalidate("user", user_id)   # Drop the stale cached profile
     db.refresh(user)
     return user
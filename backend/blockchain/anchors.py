@@ -0,0 +1,110 @@
+# --- Imports ---
+import json
+from datetime import datetime
+from hashlib import sha256
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.anchor_model import AnchorModel
+from ..models.block_model import BlockModel
+from ..models.chain_head_model import ChainHeadModel
+from .chain_writer import GENESIS_PREV_HASH
+
+
+# --- Root hash of an anchor: previous root plus every shard head ---
+def anchor_root(prev_root: str, heads: list[list]) -> str:
+    """
+    Args:
+        prev_root (str): Root hash of the previous anchor ("0" for the first)
+        heads (list): [shard, height, head_hash] entries sorted by shard
+    """
+    covered = "|".join(f"{shard}:{height}:{head_hash}" for shard, height, head_hash in heads)
+    return sha256(f"{prev_root}|{covered}".encode()).hexdigest()
+
+
+# --- Anchor the current shard heads into a new global root block ---
+def write_anchor(db: Session) -> AnchorModel | None:
+    """
+    Records one anchor over the committed head of every shard. Heads are
+    read without locks: each is a state its shard really had, so shards
+    keep appending while the anchor is taken.
+
+    Returns:
+        AnchorModel | None: The new anchor, or None if no head moved since
+                            the last one (or another worker anchored first)
+    """
+    heads = [
+        [row.shard, row.height, row.head_hash]
+        for row in db.execute(
+            select(ChainHeadModel.shard, ChainHeadModel.height, ChainHeadModel.head_hash).order_by(ChainHeadModel.shard)
+        )
+    ]
+    last = db.execute(select(AnchorModel).order_by(AnchorModel.height.desc()).limit(1)).scalar_one_or_none()
+    if not heads or (last is not None and json.loads(last.heads) == heads):
+        db.rollback()
+        return None
+
+    prev_root = last.root_hash if last else GENESIS_PREV_HASH
+    anchor = AnchorModel(
+        height=last.height + 1 if last else 1,
+        root_hash=anchor_root(prev_root, heads),
+        prev_root=prev_root,
+        heads=json.dumps(heads, separators=(",", ":")),
+        timestamp=datetime.now()
+    )
+    try:
+        db.add(anchor)
+        db.commit()
+    except IntegrityError:
+        db.rollback()       # Another worker took this anchor height
+        return None
+    return anchor
+
+
+# --- Check the anchor chain and that every anchored head is still in its shard ---
+def validate_anchors(db: Session) -> dict:
+    """
+    Returns:
+        dict: valid flag, message and number of anchors checked
+    """
+    anchors = db.execute(
+        select(AnchorModel.height, AnchorModel.root_hash, AnchorModel.prev_root, AnchorModel.heads)
+        .order_by(AnchorModel.height)
+    ).all()
+
+    prev_root = GENESIS_PREV_HASH
+    pinned = {}                 # (shard, height) -> anchored head hash
+    last_heights = {}
+    for anchor in anchors:
+        try:
+            heads = json.loads(anchor.heads)
+        except ValueError:
+            heads = None
+        if heads is None or anchor.prev_root != prev_root or anchor.root_hash != anchor_root(anchor.prev_root, heads):
+            return {"valid": False, "message": f"Anchor {anchor.height} has been altered", "anchors": len(anchors)}
+        for shard, height, head_hash in heads:
+            if height < last_heights.get(shard, 0):
+                return {"valid": False, "message": f"Anchor {anchor.height} moves shard {shard} backwards",
+                        "anchors": len(anchors)}
+            last_heights[shard] = height
+            if height:
+                pinned[(shard, height)] = head_hash
+        prev_root = anchor.root_hash
+
+    # --- Anchored heads must still be the blocks stored at those heights ---
+    for shard in sorted({shard for shard, _ in pinned}):
+        heights = [height for pinned_shard, height in pinned if pinned_shard == shard]
+        stored = {}
+        for start in range(0, len(heights), 500):
+            stored.update(db.execute(
+                select(BlockModel.height, BlockModel.id)
+                .where(BlockModel.shard == shard, BlockModel.height.in_(heights[start:start + 500]))
+            ).all())
+        for height in sorted(heights):
+            if stored.get(height) != pinned[(shard, height)]:
+                return {"valid": False, "message": f"Shard {shard} block {height} differs from its anchored head",
+                        "anchors": len(anchors)}
+
+    return {"valid": True, "message": "Anchors are intact", "anchors": len(anchors)}
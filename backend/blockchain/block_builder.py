@@ -0,0 +1,212 @@
+# --- Imports ---
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..database.database import SessionLocal
+from ..models.transaction_model import TransactionModel  # noqa: F401 (resolves the queue/block foreign keys)
+from ..models.ledger_queue_model import LedgerQueueModel
+from ..models.chain_head_model import ChainHeadModel
+from .anchors import write_anchor
+from .chain_writer import lock_head, write_blocks
+from .sharding import LEDGER_ANCHOR_SECONDS, LEDGER_SHARDS, shard_for_merchant
+
+logger = logging.getLogger(__name__)
+
+# --- Builder settings (from environment, with safe defaults) ---
+BLOCK_BUILDER_ENABLED = os.getenv("BLOCK_BUILDER_ENABLED", "1") == "1"    # Run the in-process builder thread
+BLOCK_BUILDER_BATCH_SIZE = int(os.getenv("BLOCK_BUILDER_BATCH_SIZE", "500"))
+BLOCK_BUILDER_POLL_SECONDS = float(os.getenv("BLOCK_BUILDER_POLL_SECONDS", "0.5"))
+BLOCK_BUILDER_DISCOVERY_SECONDS = float(os.getenv("BLOCK_BUILDER_DISCOVERY_SECONDS", "10"))   # Re-check for new shards
+
+
+# --- Queue a transaction for block creation inside the payment's DB transaction ---
+def enqueue_block(db: Session, transaction_id: str, timestamp: datetime, mid: str | None = None) -> None:
+    db.add(LedgerQueueModel(transaction_id=transaction_id, timestamp=timestamp, shard=shard_for_merchant(mid)))
+
+
+# --- Queue many transactions in one multi-row insert: (transaction_id, timestamp, mid) tuples ---
+def enqueue_blocks(db: Session, entries: list[tuple[str, datetime, str | None]]) -> None:
+    if entries:
+        db.execute(insert(LedgerQueueModel), [
+            {"transaction_id": transaction_id, "timestamp": timestamp, "shard": shard_for_merchant(mid)}
+            for transaction_id, timestamp, mid in entries
+        ])
+
+
+# --- Turn up to `batch_size` queued transactions of one shard into blocks ---
+def drain_once(db: Session, batch_size: int = BLOCK_BUILDER_BATCH_SIZE, shard: int = 0) -> int:
+    """
+    Appends blocks for the shard's oldest queued transactions and removes
+    them from the queue in the same DB transaction.
+
+    Returns:
+        int: Number of blocks appended
+    """
+    # --- Cheap unlocked check so idle polls never take the chain lock ---
+    if db.execute(select(LedgerQueueModel.seq).where(LedgerQueueModel.shard == shard).limit(1)).first() is None:
+        db.rollback()
+        return 0
+
+    try:
+        # The shard's chain-head lock also serializes its drainers, so each queued row is taken once
+        tip = lock_head(db, shard)
+        pending = db.execute(
+            select(LedgerQueueModel.seq, LedgerQueueModel.transaction_id, LedgerQueueModel.timestamp)
+            .where(LedgerQueueModel.shard == shard)
+            .order_by(LedgerQueueModel.seq)
+            .limit(batch_size)
+        ).all()
+        if not pending:
+            db.rollback()
+            return 0
+
+        write_blocks(db, tip, [(row.transaction_id, row.timestamp) for row in pending], shard)
+        db.execute(delete(LedgerQueueModel).where(LedgerQueueModel.seq.in_([row.seq for row in pending])))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(pending)
+
+
+# --- Every shard that has queued rows or a chain, plus the configured ones ---
+# Rows can sit in shards >= LEDGER_SHARDS after the setting is lowered, or when workers disagree on it.
+def active_shards(db: Session) -> list[int]:
+    queued = db.execute(select(LedgerQueueModel.shard).distinct()).scalars().all()
+    heads = db.execute(select(ChainHeadModel.shard)).scalars().all()
+    return sorted(set(range(LEDGER_SHARDS)) | set(queued) | set(heads))
+
+
+# --- Queue depth and age of the oldest pending transaction ---
+def queue_lag(db: Session) -> dict:
+    depth, oldest = db.execute(
+        select(func.count(LedgerQueueModel.seq), func.min(LedgerQueueModel.timestamp))
+    ).one()
+    # Compare instants in UTC: PostgreSQL returns the session time zone, SQLite the naive local time payments wrote
+    oldest_age = (datetime.now(timezone.utc) - oldest.astimezone(timezone.utc)).total_seconds() if oldest else 0.0
+    return {"pending_blocks": depth, "oldest_pending_age_seconds": max(oldest_age, 0.0)}
+
+
+# --- Background threads that keep draining the queue ---
+class BlockBuilder:
+    """
+    Drains the ledger queue in batches off the payment response path, one
+    thread per shard so shards append independently, and periodically
+    anchors the shard heads when the ledger is sharded. Safe to run in
+    every worker: drainers serialize on each shard's chain head.
+
+    Without an explicit shard list it drains every shard found in the
+    queue or chain_head, and keeps looking for new ones, so rows queued
+    under a different LEDGER_SHARDS are never stranded.
+    """
+
+    def __init__(self, batch_size=BLOCK_BUILDER_BATCH_SIZE, poll_seconds=BLOCK_BUILDER_POLL_SECONDS,
+                 shards=None, anchor_seconds=LEDGER_ANCHOR_SECONDS):
+        """
+        Args:
+            batch_size (int): Max blocks appended per DB transaction
+            poll_seconds (float): Sleep between polls while the queue is empty
+            shards (list | None): Shards this builder drains (default: every active shard)
+            anchor_seconds (float): Interval between global anchors (0 = never;
+                only used when LEDGER_SHARDS > 1)
+        """
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.discover = shards is None
+        self.shards = list(range(LEDGER_SHARDS)) if shards is None else list(shards)
+        self.anchor_seconds = anchor_seconds if LEDGER_SHARDS > 1 else 0
+        self._stop = threading.Event()
+        self._threads = []
+
+    def drain_shard(self, shard):
+        """
+        Polls and drains one shard until stop() is called.
+        """
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                # Keep draining while full batches come back
+                while not self._stop.is_set() and drain_once(db, self.batch_size, shard) == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Block builder batch failed for shard %s; retrying", shard)
+            finally:
+                db.close()
+            self._stop.wait(self.poll_seconds)
+
+    def anchor_periodically(self):
+        """
+        Anchors the shard heads every anchor_seconds until stop() is called.
+        """
+        while not self._stop.wait(self.anchor_seconds):
+            db = SessionLocal()
+            try:
+                write_anchor(db)
+            except Exception:
+                logger.exception("Ledger anchoring failed; retrying")
+            finally:
+                db.close()
+
+    def find_new_shards(self) -> list[int]:
+        """
+        Returns active shards that are not drained yet (none with an explicit shard list).
+        """
+        if not self.discover:
+            return []
+        db = SessionLocal()
+        try:
+            return [shard for shard in active_shards(db) if shard not in self.shards]
+        finally:
+            db.close()
+
+    def watch_shards(self):
+        """
+        Starts a drainer for every new shard, right away and then every
+        BLOCK_BUILDER_DISCOVERY_SECONDS, until stop() is called.
+        """
+        while not self._stop.is_set():
+            try:
+                for shard in self.find_new_shards():
+                    logger.info("Block builder found queued or chained shard %s; draining it", shard)
+                    self._start_drainers([shard])
+            except Exception:
+                logger.exception("Shard discovery failed; retrying")
+            self._stop.wait(BLOCK_BUILDER_DISCOVERY_SECONDS)
+
+    def _start_drainers(self, shards):
+        for shard in shards:
+            self.shards.append(shard)
+            thread = threading.Thread(target=self.drain_shard, args=(shard,), name=f"block-builder-{shard}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def start(self):
+        self._stop.clear()
+        shards, self.shards, self._threads = self.shards, [], []
+        self._start_drainers(shards)
+        helpers = []
+        if self.discover:
+            helpers.append(threading.Thread(target=self.watch_shards, name="block-builder-discovery", daemon=True))
+        if self.anchor_seconds > 0:
+            helpers.append(threading.Thread(target=self.anchor_periodically, name="ledger-anchor", daemon=True))
+        for thread in helpers:
+            self._threads.append(thread)
+            thread.start()
+
+    def run_until_stopped(self):
+        """
+        Runs the builder threads and blocks until stop() is called.
+        """
+        self.start()
+        while not self._stop.wait(1.0):
+            pass
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        for thread in list(self._threads):
+            thread.join(timeout)
@@ -0,0 +1,234 @@
+# --- Imports ---
+import hmac
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.block_model import BlockModel
+from ..models.chain_head_model import ChainHeadModel
+from ..models.checkpoint_model import CheckpointModel
+
+# --- prev_hash / prev_digest of the first block ---
+GENESIS_PREV_HASH = "0"
+GENESIS_PREV_DIGEST = bytes(32)
+
+# --- Binary block preimage: 16-char transaction ID, raw parent digest, big-endian int64 microseconds ---
+BLOCK_PREIMAGE = struct.Struct(">16s32sq")
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NAIVE_UNIX_EPOCH = datetime(1970, 1, 1)        # Naive stored block times are UTC wall clock
+MICROSECOND = timedelta(microseconds=1)
+
+# --- Pin the block hash every K blocks; with a key, checkpoints cannot be forged without it ---
+LEDGER_CHECKPOINT_INTERVAL = int(os.getenv("LEDGER_CHECKPOINT_INTERVAL", "1000"))
+LEDGER_CHECKPOINT_KEY = os.getenv("LEDGER_CHECKPOINT_KEY", "").encode()
+
+
+# --- Legacy block hash (blocks written before the binary preimage; ts_micros is NULL on them) ---
+def compute_block_hash(transaction_id: str, prev_hash: str, timestamp: datetime) -> str:
+    """
+    Computes the SHA-256 block hash from its transaction, parent and float
+    time, as blocks were hashed before the binary preimage. Only used to
+    validate those older blocks.
+
+    Args:
+        transaction_id (str): Transaction recorded by the block
+        prev_hash (str): Hash of the previous block ("0" for the first one)
+        timestamp (datetime): Block timestamp
+    """
+    return sha256(f"{transaction_id}{prev_hash}{timestamp.timestamp()}".encode()).hexdigest()
+
+
+# --- Stored block time as exact integer microseconds; naive values are UTC, so no local zone is involved ---
+def timestamp_micros(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        return (timestamp - NAIVE_UNIX_EPOCH) // MICROSECOND
+    return (timestamp - UNIX_EPOCH) // MICROSECOND
+
+
+# --- Raw SHA-256 of a block's binary preimage, shared by the writer and every validator ---
+def compute_block_digest(transaction_id: str, prev_digest: bytes, ts_micros: int) -> bytes:
+    """
+    Args:
+        transaction_id (str): Transaction recorded by the block (16 hex characters)
+        prev_digest (bytes): Raw digest of the previous block (GENESIS_PREV_DIGEST for the first one)
+        ts_micros (int): Block time in microseconds since the epoch
+
+    Raises:
+        ValueError: If the transaction ID does not fill the fixed-width field exactly
+    """
+    tid = transaction_id.encode()
+    if len(tid) != 16:
+        raise ValueError(f"Transaction ID must be 16 characters to be chained: {transaction_id!r}")
+    return sha256(BLOCK_PREIMAGE.pack(tid, prev_digest, ts_micros)).digest()
+
+
+# --- Check one stored block against its own contents (binary preimage, or the legacy hash) ---
+def block_hash_matches(block) -> bool:
+    """
+    The stored timestamp must still equal ts_micros, since the API,
+    snapshots and exports show the timestamp column.
+
+    Args:
+        block: Row or object with id, transaction_id, prev_hash, timestamp,
+               ts_micros, prev_digest and digest. Links between blocks are
+               checked by the caller through prev_hash.
+    """
+    if block.ts_micros is None:
+        return block.id == compute_block_hash(block.transaction_id, block.prev_hash, block.timestamp)
+    try:
+        digest = compute_block_digest(block.transaction_id, block.prev_digest, block.ts_micros)
+    except (ValueError, struct.error):
+        return False
+    return (
+        block.digest == digest
+        and block.id == digest.hex()
+        and block.timestamp is not None and timestamp_micros(block.timestamp) == block.ts_micros
+        and block.prev_hash == (GENESIS_PREV_HASH if block.prev_digest == GENESIS_PREV_DIGEST else block.prev_digest.hex())
+    )
+
+
+# --- Digest sealing one checkpoint ---
+def checkpoint_digest(height: int, block_hash: str) -> str:
+    message = f"{height}:{block_hash}".encode()
+    if LEDGER_CHECKPOINT_KEY:
+        return hmac.new(LEDGER_CHECKPOINT_KEY, message, sha256).hexdigest()
+    return sha256(message).hexdigest()
+
+
+# --- Checkpoint rows for the blocks that land on a checkpoint height ---
+def checkpoint_rows(blocks: list[dict]) -> list[dict]:
+    return [
+        {"shard": block["shard"], "height": block["height"], "block_hash": block["id"],
+         "digest": checkpoint_digest(block["height"], block["id"])}
+        for block in blocks
+        if block["height"] % LEDGER_CHECKPOINT_INTERVAL == 0
+    ]
+
+
+# --- Create a shard's chain-head row from its existing chain (first append only) ---
+def _bootstrap_head(db: Session, shard: int) -> None:
+    last_block = (
+        db.query(BlockModel.id, BlockModel.height)
+        .filter(BlockModel.shard == shard)
+        .order_by(BlockModel.height.desc())
+        .first()
+    )
+    head_hash, height = (last_block.id, last_block.height) if last_block else (GENESIS_PREV_HASH, 0)
+    try:
+        db.execute(insert(ChainHeadModel).values(shard=shard, head_hash=head_hash, height=height))
+        db.commit()
+    except IntegrityError:
+        db.rollback()       # Another worker created it first; use theirs
+
+
+# --- Lock a shard's chain-head row and return its current tip ---
+def lock_head(db: Session, shard: int = 0) -> tuple[str, int]:
+    """
+    Takes the write lock on the shard's chain-head row and returns
+    (head_hash, height).
+
+    The no-op UPDATE is what serializes appenders: PostgreSQL holds the row
+    lock (so other shards keep appending) and SQLite the database write
+    lock until the caller commits, so the tip read right after cannot
+    change underneath us.
+    """
+    for _ in range(2):
+        locked = db.execute(
+            update(ChainHeadModel)
+            .where(ChainHeadModel.shard == shard)
+            .values(height=ChainHeadModel.height)
+        )
+        if locked.rowcount:
+            head = db.execute(
+                select(ChainHeadModel.head_hash, ChainHeadModel.height).where(ChainHeadModel.shard == shard)
+            ).one()
+            return head.head_hash, head.height
+        db.rollback()
+        _bootstrap_head(db, shard)
+    raise RuntimeError("Chain head row could not be created")
+
+
+# --- Link new blocks onto a locked tip (caller owns the lock and the commit) ---
+def write_blocks(db: Session, tip: tuple[str, int], entries: list[tuple[str, datetime]], shard: int = 0) -> list[str]:
+    """
+    Inserts one block per (transaction_id, timestamp) after `tip`, records
+    any checkpoints they reach and moves the shard's chain head. Must run
+    after lock_head(db, shard) in the same DB transaction.
+
+    Returns:
+        list[str]: Hashes of the new blocks
+    """
+    prev_hash, height = tip
+    # A legacy tip's hex hash is still a raw SHA-256 once decoded
+    prev_digest = GENESIS_PREV_DIGEST if prev_hash == GENESIS_PREV_HASH else bytes.fromhex(prev_hash)
+    rows = []
+    for transaction_id, timestamp in entries:
+        height += 1
+        # UTC instant: PostgreSQL stores it whatever its session time zone and SQLite keeps the UTC
+        # wall clock, so both read back to the same ts_micros in any TZ and across DST changes
+        timestamp = timestamp.astimezone(timezone.utc)
+        ts_micros = timestamp_micros(timestamp)
+        digest = compute_block_digest(transaction_id, prev_digest, ts_micros)
+        block_hash = digest.hex()
+        rows.append({
+            "id": block_hash,
+            "shard": shard,
+            "height": height,
+            "transaction_id": transaction_id,
+            "prev_hash": prev_hash,
+            "timestamp": timestamp,
+            "ts_micros": ts_micros,
+            "prev_digest": prev_digest,
+            "digest": digest,
+        })
+        prev_hash, prev_digest = block_hash, digest
+
+    db.execute(insert(BlockModel), rows)
+    checkpoints = checkpoint_rows(rows)
+    if checkpoints:
+        db.execute(insert(CheckpointModel), checkpoints)
+    db.execute(
+        update(ChainHeadModel)
+        .where(ChainHeadModel.shard == shard)
+        .values(head_hash=prev_hash, height=height)
+    )
+    return [row["id"] for row in rows]
+
+
+# --- Append blocks for committed transactions, in order ---
+def append_blocks(db: Session, entries: list[tuple[str, datetime]], shard: int = 0) -> list[str]:
+    """
+    Appends one block per (transaction_id, timestamp) to a shard and commits.
+
+    Only the tip lock, the block inserts and the head update happen inside
+    the critical section, so concurrent workers queue briefly on the
+    shard's chain-head row instead of forking the chain.
+
+    Args:
+        db (Session): DB session with no pending work of its own
+        entries (list): (transaction_id, timestamp) pairs, oldest first
+        shard (int): Ledger shard to append to
+
+    Returns:
+        list[str]: Hashes of the new blocks
+    """
+    if not entries:
+        return []
+
+    try:
+        hashes = write_blocks(db, lock_head(db, shard), entries, shard)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return hashes
+
+
+# --- Single-block convenience wrapper ---
+def append_block(db: Session, transaction_id: str, timestamp: datetime, shard: int = 0) -> str:
+    return append_blocks(db, [(transaction_id, timestamp)], shard)[0]
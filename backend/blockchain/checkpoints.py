@@ -0,0 +1,142 @@
+# --- Imports ---
+import hmac
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..models.block_model import BlockModel
+from ..models.checkpoint_model import CheckpointModel
+from .chain_writer import GENESIS_PREV_HASH, LEDGER_CHECKPOINT_INTERVAL, block_hash_matches, checkpoint_digest
+
+# --- Block columns needed to re-hash a block ---
+BLOCK_COLUMNS = (
+    BlockModel.height, BlockModel.id, BlockModel.transaction_id, BlockModel.prev_hash, BlockModel.timestamp,
+    BlockModel.ts_micros, BlockModel.prev_digest, BlockModel.digest,
+)
+
+
+# --- First block of a shard in (start, end] that is unlinked or does not hash to its ID ---
+def _scan_segment(db: Session, shard: int, prev_hash: str, start: int, end: int | None) -> tuple[object, int]:
+    query = (
+        select(*BLOCK_COLUMNS)
+        .where(BlockModel.shard == shard, BlockModel.height > start)
+        .order_by(BlockModel.height)
+    )
+    if end is not None:
+        query = query.where(BlockModel.height <= end)
+
+    scanned = 0
+    for block in db.execute(query):
+        scanned += 1
+        if block.prev_hash != prev_hash or not block_hash_matches(block):
+            return block, scanned
+        prev_hash = block.id
+    return None, scanned
+
+
+# --- Find where tampering starts in a shard using checkpoints first ---
+def localize_tampering(db: Session, shard: int = 0) -> dict:
+    """
+    Checks every checkpoint against the block stored at its height (one
+    joined query, one hash per checkpoint), then re-hashes only the segment
+    ending at the first failing checkpoint, or the blocks after the last
+    checkpoint when all of them hold. Cost is O(n/K + K) hashes instead of
+    O(n) for a full validation.
+
+    Checkpoints catch history rewrites, including ones re-hashed so that
+    every block still links (which /validate alone cannot see). A rewrite
+    that keeps its segment self-consistent is only localized to that
+    segment. An edit that leaves a block's stored ID unchanged inside an
+    older segment does not reach any checkpoint, so "tampered": False only
+    covers what was checked (the message says which blocks were not
+    re-hashed); /validate finds those edits.
+
+    Returns:
+        dict: tampered flag, first bad height/ID when pinned down, the
+              suspect segment, forged checkpoint heights and work done
+    """
+    checkpoints = db.execute(
+        select(CheckpointModel.height, CheckpointModel.block_hash, CheckpointModel.digest.label("seal"), *BLOCK_COLUMNS[1:])
+        .outerjoin(BlockModel, (BlockModel.shard == CheckpointModel.shard) & (BlockModel.height == CheckpointModel.height))
+        .where(CheckpointModel.shard == shard)
+        .order_by(CheckpointModel.height)
+    ).all()
+
+    forged = []
+    good_height, good_hash = 0, GENESIS_PREV_HASH
+    bad_height = None
+    for checkpoint in checkpoints:
+        if not hmac.compare_digest(checkpoint.seal, checkpoint_digest(checkpoint.height, checkpoint.block_hash)):
+            forged.append(checkpoint.height)    # Not trusted as a reference point
+            continue
+        if checkpoint.id != checkpoint.block_hash or not block_hash_matches(checkpoint):
+            bad_height = checkpoint.height
+            break
+        good_height, good_hash = checkpoint.height, checkpoint.block_hash
+
+    block, scanned = _scan_segment(db, shard, good_hash, good_height, bad_height)
+    result = {
+        "shard": shard,
+        "tampered": bool(block is not None or bad_height is not None or forged),
+        "first_bad_height": block.height if block is not None else None,
+        "first_bad_block": block.id if block is not None else None,
+        "segment": [good_height + 1, bad_height],
+        "forged_checkpoints": forged,
+        "checkpoints_checked": len(checkpoints),
+        "blocks_scanned": scanned,
+    }
+
+    if block is not None:
+        result["message"] = f"Tampering starts at block {block.height} (ID: {block.id})"
+    elif bad_height is not None:
+        result["message"] = (f"History rewritten between heights {good_height + 1} and {bad_height}: "
+                             f"blocks still link but no longer match checkpoint {bad_height}")
+    elif forged:
+        result["message"] = f"Checkpoint digests do not verify at heights {forged}"
+    elif good_height == 0:
+        result["message"] = f"No tampering found: all {scanned} blocks were re-hashed"
+    else:
+        # Blocks behind the last good checkpoint were not re-hashed; an edit that kept their IDs is still possible
+        result["message"] = (f"No rewrite detected up to checkpoint {good_height} and blocks after it re-hash "
+                             f"correctly; blocks 1-{good_height} were not re-hashed, run /blockchain/validate "
+                             f"to rule out in-place edits there")
+    return result
+
+
+# --- Add missing checkpoints to an existing shard chain ---
+def backfill_checkpoints(db: Session, shard: int = 0, batch_size: int = 10000) -> dict:
+    """
+    Walks the shard's chain from genesis and records a checkpoint at every
+    K-th height that lacks one, stopping at the first block that fails
+    validation so tampered history is never pinned.
+
+    Returns:
+        dict: checkpoints added, blocks checked and the first invalid height (if any)
+    """
+    existing = set(db.execute(select(CheckpointModel.height).where(CheckpointModel.shard == shard)).scalars())
+    prev_hash = GENESIS_PREV_HASH
+    rows = []
+    checked = 0
+    invalid_height = None
+
+    result = db.execute(
+        select(*BLOCK_COLUMNS)
+        .where(BlockModel.shard == shard)
+        .order_by(BlockModel.height)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for block in result:
+        if block.prev_hash != prev_hash or not block_hash_matches(block):
+            invalid_height = block.height
+            break
+        checked += 1
+        if block.height % LEDGER_CHECKPOINT_INTERVAL == 0 and block.height not in existing:
+            rows.append({"shard": shard, "height": block.height, "block_hash": block.id,
+                         "digest": checkpoint_digest(block.height, block.id)})
+        prev_hash = block.id
+    result.close()
+
+    if rows:
+        db.execute(insert(CheckpointModel), rows)
+    db.commit()
+    return {"added": len(rows), "blocks_checked": checked, "invalid_height": invalid_height}
@@ -0,0 +1,17 @@
+# --- Imports ---
+import os
+from hashlib import sha256
+
+# --- Number of independent ledger chains (1 = a single global chain) ---
+# Changing it only affects where new blocks go; existing shard chains stay valid.
+LEDGER_SHARDS = int(os.getenv("LEDGER_SHARDS", "1"))
+
+# --- How often shard heads are anchored into a global root block (0 = never) ---
+LEDGER_ANCHOR_SECONDS = float(os.getenv("LEDGER_ANCHOR_SECONDS", "60"))
+
+
+# --- Shard a merchant's blocks are appended to ---
+def shard_for_merchant(mid: str | None, shards: int = LEDGER_SHARDS) -> int:
+    if shards <= 1 or mid is None:
+        return 0
+    return int.from_bytes(sha256(mid.encode()).digest()[:8], "big") % shards
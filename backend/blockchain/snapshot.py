@@ -0,0 +1,263 @@
+# --- Imports ---
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from hashlib import sha256
+from types import SimpleNamespace
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from ..models.transaction_model import TransactionModel
+from ..models.block_model import BlockModel
+from ..models.chain_head_model import ChainHeadModel
+from ..models.checkpoint_model import CheckpointModel
+from ..models.anchor_model import AnchorModel
+from ..models.ledger_queue_model import LedgerQueueModel
+from .chain_writer import GENESIS_PREV_HASH, block_hash_matches
+
+# --- Snapshot layout version written to the manifest (2 = sharded chains, 3 = binary block preimages) ---
+SNAPSHOT_FORMAT = 3
+READABLE_FORMATS = (1, 2, 3)
+
+# --- Tables in a snapshot, in load order (parents before children), with their sort order ---
+SNAPSHOT_TABLES = {
+    "transactions": (TransactionModel, (TransactionModel.id,)),
+    "blockchain": (BlockModel, (BlockModel.shard, BlockModel.height)),
+    "blockchain_checkpoints": (CheckpointModel, (CheckpointModel.shard, CheckpointModel.height)),
+    "ledger_anchors": (AnchorModel, (AnchorModel.height,)),
+    "ledger_queue": (LedgerQueueModel, (LedgerQueueModel.seq,)),
+}
+
+# --- Columns re-generated by the target database instead of restored (keeps sequences in step) ---
+GENERATED_COLUMNS = {"ledger_queue": {"seq"}}
+
+# --- Columns holding datetimes (serialized as ISO-8601 strings) ---
+TIMESTAMP_COLUMNS = {"timestamp", "ingested_at"}
+
+# --- Columns holding raw bytes (serialized as hex strings) ---
+BINARY_COLUMNS = {"digest", "prev_digest"}
+
+
+# --- Encode/decode one row as a compact JSON array ---
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def _encode_row(row) -> str:
+    return json.dumps([_encode_value(value) for value in row], separators=(",", ":"))
+
+
+def _decode_rows(data: bytes, columns: list[str], table: str) -> list[dict]:
+    binary_columns = BINARY_COLUMNS.intersection(columns) if table == "blockchain" else set()
+    rows = []
+    for line in data.splitlines():
+        record = dict(zip(columns, json.loads(line)))
+        for column in TIMESTAMP_COLUMNS.intersection(record):
+            if record[column] is not None:
+                record[column] = datetime.fromisoformat(record[column])
+        for column in binary_columns:
+            if record[column] is not None:
+                record[column] = bytes.fromhex(record[column])
+        rows.append(record)
+    return rows
+
+
+# --- Write one compressed chunk and describe it for the manifest ---
+def _write_chunk(directory: str, table: str, index: int, lines: list[str]) -> dict:
+    name = f"{table}-{index:05d}.jsonl.gz"
+    payload = gzip.compress(("\n".join(lines) + "\n").encode(), compresslevel=6)
+    with open(os.path.join(directory, name), "wb") as handle:
+        handle.write(payload)
+    return {"file": name, "rows": len(lines), "sha256": sha256(payload).hexdigest()}
+
+
+# --- Runs of consecutive blocks from the same shard within a chunk ---
+def _segments(blocks) -> list[dict]:
+    segments = []
+    for block in blocks:
+        if not segments or segments[-1]["shard"] != block["shard"]:
+            segments.append({"shard": block["shard"], "first_height": block["height"],
+                             "first_prev_hash": block["prev_hash"], "rows": 0})
+        segments[-1]["last_hash"] = block["id"]
+        segments[-1]["rows"] += 1
+    return segments
+
+
+# --- Read format 1 manifests (single chain, no shard column) as format 2 ---
+def _upgrade_manifest(manifest: dict) -> dict:
+    if manifest.get("format") == 1:
+        for chunk in manifest["tables"]["blockchain"]["chunks"]:
+            chunk["segments"] = [{"shard": 0, "first_height": chunk.pop("first_height"),
+                                  "first_prev_hash": chunk.pop("first_prev_hash"),
+                                  "last_hash": chunk.pop("last_hash"), "rows": chunk["rows"]}]
+        manifest["heads"] = {"0": {"head_hash": manifest.pop("head_hash"), "height": manifest["height"]}}
+        manifest["format"] = 2
+    return manifest
+
+
+# --- Export the ledger tables as a chunked, compressed snapshot ---
+def export_snapshot(db: Session, directory: str, chunk_rows: int = 50000) -> dict:
+    """
+    Streams the ledger tables into gzip-compressed JSON-lines chunks and
+    writes manifest.json with row counts, checksums and every shard head.
+
+    Args:
+        db (Session): DB session (the export reads inside one transaction)
+        directory (str): Output directory (created if missing)
+        chunk_rows (int): Rows per chunk file
+
+    Returns:
+        dict: The manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    if db.get_bind().dialect.name == "postgresql":
+        # One consistent view of all tables for the whole export
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    manifest = {"format": SNAPSHOT_FORMAT, "created_at": datetime.now().isoformat(), "tables": {}}
+    heads = {}
+    for table, (model, order_columns) in SNAPSHOT_TABLES.items():
+        columns = [column.key for column in model.__table__.columns]
+        result = db.execute(
+            select(*model.__table__.columns).order_by(*order_columns).execution_options(stream_results=True)
+        )
+
+        chunks = []
+        total = 0
+        for partition in result.partitions(chunk_rows):
+            chunk = _write_chunk(directory, table, len(chunks), [_encode_row(row) for row in partition])
+            if table == "blockchain":
+                chunk["segments"] = _segments(row._mapping for row in partition)
+                for segment in chunk["segments"]:
+                    heads[str(segment["shard"])] = {
+                        "head_hash": segment["last_hash"],
+                        "height": segment["first_height"] + segment["rows"] - 1
+                    }
+            chunks.append(chunk)
+            total += len(partition)
+        manifest["tables"][table] = {"columns": columns, "rows": total, "chunks": chunks}
+
+    manifest["height"] = manifest["tables"]["blockchain"]["rows"]     # Total blocks across shards
+    manifest["heads"] = heads
+    db.rollback()
+
+    with open(os.path.join(directory, "manifest.json"), "w") as handle:
+        json.dump(manifest, handle, indent=2)
+    return manifest
+
+
+# --- Verify one chunk (runs in a worker process) ---
+def _verify_chunk(directory: str, table: str, columns: list[str], chunk: dict) -> list[str]:
+    with open(os.path.join(directory, chunk["file"]), "rb") as handle:
+        payload = handle.read()
+    if sha256(payload).hexdigest() != chunk["sha256"]:
+        return [f"{chunk['file']}: checksum mismatch"]
+
+    rows = _decode_rows(gzip.decompress(payload), columns, table)
+    problems = []
+    if len(rows) != chunk["rows"]:
+        problems.append(f"{chunk['file']}: expected {chunk['rows']} rows, found {len(rows)}")
+
+    if table == "blockchain" and rows:
+        for row in rows:
+            row.setdefault("shard", 0)      # Format 1 snapshots hold only the single chain
+            for column in ("ts_micros", "prev_digest", "digest"):
+                row.setdefault(column, None)    # Formats 1-2 predate binary preimages
+        position = 0
+        for segment in chunk["segments"]:
+            prev_hash, height = segment["first_prev_hash"], segment["first_height"]
+            for row in rows[position:position + segment["rows"]]:
+                if row["shard"] != segment["shard"] or row["height"] != height or row["prev_hash"] != prev_hash:
+                    problems.append(f"{chunk['file']}: shard {segment['shard']} chain broken at height {row['height']}")
+                    return problems
+                if not block_hash_matches(SimpleNamespace(**row)):
+                    problems.append(f"{chunk['file']}: shard {row['shard']} block {row['height']} "
+                                    f"hash does not match its contents")
+                    return problems
+                prev_hash, height = row["id"], height + 1
+            if prev_hash != segment["last_hash"]:
+                problems.append(f"{chunk['file']}: last shard {segment['shard']} block hash differs from the manifest")
+            position += segment["rows"]
+        if position != len(rows):
+            problems.append(f"{chunk['file']}: segments cover {position} of {len(rows)} blocks")
+    return problems
+
+
+# --- Verify a snapshot: checksums, per-chunk hashes (in parallel) and chunk linkage ---
+def verify_snapshot(directory: str, manifest: dict, workers: int | None = None) -> list[str]:
+    """
+    Returns a list of problems; an empty list means the snapshot is intact.
+    """
+    manifest = _upgrade_manifest(manifest)
+    problems = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_verify_chunk, directory, table, info["columns"], chunk)
+            for table, info in manifest["tables"].items()
+            for chunk in info["chunks"]
+        ]
+        for future in futures:
+            problems.extend(future.result())
+
+    # --- Each shard's segments must link end to end, from genesis to the manifest head ---
+    tips = {}       # shard -> (last hash, next height)
+    for chunk in manifest["tables"]["blockchain"]["chunks"]:
+        for segment in chunk["segments"]:
+            prev_hash, height = tips.get(segment["shard"], (GENESIS_PREV_HASH, 1))
+            if segment["first_prev_hash"] != prev_hash or segment["first_height"] != height:
+                problems.append(f"{chunk['file']}: shard {segment['shard']} does not continue the previous chunk")
+            tips[segment["shard"]] = (segment["last_hash"], segment["first_height"] + segment["rows"])
+    heads = {str(shard): {"head_hash": head_hash, "height": height - 1} for shard, (head_hash, height) in tips.items()}
+    if heads != manifest["heads"]:
+        problems.append("Shard heads do not match the manifest")
+    return problems
+
+
+# --- Restore a verified snapshot into empty ledger tables ---
+def restore_snapshot(db: Session, directory: str, workers: int | None = None) -> dict:
+    """
+    Verifies the snapshot in parallel, then bulk-loads every chunk and the
+    shard chain heads in a single DB transaction.
+
+    Raises:
+        ValueError: If the target tables are not empty or verification fails
+    """
+    with open(os.path.join(directory, "manifest.json")) as handle:
+        manifest = json.load(handle)
+    if manifest.get("format") not in READABLE_FORMATS:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+    manifest = _upgrade_manifest(manifest)
+
+    for model in [model for model, _ in SNAPSHOT_TABLES.values()] + [ChainHeadModel]:
+        if db.execute(select(func.count()).select_from(model)).scalar():
+            raise ValueError(f"Table {model.__tablename__} is not empty; restore needs an empty ledger")
+
+    problems = verify_snapshot(directory, manifest, workers)
+    if problems:
+        raise ValueError("Snapshot verification failed:\n" + "\n".join(problems))
+
+    try:
+        for table, (model, _) in SNAPSHOT_TABLES.items():
+            info = manifest["tables"].get(table, {"chunks": []})    # Older snapshots lack newer tables
+            for chunk in info["chunks"]:
+                with open(os.path.join(directory, chunk["file"]), "rb") as handle:
+                    rows = _decode_rows(gzip.decompress(handle.read()), info["columns"], table)
+                for column in GENERATED_COLUMNS.get(table, ()):
+                    for row in rows:
+                        del row[column]
+                db.execute(insert(model), rows)
+
+        for shard, head in manifest["heads"].items():
+            db.execute(insert(ChainHeadModel).values(shard=int(shard), **head))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return manifest
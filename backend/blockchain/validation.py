@@ -0,0 +1,147 @@
+# --- Imports ---
+import hmac
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from hashlib import sha256
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from ..database.database import SessionLocal
+from ..models.block_model import BlockModel
+from ..models.chain_head_model import ChainHeadModel
+from ..models.checkpoint_model import CheckpointModel
+from .anchors import validate_anchors
+from .chain_writer import (
+    BLOCK_PREIMAGE, GENESIS_PREV_DIGEST, GENESIS_PREV_HASH, checkpoint_digest, compute_block_hash, timestamp_micros
+)
+
+
+# --- Shards that have a chain (shard 0 always exists, even before its first block) ---
+def ledger_shards(db: Session) -> list[int]:
+    return sorted(set(db.execute(select(ChainHeadModel.shard)).scalars()) | {0})
+
+
+# --- Validate one shard's chain: links, block hashes and checkpoints ---
+def validate_shard(db: Session, shard: int = 0) -> dict:
+    """
+    Returns:
+        dict: shard, valid flag, message and number of blocks checked
+            (plus the height of the first bad block, if any)
+    """
+    # --- Checkpointed hashes also expose rewrites that were re-hashed to keep linking ---
+    checkpoints = {}
+    for checkpoint in db.execute(
+        select(CheckpointModel.height, CheckpointModel.block_hash, CheckpointModel.digest)
+        .where(CheckpointModel.shard == shard)
+    ):
+        if not hmac.compare_digest(checkpoint.digest, checkpoint_digest(checkpoint.height, checkpoint.block_hash)):
+            return {"shard": shard, "valid": False, "blocks": 0,
+                    "message": f"Checkpoint in shard {shard} at height {checkpoint.height} has been altered"}
+        checkpoints[checkpoint.height] = checkpoint.block_hash
+
+    # --- Plain tuples: binary preimage fields, plus the timestamp shown by the API (must equal ts_micros) ---
+    blocks = db.execute(
+        select(BlockModel.height, BlockModel.id, BlockModel.transaction_id, BlockModel.prev_hash,
+               BlockModel.prev_digest, BlockModel.digest, BlockModel.ts_micros, BlockModel.timestamp)
+        .where(BlockModel.shard == shard)
+        .order_by(BlockModel.height)
+    ).all()
+    if not blocks:
+        return {"shard": shard, "valid": True, "blocks": 0, "message": "Blockchain is empty"}
+
+    pack = BLOCK_PREIMAGE.pack
+    prev_hash, prev_digest = GENESIS_PREV_HASH, GENESIS_PREV_DIGEST
+    for i, (height, block_id, transaction_id, block_prev_hash, block_prev_digest, digest, ts_micros,
+            timestamp) in enumerate(blocks):
+        # Each block must link to its predecessor, hash to its own ID and match its checkpoint
+        if ts_micros is None:
+            valid = block_prev_hash == prev_hash and block_id == compute_block_hash(
+                transaction_id, prev_hash, timestamp
+            )
+        else:
+            tid = transaction_id.encode()
+            valid = (
+                block_prev_digest == prev_digest and block_prev_hash == prev_hash and len(tid) == 16
+                and digest == sha256(pack(tid, prev_digest, ts_micros)).digest() and block_id == digest.hex()
+                and timestamp is not None and timestamp_micros(timestamp) == ts_micros
+            )
+
+        if not valid or checkpoints.get(height, block_id) != block_id:
+            return {"shard": shard, "valid": False, "blocks": i + 1, "height": height,
+                    "message": f"Tampering detected in shard {shard} at height {height} (ID: {block_id})"}
+        prev_hash = block_id
+        prev_digest = digest if ts_micros is not None else bytes.fromhex(block_id)
+
+    return {"shard": shard, "valid": True, "blocks": len(blocks), "message": "Blockchain is valid and untampered"}
+
+
+# --- Worker entry point: each shard gets its own session (on `bind`, or a new primary session) ---
+def _validate_shard_with_new_session(shard: int, bind=None) -> dict:
+    db = Session(bind=bind) if bind is not None else SessionLocal()
+    try:
+        return validate_shard(db, shard)
+    finally:
+        db.close()
+
+
+# --- Engines opened inside worker processes, one per database URL (connections never cross a fork) ---
+_process_engines = {}
+
+
+# --- Process-pool entry point: validates on the caller's database (primary or replica) ---
+def _validate_shard_in_process(shard: int, url: str) -> dict:
+    if url not in _process_engines:
+        _process_engines[url] = create_engine(url, poolclass=NullPool)
+    return _validate_shard_with_new_session(shard, bind=_process_engines[url])
+
+
+# --- Validate every shard in parallel, then the global anchors ---
+def validate_ledger(db: Session, workers: int | None = None, processes: bool | None = None) -> dict:
+    """
+    Args:
+        db (Session): Session used to list shards and check anchors
+        workers (int | None): Parallel shard validations (default: one per
+            shard, capped at the CPU count for processes)
+        processes (bool | None): Validate shards in worker processes, so
+            block hashing runs in parallel, or in threads, which only
+            overlap DB reads because hashing holds the GIL (default:
+            processes whenever there is more than one shard)
+
+    Returns:
+        dict: overall valid flag and message, per-shard results and the anchor check
+    """
+    shards = ledger_shards(db)
+    if len(shards) == 1:
+        shard_results = [validate_shard(db, shards[0])]
+    else:
+        if processes is not False:
+            url = db.get_bind().url.render_as_string(hide_password=False)
+            pool = ProcessPoolExecutor(max_workers=workers or min(len(shards), os.cpu_count() or 1))
+            task = partial(_validate_shard_in_process, url=url)
+        else:
+            # Threads reuse the caller's engine, so replica reads stay on the replica
+            pool = ThreadPoolExecutor(max_workers=workers or len(shards))
+            task = partial(_validate_shard_with_new_session, bind=db.get_bind())
+        with pool:
+            shard_results = list(pool.map(task, shards))
+    anchors = validate_anchors(db)
+
+    invalid = [result for result in shard_results if not result["valid"]]
+    if invalid:
+        message = invalid[0]["message"]
+    elif not anchors["valid"]:
+        message = anchors["message"]
+    elif len(shards) == 1:
+        message = shard_results[0]["message"]
+    else:
+        message = f"All {len(shards)} shard chains and {anchors['anchors']} anchors are valid and untampered"
+
+    return {
+        "valid": not invalid and anchors["valid"],
+        "message": message,
+        "shards": shard_results,
+        "anchors": anchors,
+    }
@@ -0,0 +1,119 @@
+# --- Imports ---
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+# --- In-process TTL + LRU backend ---
+class InProcessBackend:
+    """
+    Thread-safe in-memory cache with per-entry TTL and LRU eviction.
+    Suitable for a single worker; each process keeps its own copy.
+    """
+
+    def __init__(self, max_entries=10000):
+        """
+        Args:
+            max_entries (int): Entries kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()       # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached value, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)  # Mark as most recently used
+            return value
+
+    def set(self, key, value, ttl):
+        """
+        Stores a value for `ttl` seconds, evicting the LRU entry when full.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# --- Backend speaking the Redis protocol through a client object ---
+class RedisBackend:
+    """
+    Stores JSON-encoded values in Redis (or anything exposing the same
+    get/set/delete client interface), shared by every worker.
+    """
+
+    def __init__(self, client, prefix="upi:"):
+        """
+        Args:
+            client: Object with Redis-style get(key), set(key, value, px=ms) and delete(key)
+            prefix (str): Namespace prepended to every key
+        """
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0                  # Redis evicts on its own; not tracked here
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+# --- Local stand-in for a Redis client (tests and single-box runs) ---
+class FakeRedis:
+    """
+    Minimal in-memory implementation of the Redis client calls used by
+    RedisBackend, including millisecond expiry.
+    """
+
+    def __init__(self):
+        self._data = {}                     # key -> (expires_at or None, bytes)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None, px=None):
+        if isinstance(value, str):
+            value = value.encode()
+        ttl = px / 1000 if px is not None else ex
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl if ttl is not None else None, value)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
@@ -0,0 +1,110 @@
+# --- Imports ---
+import os
+import threading
+
+from fastapi.encoders import jsonable_encoder
+
+from .backends import InProcessBackend, RedisBackend, FakeRedis
+
+# --- Cache settings (from environment, with safe defaults) ---
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")          # memory | redis | fakeredis
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+# --- Read-through cache for user and merchant profiles ---
+class ProfileCache:
+    """
+    Read-through cache in front of profile lookups, with explicit
+    invalidation on writes and hit/miss counters.
+    """
+
+    def __init__(self, backend, ttl=CACHE_TTL_SECONDS):
+        """
+        Args:
+            backend: InProcessBackend, RedisBackend or compatible object
+            ttl (float): Seconds a cached profile stays valid
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind, object_id):
+        return f"{kind}:{object_id}"
+
+    def get_or_load(self, kind, object_id, loader):
+        """
+        Returns the cached profile, calling `loader` on a miss.
+
+        Args:
+            kind (str): Profile type, e.g. "user" or "merchant"
+            object_id (str): UID or MID
+            loader (callable): Returns a JSON-safe dict, or None if not found
+
+        Returns:
+            dict | None: Profile data (not-found results are not cached)
+        """
+        key = self._key(kind, object_id)
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if value is not None:
+            return value
+
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def invalidate(self, kind, object_id):
+        """
+        Drops a cached profile; call after the write has committed.
+        """
+        self.backend.delete(self._key(kind, object_id))
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        """
+        Returns hit/miss counters for this worker.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.backend.evictions,
+            }
+
+
+# --- Convert an ORM row into the JSON-safe dict exposed by a response schema ---
+def profile_to_dict(obj, schema):
+    fields = getattr(schema, "model_fields", None) or schema.__fields__
+    return jsonable_encoder({name: getattr(obj, name) for name in fields})
+
+
+# --- Build the configured backend ---
+def build_backend(name=CACHE_BACKEND):
+    if name == "memory":
+        return InProcessBackend(max_entries=CACHE_MAX_ENTRIES)
+    if name == "fakeredis":
+        return RedisBackend(FakeRedis())
+    if name == "redis":
+        import redis  # Optional dependency, only needed for the shared backend
+        return RedisBackend(redis.Redis.from_url(REDIS_URL))
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+
+
+# --- Shared cache instance used by the routes ---
+profile_cache = ProfileCache(build_backend())
@@ -1,10 +1,12 @@
 # --- SQLAlchemy imports for DB connection, ORM base, and session handling ---
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 # --- OS and dotenv for environment variable management ---
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # --- Load environment variables from a .env file into the environment ---
@@ -22,6 +24,95 @@ engine = create_engine(DATABASE_URL)
 # autoflush=False: disables automatic flush of changes
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- Optional read replica for heavy read-only routes (e.g. a PostgreSQL hot standby) ---
+# Unset: every read goes to the primary
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+
+# --- Replica lag tolerated before reads fall back to the primary, how often it is re-checked,
+# and how long a probe may take before its verdict is dropped ---
+READ_REPLICA_MAX_LAG_SECONDS = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "5"))
+READ_REPLICA_CHECK_SECONDS = float(os.getenv("READ_REPLICA_CHECK_SECONDS", "5"))
+READ_REPLICA_PROBE_TIMEOUT_SECONDS = float(os.getenv("READ_REPLICA_PROBE_TIMEOUT_SECONDS", "2"))
+
+read_engine = create_engine(
+    READ_DATABASE_URL,
+    pool_pre_ping=True,
+    # An unreachable standby fails fast instead of waiting out the TCP timeout
+    connect_args={"connect_timeout": max(1, round(READ_REPLICA_PROBE_TIMEOUT_SECONDS))}
+    if READ_DATABASE_URL.startswith("postgresql") else {}
+) if READ_DATABASE_URL else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
+
+# --- Replica lag query: zero when the standby has replayed everything it received ---
+PG_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+# --- Tracks whether the read replica is reachable and fresh enough to serve reads ---
+class ReplicaMonitor:
+    """
+    Probes the replica at most once per `check_seconds` on a background
+    thread and caches the verdict, so routing a request costs a clock read
+    and never waits on the replica. Until the first probe finishes, and
+    whenever a probe has run longer than `probe_timeout_seconds` past its
+    due time, reads go to the primary. Lag is measured on PostgreSQL;
+    other databases only get a liveness check.
+    """
+
+    def __init__(self, engine, max_lag_seconds, check_seconds, probe_timeout_seconds=READ_REPLICA_PROBE_TIMEOUT_SECONDS):
+        """
+        Args:
+            engine: Replica engine
+            max_lag_seconds (float): Highest acceptable replay lag
+            check_seconds (float): How long a probe result is reused
+            probe_timeout_seconds (float): How long past `check_seconds` a
+                verdict is still trusted while its refresh is running
+        """
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.lag_seconds = None         # Last measured lag (None = unreachable)
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()   # Held by the running probe thread
+        self.probe_thread = None
+
+    def probe(self):
+        try:
+            with self.engine.connect() as conn:
+                if self.engine.dialect.name == "postgresql":
+                    return float(conn.execute(PG_REPLICA_LAG_SQL).scalar())
+                conn.execute(text("SELECT 1"))
+                return 0.0
+        except Exception:
+            return None
+
+    def refresh(self):
+        try:
+            self.lag_seconds = self.probe()
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def usable(self):
+        age = time.monotonic() - self._checked_at
+        if age >= self.check_seconds and self._lock.acquire(blocking=False):
+            self.probe_thread = threading.Thread(target=self.refresh, name="replica-probe", daemon=True)
+            self.probe_thread.start()
+        if age > self.check_seconds + self.probe_timeout_seconds:
+            return False                # Never probed, or the replica is too slow to answer
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+
+
+replica_monitor = (
+    ReplicaMonitor(read_engine, READ_REPLICA_MAX_LAG_SECONDS, READ_REPLICA_CHECK_SECONDS) if read_engine else None
+)
+
 # --- Define a common base class for all ORM models ---
 # This base will be inherited by all models (e.g., MerchantModel, TransactionModel)
 Base = declarative_base()
@@ -34,3 +125,16 @@ def get_db():
         yield db            # Provide the session to the route
     finally:
         db.close()          # Always close the session after the request is done
+
+
+# --- Dependency for read-only routes: replica session when healthy, primary otherwise ---
+# Use only where slightly stale data is acceptable (lists, reports, validation)
+def get_read_db():
+    if replica_monitor is not None and replica_monitor.usable():
+        db = ReadSessionLocal()
+    else:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,79 @@
+# --- AES-GCM envelopes for payment intents queued on offline UPI machines ---
+import hmac
+import json
+import os
+from hashlib import sha256
+
+from Crypto.Cipher import AES
+
+# --- Master secret the bank derives every terminal key from (hex or text) ---
+UPI_TERMINAL_MASTER_KEY = os.getenv("UPI_TERMINAL_MASTER_KEY", "")
+
+# --- GCM nonce size (96 bits, the size GCM is designed for) ---
+NONCE_SIZE = 12
+
+
+# --- Per-terminal AES-256 key: HMAC-SHA256(master key, terminal ID) ---
+def derive_terminal_key(terminal_id: str, master_key: str = UPI_TERMINAL_MASTER_KEY) -> bytes:
+    """
+    Each terminal is provisioned with its own derived key, so a leaked
+    terminal key exposes only that terminal's batches and the bank never
+    stores per-terminal secrets.
+
+    Raises:
+        RuntimeError: If no master key is configured
+    """
+    if not master_key:
+        raise RuntimeError("UPI_TERMINAL_MASTER_KEY is not set")
+    try:
+        secret = bytes.fromhex(master_key)
+    except ValueError:
+        secret = master_key.encode()
+    return hmac.new(secret, f"upi-terminal:{terminal_id}".encode(), sha256).digest()
+
+
+# --- Seal a batch on the terminal ---
+def seal_batch(terminal_id: str, batch: dict, key: bytes | None = None) -> dict:
+    """
+    Encrypts and authenticates a batch of payment intents. The GCM tag is
+    keyed with the terminal's secret and also covers the terminal ID, so
+    the bank can tell which terminal produced a batch and that nothing in
+    it was altered or moved to another terminal's envelope.
+
+    Args:
+        terminal_id (str): Terminal that queued the intents
+        batch (dict): {"batch_id": ..., "intents": [...]}
+        key (bytes | None): Terminal key (derived from the master key if omitted)
+
+    Returns:
+        dict: Envelope with terminal_id, nonce and ciphertext (hex)
+    """
+    key = key or derive_terminal_key(terminal_id)
+    nonce = os.urandom(NONCE_SIZE)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(terminal_id.encode())
+    ciphertext, tag = cipher.encrypt_and_digest(json.dumps(batch, separators=(",", ":")).encode())
+    return {"terminal_id": terminal_id, "nonce": nonce.hex(), "ciphertext": (ciphertext + tag).hex()}
+
+
+# --- Open a sealed batch at the bank ---
+def open_batch(terminal_id: str, nonce_hex: str, ciphertext_hex: str) -> dict:
+    """
+    Returns:
+        dict: The decrypted batch
+
+    Raises:
+        ValueError: If the envelope is malformed or fails authentication
+    """
+    try:
+        nonce = bytes.fromhex(nonce_hex)
+        sealed = bytes.fromhex(ciphertext_hex)
+    except ValueError:
+        raise ValueError("Batch envelope is not valid hex")
+    if len(nonce) != NONCE_SIZE or len(sealed) < 16:
+        raise ValueError("Batch envelope is malformed")
+
+    cipher = AES.new(derive_terminal_key(terminal_id), AES.MODE_GCM, nonce=nonce)
+    cipher.update(terminal_id.encode())
+    plaintext = cipher.decrypt_and_verify(sealed[:-16], sealed[-16:])     # Raises ValueError on a bad tag
+    return json.loads(plaintext)
@@ -0,0 +1,19 @@
+# --- Shared bcrypt password context, created lazily ---
+import hmac
+from functools import lru_cache
+from hashlib import sha256
+
+
+# --- Build the passlib context on first use so passlib/bcrypt stay off the import path ---
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# --- Check a payment PIN against its stored hash ---
+# Users registered through the API store bcrypt hashes; older rows hold a plain SHA-256 hex digest.
+def verify_pin(pin: str, stored_hash: str) -> bool:
+    if stored_hash.startswith("$2"):
+        return get_pwd_context().verify(pin, stored_hash)
+    return hmac.compare_digest(sha256(pin.encode()).hexdigest(), stored_hash)
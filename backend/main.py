@@ -1,25 +1,61 @@
-# --- Import FastAPI core and route modules ---
+# --- Import FastAPI core and the standard library helpers used to load routers ---
+import os                                # Reads ENABLED_ROUTERS from the environment
+from importlib import import_module      # Imports only the router modules this instance serves
 from fastapi import FastAPI  # Import FastAPI class to create the application instance
 
-# --- Import routers for various API domains ---
-from .api import (  # Import all API route modules from the api package
-    merchant_routes,              # Routes for merchant operations
-    transaction_routes,           # Routes for handling transactions
-    user_routes,                  # Routes for user-related operations
-    merchant_qr_routes,           # Routes for generating merchant QR codes
-    upi_machine_routes,           # Routes to scan QR codes via machine (camera/image)
-    bank_routes,                  # Routes that simulate UPI payment processing
-    blockchain_routes             # Routes to fetch and verify blockchain integrity
-)
+# --- Each worker process leases a unique ID-generator worker ID at startup ---
+from .utils.id_generator import reserve_worker_id
+
+# --- Background block builder (drains the ledger queue off the payment path) ---
+from .blockchain.block_builder import BLOCK_BUILDER_ENABLED, BlockBuilder
+
+# --- Available API routers (name -> module in the api package) ---
+ROUTER_MODULES = {
+    "merchant": "merchant_routes",       # Routes for merchant operations
+    "transactions": "transaction_routes",  # Routes for handling transactions
+    "users": "user_routes",              # Routes for user-related operations
+    "merchant_qr": "merchant_qr_routes",  # Routes for generating merchant QR codes
+    "upi_machine": "upi_machine_routes",  # Routes to scan QR codes via machine (camera/image)
+    "bank": "bank_routes",               # Routes that simulate UPI payment processing
+    "blockchain": "blockchain_routes",   # Routes to fetch and verify blockchain integrity
+    "cache": "cache_routes",             # Routes exposing profile cache metrics
+    "export": "export_routes",           # Routes streaming tables out for analytics
+}
+
+# --- Comma-separated router names to mount, or "all" (e.g. "bank,blockchain" on payment nodes) ---
+ENABLED_ROUTERS = os.getenv("ENABLED_ROUTERS", "all")
+
+# --- Resolve the configured router names, rejecting typos early ---
+def selected_routers(setting: str = ENABLED_ROUTERS) -> list[str]:
+    if setting.strip().lower() in ("", "all"):
+        return list(ROUTER_MODULES)
+
+    names = [name.strip() for name in setting.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ROUTER_MODULES]
+    if unknown:
+        raise ValueError(f"Unknown router(s) in ENABLED_ROUTERS: {', '.join(unknown)}")
+    return names
 
 # --- Initialize FastAPI app instance ---
 app = FastAPI()  # Create the FastAPI application object
 
-# --- Register all API routers with proper prefixes and tags ---
-app.include_router(merchant_routes.router)         # Mount merchant routes at /merchants
-app.include_router(transaction_routes.router)      # Mount transaction routes at /transactions
-app.include_router(user_routes.router)             # Mount user routes at /users
-app.include_router(merchant_qr_routes.router)      # Mount QR generation routes at /merchant-qr
-app.include_router(upi_machine_routes.router)      # Mount image-based QR scanning at /upi-machine
-app.include_router(bank_routes.router)             # Mount UPI bank processor at /bank
-app.include_router(blockchain_routes.router)       # Mount blockchain fetch/verify endpoints at /blockchain
+# --- Import and register only the enabled routers; the rest are never loaded ---
+for router_name in selected_routers():
+    module = import_module(f".api.{ROUTER_MODULES[router_name]}", __package__)
+    app.include_router(module.router)
+
+# --- Run the block builder alongside the API unless a dedicated builder process is used ---
+block_builder = BlockBuilder()
+
+@app.on_event("startup")
+def lease_worker_id():
+    reserve_worker_id()
+
+@app.on_event("startup")
+def start_block_builder():
+    if BLOCK_BUILDER_ENABLED:
+        block_builder.start()
+
+@app.on_event("shutdown")
+def stop_block_builder():
+    block_builder.stop()
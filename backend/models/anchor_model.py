@@ -0,0 +1,24 @@
+# --- SQLAlchemy imports ---
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from ..database.database import Base
+
+# --- ORM Model for global root blocks anchoring every shard head ---
+# Each anchor hashes the previous anchor and the (shard, height, head hash)
+# of every shard, so the anchors form one global chain over all shards.
+class AnchorModel(Base):
+    __tablename__ = "ledger_anchors"
+
+    # Position in the anchor chain (1 = first anchor)
+    height = Column(Integer, primary_key=True)
+
+    # Root hash of this anchor
+    root_hash = Column(String, nullable=False)
+
+    # Root hash of the previous anchor ("0" for the first one)
+    prev_root = Column(String, nullable=False)
+
+    # JSON list of [shard, height, head_hash] covered by this anchor
+    heads = Column(Text, nullable=False)
+
+    # When the anchor was taken
+    timestamp = Column(DateTime(timezone=True), nullable=False)
@@ -1,14 +1,24 @@
 # --- SQLAlchemy imports ---
-from sqlalchemy import Column, String, DateTime, ForeignKey, func
+from sqlalchemy import BigInteger, Column, String, Integer, DateTime, ForeignKey, LargeBinary, UniqueConstraint, func
 from ..database.database import Base
 
 # --- ORM Model representing a Blockchain Block ---
 class BlockModel(Base):
     __tablename__ = "blockchain"
+    __table_args__ = (
+        # One block per height within a shard, so two blocks can never share a parent slot
+        UniqueConstraint("shard", "height", name="uq_blockchain_shard_height"),
+    )
 
     # Current block's hash (acts as primary key)
     id = Column(String, primary_key=True, index=True)
 
+    # Ledger shard the block belongs to (0 = the only chain when sharding is off)
+    shard = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Position in the shard's chain (1 = first block)
+    height = Column(Integer, nullable=False, index=True)
+
     # Transaction ID from the transactions table (foreign key)
     transaction_id = Column(String, ForeignKey("transactions.id"), nullable=False)
 
@@ -17,3 +27,9 @@ class BlockModel(Base):
 
     # Timestamp when block was created
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+    # --- Canonical hash preimage in fixed binary form (NULL on blocks hashed by the legacy scheme) ---
+    # The block hash covers these, so validation never re-parses `timestamp` or hex strings
+    ts_micros = Column(BigInteger, nullable=True)          # Block time as integer microseconds since the epoch
+    prev_digest = Column(LargeBinary(32), nullable=True)   # Raw SHA-256 of the previous block (32 zero bytes at genesis)
+    digest = Column(LargeBinary(32), nullable=True)        # Raw SHA-256 of this block (`id` is its hex form)
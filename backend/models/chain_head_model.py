@@ -0,0 +1,21 @@
+# --- SQLAlchemy imports ---
+from sqlalchemy import Column, String, Integer
+from ..database.database import Base
+
+# --- ORM Model holding the current tip of each ledger shard's chain ---
+# Appenders lock their shard's row before reading the tip, which serializes
+# appends to one shard without locking the blockchain table or other shards.
+class ChainHeadModel(Base):
+    __tablename__ = "chain_head"
+
+    # Row identifier
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Ledger shard this head belongs to (0 = the only chain when sharding is off)
+    shard = Column(Integer, nullable=False, unique=True, default=0, server_default="0")
+
+    # Hash of the latest block ("0" while the chain is empty)
+    head_hash = Column(String, nullable=False)
+
+    # Height of the latest block (0 while the chain is empty)
+    height = Column(Integer, nullable=False)
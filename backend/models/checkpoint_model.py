@@ -0,0 +1,21 @@
+# --- SQLAlchemy imports ---
+from sqlalchemy import Column, String, Integer
+from ..database.database import Base
+
+# --- ORM Model pinning the block hash at every K-th height ---
+# A block hash commits to every block before it, so a pinned hash is a
+# cumulative checkpoint: any rewrite of earlier history changes it.
+class CheckpointModel(Base):
+    __tablename__ = "blockchain_checkpoints"
+
+    # Ledger shard of the checkpointed block
+    shard = Column(Integer, primary_key=True, default=0)
+
+    # Height of the checkpointed block within its shard
+    height = Column(Integer, primary_key=True)
+
+    # Hash of the block at that height when it was appended
+    block_hash = Column(String, nullable=False)
+
+    # HMAC-SHA256 (or plain SHA-256 without a key) over height and block hash
+    digest = Column(String, nullable=False)
@@ -0,0 +1,21 @@
+# --- SQLAlchemy imports ---
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from ..database.database import Base
+
+# --- ORM Model for committed transactions still waiting for their block ---
+# Rows are written in the same DB transaction as the payment and removed in
+# the same DB transaction that appends their block, so none is lost or doubled.
+class LedgerQueueModel(Base):
+    __tablename__ = "ledger_queue"
+
+    # Enqueue order (blocks are built oldest first)
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Transaction waiting to be recorded on the chain
+    transaction_id = Column(String, ForeignKey("transactions.id"), nullable=False, unique=True)
+
+    # Ledger shard the block will be appended to (hash of the merchant ID)
+    shard = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+
+    # Transaction timestamp, reused as the block timestamp
+    timestamp = Column(DateTime(timezone=True), nullable=False)
@@ -7,7 +7,7 @@ from ..database.database import Base
 class MerchantModel(Base):
     __tablename__ = 'merchants'  # Name of the table in the PostgreSQL database
 
-    # --- Primary key: Unique Merchant ID (generated using SHA256, 16-digit hex) ---
+    # --- Primary key: Unique Merchant ID (time-ordered 16-digit hex, utils.id_generator) ---
     id = Column(String, primary_key=True, index=True)
 
     # --- Name of the merchant (used for hashing and display) ---
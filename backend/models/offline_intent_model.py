@@ -0,0 +1,30 @@
+# --- SQLAlchemy imports ---
+from sqlalchemy import Column, String, DateTime
+from ..database.database import Base
+
+# --- ORM Model recording every offline payment intent already processed ---
+# Terminals re-send whole batches after a dropped connection; the stored
+# outcome is returned for replays instead of charging the user twice.
+class OfflineIntentModel(Base):
+    __tablename__ = "offline_intents"
+
+    # Terminal that queued the intent
+    terminal_id = Column(String, primary_key=True)
+
+    # Intent ID, unique per terminal
+    intent_id = Column(String, primary_key=True)
+
+    # "settled" or "rejected"
+    status = Column(String, nullable=False)
+
+    # Transaction created for a settled intent
+    transaction_id = Column(String, nullable=True)
+
+    # Rejection reason
+    detail = Column(String, nullable=True)
+
+    # When the terminal queued the intent (device clock)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+
+    # When the bank processed it
+    processed_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,24 @@
+# --- SQLAlchemy imports ---
+from sqlalchemy import Column, String, Float, Integer, DateTime
+from ..database.database import Base
+
+# --- ORM Model representing a merchant settlement rollup bucket ---
+# One row per (merchant, granularity, bucket start); kept up to date in the
+# same DB transaction as every payment so totals never need a full table scan.
+class SettlementRollupModel(Base):
+    __tablename__ = "merchant_settlements"
+
+    # --- MID of the merchant the bucket belongs to ---
+    mid = Column(String, primary_key=True)
+
+    # --- Bucket size: "hour" or "day" ---
+    granularity = Column(String, primary_key=True)
+
+    # --- Start of the bucket (truncated transaction timestamp) ---
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+
+    # --- Sum of all transaction amounts in the bucket ---
+    total_amount = Column(Float, nullable=False, default=0.0)
+
+    # --- Number of transactions in the bucket ---
+    transaction_count = Column(Integer, nullable=False, default=0)
@@ -1,13 +1,37 @@
 # --- Import necessary components from SQLAlchemy ---
 from sqlalchemy import Column, String, Float, DateTime, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.sql.functions import FunctionElement
 from ..database.database import Base
 
+
+# --- Database clock at the moment a row is inserted (not the start of its DB transaction, as now() is) ---
+class ingest_clock(FunctionElement):
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(ingest_clock)
+def _ingest_clock_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(ingest_clock, "postgresql")
+def _ingest_clock_postgresql(element, compiler, **kw):
+    return "clock_timestamp()"
+
+
+@compiles(ingest_clock, "sqlite")
+def _ingest_clock_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"       # UTC with milliseconds; CURRENT_TIMESTAMP drops them
+
+
 # --- Define the TransactionModel representing a transaction entry in the database ---
 class TransactionModel(Base):
     __tablename__ = "transactions"  # Name of the table in the PostgreSQL database
 
-    # --- Primary key: unique transaction ID (could be a SHA256 hash) ---
+    # --- Primary key: unique, time-ordered transaction ID (utils.id_generator) ---
     id = Column(String, primary_key=True, index=True)
 
     # --- UID of the user who is making the payment ---
@@ -21,3 +45,7 @@ class TransactionModel(Base):
 
     # --- Timestamp of when the transaction was created (auto set using PostgreSQL NOW()) ---
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+    # --- When the row reached this database, set by the server at insert (follows ingestion, not payment time) ---
+    # Bulk imports keep the partner's original timestamps, so incremental exports watermark on this instead
+    ingested_at = Column(DateTime(timezone=True), server_default=ingest_clock(), index=True)
@@ -6,7 +6,7 @@ from ..database.database import Base  # Import shared declarative base for table
 class UserModel(Base):
     __tablename__ = "users"  # Table name in PostgreSQL
 
-    # --- Primary key: UID (User ID), 16-char hex string generated using SHA256 ---
+    # --- Primary key: UID (User ID), 16-char time-ordered hex string (utils.id_generator) ---
     id = Column(String, primary_key=True, index=True)
 
     # --- Name of the user ---
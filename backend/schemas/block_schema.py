@@ -4,6 +4,8 @@ from datetime import datetime
 # --- Schema for blockchain block ---
 class Block(BaseModel):
     id: str
+    shard: int = 0
+    height: int
     transaction_id: str
     prev_hash: str
     timestamp: datetime
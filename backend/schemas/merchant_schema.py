@@ -19,7 +19,7 @@ class MerchantUpdate(MerchantBase):
 
 # --- Schema used when returning merchant data from the database (output format) ---
 class Merchant(MerchantBase):
-    id: str                     # Unique merchant ID (MID), generated using SHA256
+    id: str                     # Unique, time-ordered merchant ID (MID)
     created_at: datetime        # Account creation timestamp (PostgreSQL-compatible)
 
     class Config:
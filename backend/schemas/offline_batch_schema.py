@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+# --- Envelope posted by a terminal when it syncs its offline queue ---
+class OfflineBatchEnvelope(BaseModel):
+    terminal_id: str          # Terminal that sealed the batch (selects the decryption key)
+    nonce: str                # AES-GCM nonce (hex)
+    ciphertext: str           # Encrypted batch followed by the GCM tag (hex)
+
+# --- One payment intent inside a decrypted batch ---
+class OfflineIntent(BaseModel):
+    intent_id: str            # Unique per terminal; replays are answered from the dedup table
+    mmid: str                 # MMID of the paying user
+    pin: str                  # User's PIN (plaintext inside the encrypted envelope)
+    amount: float             # Amount to be transferred
+    encrypted_mid: str        # Encrypted Merchant ID from the scanned QR code
+    created_at: datetime | None = None    # When the terminal queued it
+
+# --- Decrypted batch contents ---
+class OfflineBatch(BaseModel):
+    batch_id: str
+    intents: list[OfflineIntent]
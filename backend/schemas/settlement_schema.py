@@ -0,0 +1,14 @@
+# --- Import Pydantic BaseModel for defining response schemas ---
+from pydantic import BaseModel
+from datetime import datetime
+
+# --- Schema used when returning a merchant settlement bucket ---
+class Settlement(BaseModel):
+    mid: str                    # Merchant ID the totals belong to
+    granularity: str            # Bucket size ("hour" or "day")
+    bucket_start: datetime      # Start of the bucket
+    total_amount: float         # Sum of transaction amounts in the bucket
+    transaction_count: int      # Number of transactions in the bucket
+
+    class Config:
+        orm_mode = True         # Enables compatibility with SQLAlchemy ORM models
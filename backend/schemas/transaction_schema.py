@@ -1,5 +1,5 @@
 # --- Import Pydantic BaseModel for defining request/response schemas ---
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime  # To represent timestamp using datetime for PostgreSQL
 
 # --- Base schema shared by all transaction-related operations ---
@@ -12,9 +12,14 @@ class TransactionBase(BaseModel):
 class TransactionCreate(TransactionBase):
     pass  # Inherits everything from TransactionBase with no additional fields
 
+# --- Schema for one record of a bulk import (POST /transactions/bulk) ---
+class TransactionBulkRecord(TransactionBase):
+    id: str | None = Field(None, min_length=1)  # Partner's transaction ID, so re-imports are skipped (defaults to a new ID)
+    timestamp: datetime | None = None  # Original transaction time from the partner bank (defaults to now)
+
 # --- Schema used when returning transaction data (response model) ---
 class Transaction(TransactionBase):
-    id: str                   # Unique Transaction ID (can be SHA256 hash)
+    id: str                   # Unique, time-ordered Transaction ID
     timestamp: datetime       # Time when the transaction occurred
 
     class Config:
@@ -0,0 +1,45 @@
+"""
+Adds blockchain checkpoints (every LEDGER_CHECKPOINT_INTERVAL blocks) to a
+chain built before checkpoints existed. Stops at the first invalid block.
+
+Usage (from the repository root):
+    python -m backend.scripts.backfill_checkpoints [--batch-size 10000]
+"""
+# --- Imports ---
+import argparse
+import sys
+import time
+
+from ..database.database import SessionLocal
+from ..models.transaction_model import TransactionModel  # noqa: F401 (resolves the block foreign key)
+from ..blockchain.chain_writer import LEDGER_CHECKPOINT_INTERVAL
+from ..blockchain.checkpoints import backfill_checkpoints
+from ..blockchain.validation import ledger_shards
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Backfill blockchain checkpoints")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Blocks streamed per round trip")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    failed = False
+    try:
+        for shard in ledger_shards(db):
+            start = time.perf_counter()
+            result = backfill_checkpoints(db, shard, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+
+            print(f"Shard {shard}: checked {result['blocks_checked']} blocks, added {result['added']} checkpoints "
+                  f"(every {LEDGER_CHECKPOINT_INTERVAL} blocks) in {elapsed:.2f}s")
+            if result["invalid_height"] is not None:
+                print(f"  Stopped at invalid block {result['invalid_height']}; later blocks were not checkpointed")
+                failed = True
+    finally:
+        db.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
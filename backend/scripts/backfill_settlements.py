@@ -0,0 +1,33 @@
+"""
+Rebuilds the merchant settlement rollups from the transactions table.
+
+Usage (from the repository root):
+    python -m backend.scripts.backfill_settlements [--batch-size 10000]
+"""
+# --- Imports ---
+import argparse
+import time
+
+from ..database.database import SessionLocal
+from ..settlement.rollups import rebuild_rollups
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Backfill merchant settlement rollups")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows streamed per round trip")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        processed = rebuild_rollups(db, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"Aggregated {processed} transactions into settlement rollups in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmarks chain validation throughput (blocks/s) for:
+
+    orm-float     the original validator: full BlockModel objects, hash input
+                  rebuilt from `timestamp.timestamp()` floats
+    tuple-legacy  validate_shard on blocks hashed by the legacy scheme
+                  (plain tuples, but datetimes still parsed per row)
+    tuple-binary  validate_shard on blocks with binary preimages
+                  (integer microseconds and raw digests; the timestamp
+                  column is only compared with ts_micros, never hashed)
+
+on a throwaway SQLite database. Shard 0 holds a legacy chain, shard 1 the
+same number of blocks written by the current chain writer.
+
+Usage (from the repository root):
+    python -m backend.scripts.bench_block_validation [--blocks 100000] [--repeat 3]
+"""
+# --- Imports ---
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+
+# --- Seed a legacy chain (shard 0) and a binary-preimage chain (shard 1) ---
+def seed(blocks: int) -> None:
+    from ..database.database import Base, SessionLocal, engine
+    from ..models.transaction_model import TransactionModel
+    from ..models.block_model import BlockModel
+    from ..blockchain.chain_writer import GENESIS_PREV_HASH, compute_block_hash, lock_head, write_blocks
+    from ..utils.id_generator import next_id
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    start = datetime.now()
+    transactions = [{"id": next_id(), "uid": "benchuser", "mid": "benchmerchant", "amount": 1.0,
+                     "timestamp": start + timedelta(milliseconds=i)} for i in range(2 * blocks)]
+
+    legacy = []
+    prev_hash = GENESIS_PREV_HASH
+    for height, transaction in enumerate(transactions[:blocks], start=1):
+        block_hash = compute_block_hash(transaction["id"], prev_hash, transaction["timestamp"])
+        legacy.append({"id": block_hash, "shard": 0, "height": height, "transaction_id": transaction["id"],
+                       "prev_hash": prev_hash, "timestamp": transaction["timestamp"]})
+        prev_hash = block_hash
+
+    db = SessionLocal()
+    db.bulk_insert_mappings(TransactionModel, transactions)
+    db.bulk_insert_mappings(BlockModel, legacy)
+    db.commit()
+    write_blocks(db, lock_head(db, 1), [(row["id"], row["timestamp"]) for row in transactions[blocks:]], shard=1)
+    db.commit()
+    db.close()
+
+
+# --- The original validator: ORM hydration and float timestamps ---
+def validate_orm_float(db, shard: int) -> bool:
+    from hashlib import sha256
+    from ..models.block_model import BlockModel
+
+    blocks = db.query(BlockModel).filter(BlockModel.shard == shard).order_by(BlockModel.height).all()
+    for i in range(1, len(blocks)):
+        curr, prev = blocks[i], blocks[i - 1]
+        expected_hash = sha256(f"{curr.transaction_id}{prev.id}{curr.timestamp.timestamp()}".encode()).hexdigest()
+        if curr.prev_hash != prev.id or curr.id != expected_hash:
+            return False
+    return True
+
+
+# --- Best-of-N wall time of one validator ---
+def best_time(validate, repeat: int) -> tuple[float, bool]:
+    from ..database.database import SessionLocal
+
+    best, valid = float("inf"), False
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            valid = validate(db)
+            best = min(best, time.perf_counter() - started)
+        finally:
+            db.close()
+    return best, valid
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Block validation throughput benchmark")
+    parser.add_argument("--blocks", type=int, default=100000, help="Blocks per chain")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per validator (best is reported)")
+    parser.add_argument("--database-url", default="sqlite:////tmp/bench_block_validation.db",
+                        help="Throwaway database (all tables are recreated)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from ..blockchain.validation import validate_shard
+
+    seed(args.blocks)
+    validators = [
+        ("orm-float", lambda db: validate_orm_float(db, 0)),
+        ("tuple-legacy", lambda db: validate_shard(db, 0)["valid"]),
+        ("tuple-binary", lambda db: validate_shard(db, 1)["valid"]),
+    ]
+
+    print(f"{'validator':<14} {'seconds':>8} {'blocks/s':>10} {'speedup':>8}  valid")
+    baseline = None
+    for name, validate in validators:
+        elapsed, valid = best_time(validate, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<14} {elapsed:>8.3f} {args.blocks / elapsed:>10.0f} {baseline / elapsed:>7.1f}x  {valid}")
+
+
+if __name__ == "__main__":
+    main()
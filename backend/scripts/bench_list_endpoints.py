@@ -0,0 +1,112 @@
+"""
+Benchmarks GET /transactions/ and GET /blockchain/ against the previous
+implementation (ORM objects validated through the response_model and
+encoded with the default JSON encoder) on a throwaway SQLite database.
+
+Usage (from the repository root, requires httpx):
+    python -m backend.scripts.bench_list_endpoints [--rows 50000] [--repeat 3]
+"""
+# --- Imports ---
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+
+# --- Seed N transactions and a matching chain of blocks ---
+def seed(rows: int) -> None:
+    from ..database.database import Base, SessionLocal, engine
+    from ..models.transaction_model import TransactionModel
+    from ..models.block_model import BlockModel
+    from ..utils.id_generator import next_id
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    start = datetime.now()
+    transactions, blocks = [], []
+    prev_hash = "0"
+    for i in range(rows):
+        tid = next_id()
+        timestamp = start + timedelta(milliseconds=i)
+        transactions.append({"id": tid, "uid": f"user{i % 1000:012d}", "mid": f"merchant{i % 100:08d}",
+                             "amount": float(i % 5000) + 0.5, "timestamp": timestamp})
+        block_hash = f"{i:064x}"
+        blocks.append({"id": block_hash, "height": i + 1, "transaction_id": tid,
+                       "prev_hash": prev_hash, "timestamp": timestamp})
+        prev_hash = block_hash
+
+    db = SessionLocal()
+    db.bulk_insert_mappings(TransactionModel, transactions)
+    db.bulk_insert_mappings(BlockModel, blocks)
+    db.commit()
+    db.close()
+
+
+# --- Previous implementations, mounted side by side for comparison ---
+def legacy_router():
+    from fastapi import APIRouter, Depends
+    from sqlalchemy.orm import Session
+    from ..database.database import get_db
+    from ..models.transaction_model import TransactionModel
+    from ..models.block_model import BlockModel
+    from ..schemas.transaction_schema import Transaction
+    from ..schemas.block_schema import Block
+
+    router = APIRouter(prefix="/legacy")
+
+    @router.get("/transactions/", response_model=list[Transaction])
+    def legacy_transactions(db: Session = Depends(get_db)):
+        return db.query(TransactionModel).all()
+
+    @router.get("/blockchain/", response_model=list[Block])
+    def legacy_blockchain(db: Session = Depends(get_db)):
+        return db.query(BlockModel).order_by(BlockModel.height).all()
+
+    return router
+
+
+# --- Time one endpoint, returning the best of `repeat` runs ---
+def time_endpoint(client, path: str, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path)
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        count = len(response.json())
+        best = min(best, elapsed)
+    return best, count
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization")
+    parser.add_argument("--rows", type=int, default=50000, help="Transactions (and blocks) to seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per endpoint (best is reported)")
+    parser.add_argument("--database-url", default="sqlite:////tmp/bench_list.db",
+                        help="Throwaway database (all tables are recreated)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["BLOCK_BUILDER_ENABLED"] = "0"
+    from fastapi.testclient import TestClient
+    from ..main import app
+
+    seed(args.rows)
+    app.include_router(legacy_router())
+    client = TestClient(app)
+
+    print(f"{'endpoint':<16} {'before rows/s':>14} {'after rows/s':>14} {'speedup':>8}")
+    for name, before_path, after_path in [
+        ("/transactions/", "/legacy/transactions/", "/transactions/"),
+        ("/blockchain/", "/legacy/blockchain/", "/blockchain/"),
+    ]:
+        before, rows = time_endpoint(client, before_path, args.repeat)
+        after, _ = time_endpoint(client, after_path, args.repeat)
+        print(f"{name:<16} {rows / before:>14,.0f} {rows / after:>14,.0f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Exports the ledger (transactions, blockchain, checkpoints, anchors, pending
+ledger queue) as a compressed, chunked snapshot, or restores one into an
+empty database.
+
+Usage (from the repository root):
+    python -m backend.scripts.ledger_snapshot export <directory> [--chunk-rows 50000]
+    python -m backend.scripts.ledger_snapshot verify <directory> [--workers N]
+    python -m backend.scripts.ledger_snapshot restore <directory> [--workers N]
+
+Settlement rollups are not part of the snapshot; rebuild them after a
+restore with `python -m backend.scripts.backfill_settlements`.
+"""
+# --- Imports ---
+import argparse
+import json
+import os
+import sys
+import time
+
+from ..database.database import SessionLocal
+from ..blockchain.snapshot import export_snapshot, restore_snapshot, verify_snapshot
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Ledger snapshot export/restore")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write a snapshot of the current ledger")
+    export_parser.add_argument("directory")
+    export_parser.add_argument("--chunk-rows", type=int, default=50000, help="Rows per chunk file")
+
+    for name, help_text in [("verify", "Check a snapshot without loading it"),
+                            ("restore", "Verify and load a snapshot into an empty database")]:
+        command_parser = commands.add_parser(name, help=help_text)
+        command_parser.add_argument("directory")
+        command_parser.add_argument("--workers", type=int, default=None, help="Parallel verification processes")
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    if args.command == "verify":
+        with open(os.path.join(args.directory, "manifest.json")) as handle:
+            manifest = json.load(handle)
+        problems = verify_snapshot(args.directory, manifest, args.workers)
+        for problem in problems:
+            print(f"  - {problem}")
+        print(f"{'INVALID' if problems else 'OK'}: {manifest['height']} blocks in {len(manifest['heads'])} shard(s) "
+              f"({time.perf_counter() - started:.2f}s)")
+        sys.exit(1 if problems else 0)
+
+    db = SessionLocal()
+    try:
+        if args.command == "export":
+            manifest = export_snapshot(db, args.directory, chunk_rows=args.chunk_rows)
+            action = "Exported"
+        else:
+            manifest = restore_snapshot(db, args.directory, workers=args.workers)
+            action = "Restored"
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        db.close()
+
+    counts = ", ".join(f"{table}={info['rows']}" for table, info in manifest["tables"].items())
+    heads = ", ".join(f"shard {shard} at {head['height']}" for shard, head in sorted(manifest["heads"].items()))
+    print(f"{action} snapshot ({heads or 'empty chain'}): {counts} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
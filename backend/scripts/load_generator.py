@@ -0,0 +1,240 @@
+"""
+Synthetic end-to-end load for the full UPI flow, run against the app
+in-process on a throwaway SQLite database:
+
+    1. register users        POST /users/
+    2. register merchants    POST /merchant/
+    3. generate merchant QRs GET  /merchant-qr/{mid}
+    4. scan the QR images    POST /upi-machine/scan-qr/
+    5. pay                   POST /bank/process-transaction/ (concurrent, random payer/merchant)
+
+and prints latency percentiles and throughput per stage for capacity
+planning.
+
+Usage (from the repository root, requires httpx):
+    python -m backend.scripts.load_generator [--users 50] [--merchants 10]
+        [--payments 2000] [--concurrency 32]
+        [--amounts lognormal|uniform|fixed] [--amount-mean 250] [--amount-max 20000]
+        [--report-json report.json]
+
+Notes:
+    - Admission control is off unless RATE_LIMIT_ENABLED is set, since
+      every simulated terminal shares one client address.
+    - The app's startup hooks do not run, so blocks stay in ledger_queue
+      as they would with BLOCK_BUILDER_ENABLED=0 and a separate builder.
+    - Scanning needs the zbar shared library (pyzbar). Without it the scan
+      stage reports errors and payments use the encrypted MID from stage 3.
+    - Registration hashes passwords and PINs with bcrypt, and payments
+      verify the PIN with bcrypt, so both stages are CPU-bound by design.
+"""
+# --- Imports ---
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import time
+from hashlib import sha256
+
+PIN = "1234"
+
+
+# --- Percentile helper over a sorted list ---
+def percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# --- Latency samples and outcomes of one stage ---
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []          # Milliseconds per request
+        self.statuses = {}           # HTTP status (or exception name) -> count
+        self.started = None
+        self.finished = None
+
+    def record(self, started: float, outcome):
+        self.latencies.append((time.perf_counter() - started) * 1000)
+        self.statuses[outcome] = self.statuses.get(outcome, 0) + 1
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        elapsed = (self.finished or 0.0) - (self.started or 0.0)
+        ok = self.statuses.get(200, 0)
+        return {
+            "stage": self.name,
+            "requests": len(ordered),
+            "ok": ok,
+            "errors": {str(key): count for key, count in self.statuses.items() if key != 200},
+            "seconds": elapsed,
+            "throughput_rps": ok / elapsed if elapsed > 0 else 0.0,
+            "p50_ms": percentile(ordered, 50),
+            "p90_ms": percentile(ordered, 90),
+            "p99_ms": percentile(ordered, 99),
+            "max_ms": ordered[-1] if ordered else 0.0,
+        }
+
+
+# --- Run calls through a fixed number of concurrent workers, timing each one ---
+async def run_stage(stats: StageStats, calls: list, concurrency: int) -> list:
+    results = [None] * len(calls)
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(calls):
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await calls[index]()
+            except Exception as e:
+                stats.record(started, type(e).__name__)
+                continue
+            stats.record(started, response.status_code)
+            if response.status_code == 200:
+                results[index] = response.json()
+
+    stats.started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(calls))))))
+    stats.finished = time.perf_counter()
+    return results
+
+
+# --- Payment amount sampler ---
+def amount_sampler(kind: str, mean: float, maximum: float, rng: random.Random):
+    """
+    Args:
+        kind (str): "fixed", "uniform" (1 .. 2*mean) or "lognormal" (sigma 1,
+                    many small payments and a long tail of large ones)
+        mean (float): Target mean amount
+        maximum (float): Amounts are capped here (rupees)
+        rng (random.Random): Seeded generator, for repeatable runs
+    """
+    sigma = 1.0
+    mu = math.log(mean) - sigma ** 2 / 2          # Mean of the lognormal equals `mean`
+
+    def sample() -> float:
+        if kind == "fixed":
+            value = mean
+        elif kind == "uniform":
+            value = rng.uniform(1.0, 2 * mean)
+        else:
+            value = rng.lognormvariate(mu, sigma)
+        return round(min(max(value, 1.0), maximum), 2)
+
+    return sample
+
+
+# --- Full flow against one in-process app ---
+async def run_flow(args) -> list[dict]:
+    import httpx
+    from ..main import app
+    from ..database.database import Base, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)   # App errors become 500s
+    stages = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+        # --- 1. Users (MMID = sha256(UID + mobile)[:16], as the bank computes it) ---
+        stats = StageStats("register users")
+        mobiles = [f"9{i:09d}" for i in range(args.users)]
+        users = await run_stage(stats, [
+            lambda mobile=mobile: client.post("/users/", json={
+                "name": f"Load user {mobile}", "ifsc": "LOAD0000001", "balance": args.user_balance,
+                "mobile_number": mobile, "password": "load-password", "pin": PIN
+            }) for mobile in mobiles
+        ], args.concurrency)
+        stages.append(stats)
+        mmids = [sha256((user["id"] + user["mobile_number"]).encode()).hexdigest()[:16] for user in users if user]
+
+        # --- 2. Merchants ---
+        stats = StageStats("register merchants")
+        merchants = await run_stage(stats, [
+            lambda i=i: client.post("/merchant/", json={
+                "name": f"Load merchant {i}", "ifsc": "LOAD0000001", "balance": 0.0, "password": "load-password"
+            }) for i in range(args.merchants)
+        ], args.concurrency)
+        stages.append(stats)
+        mids = [merchant["id"] for merchant in merchants if merchant]
+
+        # --- 3. Merchant QR codes ---
+        stats = StageStats("generate QR")
+        qrs = await run_stage(stats, [lambda mid=mid: client.get(f"/merchant-qr/{mid}") for mid in mids],
+                              args.concurrency)
+        stages.append(stats)
+        qrs = [qr for qr in qrs if qr]
+
+        # --- 4. Scan each QR image as a UPI machine would ---
+        stats = StageStats("scan QR")
+        scans = await run_stage(stats, [
+            lambda qr=qr: client.post("/upi-machine/scan-qr/", files={
+                "file": ("qr.png", base64.b64decode(qr["qr_base64_png"]), "image/png")
+            }) for qr in qrs
+        ], args.concurrency)
+        stages.append(stats)
+        mismatched = sum(1 for qr, scan in zip(qrs, scans) if scan and scan["merchant_id"] != qr["mid"])
+        if mismatched:
+            stats.statuses["wrong MID"] = mismatched
+
+        # --- 5. Concurrent payments from random users to random merchants ---
+        stats = StageStats("pay")
+        if mmids and qrs:
+            sample_amount = amount_sampler(args.amounts, args.amount_mean, args.amount_max, rng)
+            payments = [
+                {"mmid": rng.choice(mmids), "pin": PIN, "amount": sample_amount(),
+                 "encrypted_mid": rng.choice(qrs)["encrypted_mid"]}
+                for _ in range(args.payments)
+            ]
+            await run_stage(stats, [
+                lambda payment=payment: client.post("/bank/process-transaction/", json=payment)
+                for payment in payments
+            ], args.concurrency)
+        stages.append(stats)
+
+    return [stage.summary() for stage in stages]
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end UPI load generator")
+    parser.add_argument("--users", type=int, default=50, help="Users registered through /users/")
+    parser.add_argument("--merchants", type=int, default=10, help="Merchants registered through /merchant/")
+    parser.add_argument("--payments", type=int, default=2000, help="Payments sent to /bank/process-transaction/")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight per stage")
+    parser.add_argument("--amounts", choices=["lognormal", "uniform", "fixed"], default="lognormal",
+                        help="Payment-size distribution")
+    parser.add_argument("--amount-mean", type=float, default=250.0, help="Mean payment amount")
+    parser.add_argument("--amount-max", type=float, default=20000.0, help="Largest payment amount")
+    parser.add_argument("--user-balance", type=float, default=1e9, help="Opening balance of each user")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for payers, merchants and amounts")
+    parser.add_argument("--report-json", default=None, help="Also write the report to this file")
+    parser.add_argument("--database-url", default="sqlite:////tmp/upi_load.db",
+                        help="Throwaway database (all tables are recreated)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    report = asyncio.run(run_flow(args))
+
+    print(f"{'stage':<20} {'requests':>8} {'ok':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}  errors")
+    for stage in report:
+        errors = ", ".join(f"{key}: {count}" for key, count in stage["errors"].items()) or "-"
+        print(f"{stage['stage']:<20} {stage['requests']:>8} {stage['ok']:>7} {stage['throughput_rps']:>8.1f} "
+              f"{stage['p50_ms']:>8.1f} {stage['p90_ms']:>8.1f} {stage['p99_ms']:>8.1f} {stage['max_ms']:>8.1f}  {errors}")
+
+    if args.report_json:
+        with open(args.report_json, "w") as handle:
+            json.dump({"settings": vars(args), "stages": report}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Load test for payment admission control: well-behaved terminals keep paying
+while one terminal floods /bank/process-transaction/, with the limiter on
+and off. Runs the app in-process against a throwaway SQLite database.
+
+Usage (from the repository root, requires httpx):
+    python -m backend.scripts.load_test_admission [--phase-seconds 5]
+        [--victims 20] [--flood-concurrency 50] [--flood-rate 300]
+
+The flood is open-loop at --flood-rate requests/s, because the load
+generator shares the interpreter with the app and an unpaced flood would
+measure the generator's own CPU use rather than the server's.
+"""
+# --- Imports ---
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from hashlib import sha256
+
+PIN = "1234"
+
+
+# --- Percentile helper over a sorted list ---
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# --- Seed victims, one attacker and a merchant directly through the ORM ---
+def seed(victims: int) -> tuple[list[str], str, str]:
+    from ..database.database import Base, SessionLocal, engine
+    from ..models.user_model import UserModel
+    from ..models.merchant_model import MerchantModel
+    from ..encryption.lwc_speck import encrypt_speck
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    db = SessionLocal()
+    hashed_pin = sha256(PIN.encode()).hexdigest()      # Bank route verifies SHA-256 PIN hashes
+    mmids = []
+    for i in range(victims + 1):
+        uid, mobile = f"loaduser{i:08d}", f"90000{i:05d}"
+        db.add(UserModel(id=uid, name=f"user {i}", ifsc="LOAD0000001", balance=1e9,
+                         password="x", mobile_number=mobile, pin=hashed_pin))
+        mmids.append(sha256((uid + mobile).encode()).hexdigest()[:16])
+    db.add(MerchantModel(id="loadmerchant0001", name="Load merchant", ifsc="LOAD0000001",
+                         balance=0.0, password="x"))
+    db.commit()
+    db.close()
+    return mmids[:-1], mmids[-1], encrypt_speck("loadmerchant0001")
+
+
+# --- Run one phase: victims pay at a steady pace while the attacker floods ---
+async def run_phase(app, victim_mmids, attacker_mmid, encrypted_mid, seconds, flood_concurrency, flood_rate) -> dict:
+    import httpx
+
+    victim_latencies = []
+    victim_errors = 0
+    attacker_counts = {"sent": 0, "rejected_429": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def victim(index, mmid):
+        nonlocal victim_errors
+        transport = httpx.ASGITransport(app=app, client=(f"10.0.{index // 250}.{index % 250 + 1}", 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            await asyncio.sleep(index / len(victim_mmids))        # Spread victims across each second
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.post("/bank/process-transaction/", json={
+                    "mmid": mmid, "pin": PIN, "amount": 1.0, "encrypted_mid": encrypted_mid
+                })
+                victim_latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    victim_errors += 1
+                await asyncio.sleep(max(0.0, 1.0 - (time.perf_counter() - started)))
+
+    async def attacker():
+        transport = httpx.ASGITransport(app=app, client=("203.0.113.9", 6000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            interval = flood_concurrency / flood_rate if flood_rate else 0.0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.post("/bank/process-transaction/", json={
+                    "mmid": attacker_mmid, "pin": "0000", "amount": 1.0, "encrypted_mid": encrypted_mid
+                }, headers={"X-Terminal-Id": "rogue-terminal"})
+                attacker_counts["sent"] += 1
+                attacker_counts["rejected_429"] += response.status_code == 429
+                await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+    tasks = [victim(i, mmid) for i, mmid in enumerate(victim_mmids)]
+    tasks += [attacker() for _ in range(flood_concurrency)]
+    await asyncio.gather(*tasks)
+
+    return {
+        "victim_requests": len(victim_latencies),
+        "victim_errors": victim_errors,
+        "victim_p50_ms": percentile(victim_latencies, 50),
+        "victim_p99_ms": percentile(victim_latencies, 99),
+        "victim_mean_ms": statistics.fmean(victim_latencies) if victim_latencies else 0.0,
+        **{f"attacker_{key}": value for key, value in attacker_counts.items()},
+    }
+
+
+# --- CLI entry point ---
+async def main_async(args):
+    from ..main import app
+    from ..utils.rate_limiter import payment_limiter
+
+    victim_mmids, attacker_mmid, encrypted_mid = seed(args.victims)
+
+    phases = [
+        ("baseline (no flood)", True, 0),
+        ("flood, limiter on", True, args.flood_concurrency),
+        ("flood, limiter off", False, args.flood_concurrency),
+    ]
+    print(f"{'phase':<22} {'victim req':>10} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'flood sent':>11} {'flood 429':>10}")
+    for name, limiter_on, concurrency in phases:
+        payment_limiter.enabled = limiter_on
+        result = await run_phase(app, victim_mmids, attacker_mmid, encrypted_mid,
+                                 args.phase_seconds, concurrency, args.flood_rate)
+        print(f"{name:<22} {result['victim_requests']:>10} {result['victim_errors']:>7} "
+              f"{result['victim_p50_ms']:>8.1f} {result['victim_p99_ms']:>8.1f} "
+              f"{result['attacker_sent']:>11} {result['attacker_rejected_429']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admission-control flood test")
+    parser.add_argument("--phase-seconds", type=float, default=5.0, help="Duration of each phase")
+    parser.add_argument("--victims", type=int, default=20, help="Well-behaved terminals paying once per second")
+    parser.add_argument("--flood-concurrency", type=int, default=50, help="Concurrent flooding connections")
+    parser.add_argument("--flood-rate", type=float, default=300.0, help="Offered flood requests per second (0 = unpaced)")
+    parser.add_argument("--database-url", default="sqlite:////tmp/admission_load.db",
+                        help="Throwaway database (all tables are recreated)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("BLOCK_BUILDER_ENABLED", "0")      # Keep ledger work out of the measurement
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
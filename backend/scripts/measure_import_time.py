@@ -0,0 +1,64 @@
+"""
+Measures the cold-start import time of backend.main for several router
+profiles, each in a fresh interpreter (like an autoscaled worker).
+
+Usage (from the repository root):
+    python -m backend.scripts.measure_import_time [--runs 5]
+        [--profile all --profile bank,blockchain ...]
+"""
+# --- Imports ---
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# --- Default profiles: full API vs. a payment node ---
+DEFAULT_PROFILES = ["all", "bank,blockchain"]
+
+
+# --- Import backend.main once in a fresh interpreter ---
+def measure_once(profile: str) -> tuple[float, float]:
+    """
+    Returns (cumulative import time of backend.main in ms, process wall time in ms).
+    """
+    env = dict(os.environ, ENABLED_ROUTERS=profile)
+    env.setdefault("DATABASE_URL", "sqlite://")    # Engine creation only; no connection is made
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import failed for profile {profile!r}:\n{completed.stderr[-2000:]}")
+
+    # --- "import time: self [us] | cumulative | imported package" ---
+    for line in completed.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "backend.main":
+            return int(parts[1]) / 1000, wall_ms
+    raise RuntimeError("backend.main not found in -X importtime output")
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend.main cold-start import time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per profile")
+    parser.add_argument("--profile", action="append", help="ENABLED_ROUTERS value (repeatable)")
+    args = parser.parse_args()
+
+    print(f"{'profile':<30} {'import ms (median)':>20} {'process ms (median)':>20}")
+    for profile in args.profile or DEFAULT_PROFILES:
+        samples = [measure_once(profile) for _ in range(args.runs)]
+        import_ms = statistics.median(sample[0] for sample in samples)
+        wall_ms = statistics.median(sample[1] for sample in samples)
+        print(f"{profile:<30} {import_ms:>20.1f} {wall_ms:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
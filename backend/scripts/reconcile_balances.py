@@ -0,0 +1,109 @@
+"""
+Reconciles stored user and merchant balances with the transactions table.
+
+`baseline` records every account's opening balance (stored balance minus
+the net flow of all transactions so far); `check` later recomputes the net
+flows and reports accounts whose balance no longer equals opening + flows.
+Transactions are streamed in chunks and aggregated with NumPy, so memory is
+bounded by the number of accounts, not the number of transactions.
+
+Usage (from the repository root):
+    python -m backend.scripts.reconcile_balances [--baseline-file balances_baseline.npz] baseline [--reset]
+    python -m backend.scripts.reconcile_balances [--baseline-file ...] check [--tolerance 0.005] [--report out.csv]
+
+`check` exits with status 1 when discrepancies are found.
+"""
+# --- Imports ---
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+from ..database.database import SessionLocal
+from ..settlement.reconciliation import build_baseline, reconcile
+
+
+# --- Record (or extend) the opening-balance baseline ---
+def run_baseline(args) -> int:
+    previous = None
+    if os.path.exists(args.baseline_file) and not args.reset:
+        previous = dict(np.load(args.baseline_file))
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        baseline, processed = build_baseline(db, previous, chunk_rows=args.chunk_rows)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    np.savez(args.baseline_file, **baseline)
+    print(f"Baseline for {len(baseline['user_ids'])} users and {len(baseline['merchant_ids'])} merchants "
+          f"({processed} transactions, {elapsed:.2f}s) written to {args.baseline_file}")
+    return 0
+
+
+# --- Compare balances against the baseline and report discrepancies ---
+def run_check(args) -> int:
+    if not os.path.exists(args.baseline_file):
+        print(f"No baseline at {args.baseline_file}; run the baseline subcommand first", file=sys.stderr)
+        return 2
+    baseline = dict(np.load(args.baseline_file))
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = reconcile(db, baseline, tolerance=args.tolerance, chunk_rows=args.chunk_rows)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    discrepancies = result["discrepancies"]
+    print(f"Reconciled {result['transactions']} transactions in {elapsed:.2f}s "
+          f"({result['transactions'] / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"Discrepancies: {len(discrepancies)} "
+          f"(total {sum(abs(item['difference']) for item in discrepancies):.2f})")
+    for item in discrepancies[:args.top]:
+        print(f"  {item['kind']:<8} {item['id']:<20} stored {item['stored']:>14.2f} "
+              f"expected {item['expected']:>14.2f} diff {item['difference']:>+12.2f}")
+
+    for kind, count in result["unbaselined"].items():
+        if count:
+            print(f"{count} {kind} account(s) have no baseline yet (run baseline to add them)")
+    for kind, orphans in result["orphan_flows"].items():
+        if orphans:
+            print(f"{len(orphans)} {kind} ID(s) in transactions have no account row")
+
+    if args.report:
+        with open(args.report, "w", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=["kind", "id", "stored", "expected", "difference"])
+            writer.writeheader()
+            writer.writerows(discrepancies)
+        print(f"Full report written to {args.report}")
+    return 1 if discrepancies else 0
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile account balances with transaction history")
+    parser.add_argument("--baseline-file", default="balances_baseline.npz", help="Opening-balance baseline file")
+    parser.add_argument("--chunk-rows", type=int, default=100000, help="Transactions aggregated per chunk")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    baseline = commands.add_parser("baseline", help="Record opening balances for accounts not yet in the baseline")
+    baseline.add_argument("--reset", action="store_true", help="Recompute every account's opening balance")
+
+    check = commands.add_parser("check", help="Report balances that drifted from baseline + net flows")
+    check.add_argument("--tolerance", type=float, default=0.005, help="Absolute difference ignored as rounding")
+    check.add_argument("--top", type=int, default=20, help="Largest discrepancies printed")
+    check.add_argument("--report", help="Write every discrepancy to this CSV file")
+
+    args = parser.parse_args()
+    sys.exit(run_baseline(args) if args.command == "baseline" else run_check(args))
+
+
+if __name__ == "__main__":
+    main()
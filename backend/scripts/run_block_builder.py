@@ -0,0 +1,38 @@
+"""
+Runs the block builder as a dedicated process (set BLOCK_BUILDER_ENABLED=0
+on the API workers when using it).
+
+Usage (from the repository root):
+    python -m backend.scripts.run_block_builder [--batch-size 500] [--poll-seconds 0.5] [--shards 0,1]
+
+With LEDGER_SHARDS > 1, several builder processes can split the shards
+between them with --shards.
+"""
+# --- Imports ---
+import argparse
+import logging
+
+from ..blockchain.block_builder import BLOCK_BUILDER_BATCH_SIZE, BLOCK_BUILDER_POLL_SECONDS, BlockBuilder
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Drain the ledger queue into blockchain blocks")
+    parser.add_argument("--batch-size", type=int, default=BLOCK_BUILDER_BATCH_SIZE, help="Blocks per DB transaction")
+    parser.add_argument("--poll-seconds", type=float, default=BLOCK_BUILDER_POLL_SECONDS, help="Idle poll interval")
+    parser.add_argument("--shards", help="Comma-separated shards to drain (default: all)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    shards = [int(shard) for shard in args.shards.split(",")] if args.shards else None
+    builder = BlockBuilder(batch_size=args.batch_size, poll_seconds=args.poll_seconds, shards=shards)
+    try:
+        builder.run_until_stopped()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        builder.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Seals a batch of payment intents the way an offline UPI machine does, for
+provisioning and testing /bank/process-batch/.
+
+Usage (from the repository root):
+    python -m backend.scripts.seal_offline_batch key <terminal_id>
+    python -m backend.scripts.seal_offline_batch seal <terminal_id> <intents.json> [--terminal-key HEX]
+
+`key` prints the terminal key derived from UPI_TERMINAL_MASTER_KEY (install
+it on the terminal). `seal` reads {"batch_id": ..., "intents": [...]} or a
+bare list of intents and prints the envelope to POST.
+"""
+# --- Imports ---
+import argparse
+import json
+import uuid
+
+from ..encryption.offline_batch import derive_terminal_key, seal_batch
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Offline UPI machine batch sealing")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    key_parser = commands.add_parser("key", help="Print the derived key for a terminal")
+    key_parser.add_argument("terminal_id")
+
+    seal_parser = commands.add_parser("seal", help="Encrypt and authenticate a batch of intents")
+    seal_parser.add_argument("terminal_id")
+    seal_parser.add_argument("intents_file")
+    seal_parser.add_argument("--terminal-key", help="Terminal key (hex); derived from the master key if omitted")
+
+    args = parser.parse_args()
+    if args.command == "key":
+        print(derive_terminal_key(args.terminal_id).hex())
+        return
+
+    with open(args.intents_file) as handle:
+        batch = json.load(handle)
+    if isinstance(batch, list):
+        batch = {"batch_id": uuid.uuid4().hex, "intents": batch}
+
+    key = bytes.fromhex(args.terminal_key) if args.terminal_key else None
+    print(json.dumps(seal_batch(args.terminal_id, batch, key)))
+
+
+if __name__ == "__main__":
+    main()
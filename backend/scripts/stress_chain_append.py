@@ -0,0 +1,137 @@
+"""
+Stress test for the chain-append coordinator: several processes append
+blocks concurrently, then the chain (every shard's chain with --shards N,
+worker i appending to shard i % N) is checked for forks and gaps.
+
+Usage (from the repository root):
+    python -m backend.scripts.stress_chain_append [--workers 8] [--appends 200] [--shards 1]
+        [--database-url sqlite:////tmp/chain_stress.db]
+
+Exits with status 1 if the resulting chain is not a single linear chain.
+"""
+# --- Imports ---
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+
+
+# --- Worker process: append one block per assigned transaction ---
+def _append_worker(database_url: str, transaction_ids: list[str], start_barrier, shard: int) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    from ..database.database import SessionLocal
+    from ..models.transaction_model import TransactionModel  # noqa: F401 (resolves the blocks' foreign key)
+    from ..blockchain.chain_writer import append_block
+
+    start_barrier.wait()     # Wait until every worker has finished importing
+    db = SessionLocal()
+    try:
+        for tid in transaction_ids:
+            append_block(db, tid, datetime.now(), shard)
+    finally:
+        db.close()
+
+
+# --- Check every shard chain is linear, gap-free and correctly hashed ---
+def check_chain(db, expected_blocks: int, shards: int = 1) -> list[str]:
+    from ..models.block_model import BlockModel
+    from ..blockchain.chain_writer import GENESIS_PREV_HASH, block_hash_matches
+
+    problems = []
+    found = 0
+    for shard in range(shards):
+        blocks = db.query(BlockModel).filter(BlockModel.shard == shard).order_by(BlockModel.height).all()
+        found += len(blocks)
+
+        children = {}
+        prev_hash = GENESIS_PREV_HASH
+        for position, block in enumerate(blocks, start=1):
+            children.setdefault(block.prev_hash, []).append(block.id)
+            if block.height != position:
+                problems.append(f"shard {shard}: gap or duplicate at height {position} (found {block.height})")
+            if block.prev_hash != prev_hash:
+                problems.append(f"shard {shard}: block {block.height} links to {block.prev_hash[:12]}, "
+                                f"expected {prev_hash[:12]}")
+            if not block_hash_matches(block):
+                problems.append(f"shard {shard}: block {block.height} hash does not match its contents")
+            prev_hash = block.id
+
+        forks = {parent: ids for parent, ids in children.items() if len(ids) > 1}
+        for parent, ids in forks.items():
+            problems.append(f"shard {shard}: fork: {len(ids)} blocks share prev_hash {parent[:12]}")
+
+    if found != expected_blocks:
+        problems.insert(0, f"expected {expected_blocks} blocks, found {found}")
+    return problems
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent chain-append stress test")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent appender processes")
+    parser.add_argument("--appends", type=int, default=200, help="Blocks appended per worker")
+    parser.add_argument("--shards", type=int, default=1, help="Ledger shards the workers append to")
+    parser.add_argument("--database-url", default="sqlite:////tmp/chain_stress.db",
+                        help="Throwaway database (its ledger tables are recreated)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from ..database.database import Base, SessionLocal, engine
+    from ..models.transaction_model import TransactionModel
+    from ..models.block_model import BlockModel
+    from ..models.chain_head_model import ChainHeadModel
+    from ..models.checkpoint_model import CheckpointModel
+    from ..utils.id_generator import next_id
+
+    # --- Fresh ledger tables plus the transactions the blocks will reference ---
+    tables = [TransactionModel.__table__, BlockModel.__table__, ChainHeadModel.__table__, CheckpointModel.__table__]
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
+
+    total = args.workers * args.appends
+    transaction_ids = [next_id() for _ in range(total)]
+    db = SessionLocal()
+    db.bulk_insert_mappings(TransactionModel, [
+        {"id": tid, "uid": "stress-user", "mid": "stress-merchant", "amount": 1.0, "timestamp": datetime.now()}
+        for tid in transaction_ids
+    ])
+    db.commit()
+
+    # --- Release all workers at once to maximize contention ---
+    context = multiprocessing.get_context("spawn")
+    start_barrier = context.Barrier(args.workers + 1)
+    workers = [
+        context.Process(
+            target=_append_worker,
+            args=(args.database_url, transaction_ids[i::args.workers], start_barrier, i % args.shards),
+        )
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    failed_workers = [worker.exitcode for worker in workers if worker.exitcode != 0]
+    problems = check_chain(db, total, args.shards)
+    db.close()
+
+    print(f"{args.workers} workers appended {total} blocks to {args.shards} shard(s) in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} blocks/s)")
+    if failed_workers:
+        problems.append(f"{len(failed_workers)} worker(s) exited with errors")
+    if problems:
+        print("CHAIN CHECK FAILED:")
+        for problem in problems[:20]:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("Every shard chain is linear: no forks, no gaps, all hashes valid")
+
+
+if __name__ == "__main__":
+    main()
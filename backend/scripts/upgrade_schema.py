@@ -0,0 +1,290 @@
+"""
+Upgrades an existing database to the current schema and backfills block
+heights, in one DB transaction:
+
+    1. creates the tables added since the baseline (chain_head, ledger_queue,
+       blockchain_checkpoints, ledger_anchors, merchant_settlements,
+       offline_intents)
+    2. adds the missing columns: blockchain.shard, .height, .ts_micros,
+       .prev_digest, .digest; chain_head.shard; ledger_queue.shard;
+       transactions.ingested_at (existing rows take their timestamp)
+    3. assigns heights to blocks without one by following prev_hash from
+       the genesis block ("0")
+    4. makes height NOT NULL (PostgreSQL) and unique per shard, replacing
+       the single-chain unique index on height
+    5. points each shard's chain_head row at its highest block
+
+Blocks written before this upgrade all belong to shard 0. A chain that
+forked (two blocks on the same parent, possible before appends were
+serialized) is reported and nothing is changed unless --allow-forks is
+given; then the earliest child at each fork continues the chain and the
+other blocks follow it in time order, where /blockchain/validate flags
+them. A blockchain_checkpoints table from before sharding is recreated
+empty; run backfill_checkpoints afterwards.
+
+Stop the API and block builders first. --dry-run prints the DDL and the
+height plan, then rolls back.
+
+Usage (from the repository root):
+    python -m backend.scripts.upgrade_schema [--dry-run] [--allow-forks] [--batch-size 10000]
+"""
+# --- Imports ---
+import argparse
+import sys
+import time
+
+from sqlalchemy import bindparam, create_engine, event, func, inspect, select, text, update
+
+from ..database.database import Base, engine
+from ..models import (anchor_model, ledger_queue_model, merchant_model, offline_intent_model,  # noqa: F401 (register tables)
+                      settlement_model, transaction_model, user_model)
+from ..models.block_model import BlockModel
+from ..models.chain_head_model import ChainHeadModel
+from ..models.checkpoint_model import CheckpointModel
+from ..blockchain.chain_writer import GENESIS_PREV_HASH
+
+# --- Columns added to pre-existing tables since the baseline (height becomes NOT NULL after the backfill) ---
+ADDED_COLUMNS = {
+    "blockchain": ["shard", "height", "ts_micros", "prev_digest", "digest"],
+    "chain_head": ["shard"],
+    "ledger_queue": ["shard"],
+}
+
+# --- Indexes the models declare on those columns (create_all only builds them with new tables) ---
+ADDED_INDEXES = {
+    "chain_head": "CREATE UNIQUE INDEX uq_chain_head_shard ON chain_head (shard)",
+    "ledger_queue": "CREATE INDEX ix_ledger_queue_shard ON ledger_queue (shard)",
+}
+
+
+# --- transactions.ingested_at: filled from timestamp, then stamped by the database on every insert ---
+# SQLite cannot add a column with a non-constant default, so a trigger stamps new rows there
+INGESTED_AT_DDL = {
+    "postgresql": [
+        "ALTER TABLE transactions ADD COLUMN ingested_at TIMESTAMP WITH TIME ZONE",
+        "UPDATE transactions SET ingested_at = timestamp",
+        "ALTER TABLE transactions ALTER COLUMN ingested_at SET DEFAULT clock_timestamp()",
+        "CREATE INDEX ix_transactions_ingested_at ON transactions (ingested_at)",
+    ],
+    "sqlite": [
+        "ALTER TABLE transactions ADD COLUMN ingested_at DATETIME",
+        "UPDATE transactions SET ingested_at = timestamp",
+        "CREATE TRIGGER transactions_ingested_at AFTER INSERT ON transactions WHEN NEW.ingested_at IS NULL "
+        "BEGIN UPDATE transactions SET ingested_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id; END",
+        "CREATE INDEX ix_transactions_ingested_at ON transactions (ingested_at)",
+    ],
+}
+
+
+# --- ALTER TABLE ... ADD COLUMN for one model column, in the connected dialect ---
+def add_column_ddl(table, name: str, dialect) -> str:
+    column = table.c[name]
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=dialect)}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg} NOT NULL"   # Existing rows take the default (shard 0)
+    return ddl
+
+
+# --- DDL needed before heights can be backfilled ---
+def column_changes(connection) -> list[str]:
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    statements = []
+
+    # A pre-sharding checkpoint table is keyed by height alone; create_all rebuilds it
+    checkpoints = CheckpointModel.__tablename__
+    if checkpoints in existing and "shard" not in {c["name"] for c in inspector.get_columns(checkpoints)}:
+        statements.append(f"DROP TABLE {checkpoints}")
+
+    for name, columns in ADDED_COLUMNS.items():
+        if name not in existing:
+            continue                    # create_all builds it whole
+        present = {column["name"] for column in inspector.get_columns(name)}
+        missing = [column for column in columns if column not in present]
+        statements += [add_column_ddl(Base.metadata.tables[name], column, connection.dialect) for column in missing]
+        if "shard" in missing and name in ADDED_INDEXES:
+            statements.append(ADDED_INDEXES[name])
+
+    if "transactions" in existing and "ingested_at" not in {c["name"] for c in inspector.get_columns("transactions")}:
+        statements += INGESTED_AT_DDL[connection.dialect.name]
+    return statements
+
+
+# --- Constraints on blockchain.height, once every block has one ---
+def height_constraints(connection) -> list[str]:
+    inspector = inspect(connection)
+    indexes = {index["name"]: index for index in inspector.get_indexes("blockchain")}
+    constraints = {constraint["name"] for constraint in inspector.get_unique_constraints("blockchain")}
+    postgres = connection.dialect.name == "postgresql"
+    statements = []
+
+    height = next(column for column in inspector.get_columns("blockchain") if column["name"] == "height")
+    if height["nullable"] and postgres:
+        statements.append("ALTER TABLE blockchain ALTER COLUMN height SET NOT NULL")   # SQLite cannot alter it
+
+    # Heights repeat across shards, so the single-chain unique index on height must go
+    old = indexes.get("ix_blockchain_height")
+    if old is not None and old["unique"]:
+        statements.append("DROP INDEX ix_blockchain_height")
+    if old is None or old["unique"]:
+        statements.append("CREATE INDEX ix_blockchain_height ON blockchain (height)")
+    if "blockchain_height_key" in constraints:
+        statements.append("ALTER TABLE blockchain DROP CONSTRAINT blockchain_height_key")
+
+    if "uq_blockchain_shard_height" not in constraints | set(indexes):
+        statements.append("ALTER TABLE blockchain ADD CONSTRAINT uq_blockchain_shard_height UNIQUE (shard, height)"
+                          if postgres else
+                          "CREATE UNIQUE INDEX uq_blockchain_shard_height ON blockchain (shard, height)")
+    return statements
+
+
+# --- Order legacy blocks by following prev_hash from a tip ---
+def plan_heights(blocks: list[tuple], start_hash: str, start_height: int) -> tuple[list[tuple[str, int]], list[str]]:
+    """
+    Args:
+        blocks (list[tuple]): (id, prev_hash, timestamp) of the blocks without a height
+        start_hash (str): Block to continue from (GENESIS_PREV_HASH for an empty chain)
+        start_height (int): Height of that block (0 at genesis)
+
+    Returns:
+        tuple: ([(block id, height)] in height order, [messages about forks and unreachable blocks])
+    """
+    children = {}
+    for block in blocks:
+        children.setdefault(block[1], []).append(block)
+
+    order, problems, stranded = [], [], []
+    tip, height = start_hash, start_height
+    while tip in children:
+        candidates = sorted(children.pop(tip), key=lambda block: (block[2], block[0]))
+        if len(candidates) > 1:
+            problems.append(f"Fork after height {height}: {len(candidates)} blocks share parent {tip}")
+            stranded += candidates[1:]
+        height += 1
+        order.append((candidates[0][0], height))
+        tip = candidates[0][0]
+
+    # Blocks on abandoned branches (and their descendants), or whose parent is missing
+    stranded += [block for group in children.values() for block in group]
+    if stranded:
+        problems.append(f"{len(stranded)} block(s) are not on the chain from {start_hash}")
+    for block in sorted(stranded, key=lambda block: (block[2], block[0])):
+        height += 1
+        order.append((block[0], height))
+    return order, problems
+
+
+# --- Assign heights to every block that has none (all pre-upgrade blocks are shard 0) ---
+def backfill_heights(connection, batch_size: int, allow_forks: bool) -> tuple[int, list[str]]:
+    blocks = connection.execute(
+        select(BlockModel.id, BlockModel.prev_hash, BlockModel.timestamp).where(BlockModel.height.is_(None))
+    ).all()
+    if not blocks:
+        return 0, []
+
+    tip = connection.execute(
+        select(BlockModel.id, BlockModel.height)
+        .where(BlockModel.shard == 0, BlockModel.height.is_not(None))
+        .order_by(BlockModel.height.desc())
+        .limit(1)
+    ).first()
+    order, problems = plan_heights(blocks, *(tuple(tip) if tip else (GENESIS_PREV_HASH, 0)))
+    if problems and not allow_forks:
+        return 0, problems
+
+    statement = (
+        update(BlockModel.__table__)
+        .where(BlockModel.__table__.c.id == bindparam("block_id"))
+        .values(shard=0, height=bindparam("block_height"))
+    )
+    for offset in range(0, len(order), batch_size):
+        connection.execute(statement, [{"block_id": block_id, "block_height": height}
+                                       for block_id, height in order[offset:offset + batch_size]])
+    return len(order), problems
+
+
+# --- Point every shard's chain_head row at its highest block ---
+def reset_chain_heads(connection) -> int:
+    heads = ChainHeadModel.__table__
+    tops = connection.execute(select(BlockModel.shard, func.max(BlockModel.height)).group_by(BlockModel.shard)).all()
+    for shard, height in tops:
+        head_hash = connection.execute(
+            select(BlockModel.id).where(BlockModel.shard == shard, BlockModel.height == height)
+        ).scalar_one()
+        updated = connection.execute(
+            heads.update().where(heads.c.shard == shard).values(head_hash=head_hash, height=height)
+        ).rowcount
+        if not updated:
+            connection.execute(heads.insert().values(shard=shard, head_hash=head_hash, height=height))
+    return len(tops)
+
+
+# --- Engine whose transactions also cover DDL ---
+def transactional_engine():
+    if engine.dialect.name != "sqlite":
+        return engine
+    # pysqlite only opens a transaction before DML, so ALTER TABLE would commit on its own
+    # (and survive a --dry-run or a failed backfill); begin explicitly instead
+    sqlite_engine = create_engine(engine.url)
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _manual_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sqlite_engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    return sqlite_engine
+
+
+# --- CLI entry point ---
+def main():
+    parser = argparse.ArgumentParser(description="Upgrade the database schema and backfill block heights")
+    parser.add_argument("--dry-run", action="store_true", help="Print the changes, then roll back")
+    parser.add_argument("--allow-forks", action="store_true",
+                        help="Backfill a forked chain anyway (off-chain blocks go last and fail validation)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Blocks updated per round trip")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    connection = transactional_engine().connect()
+    transaction = connection.begin()
+    try:
+        statements = column_changes(connection)
+        for statement in statements:
+            print(statement)
+            connection.execute(text(statement))
+        Base.metadata.create_all(connection)          # New tables only; existing ones are left alone
+
+        assigned, problems = backfill_heights(connection, args.batch_size, args.allow_forks)
+        for problem in problems:
+            print(problem)
+        if problems and not args.allow_forks:
+            print("The legacy chain is not linear; nothing was changed (see --allow-forks)")
+            transaction.rollback()
+            sys.exit(1)
+
+        for statement in height_constraints(connection):
+            print(statement)
+            connection.execute(text(statement))
+        shards = reset_chain_heads(connection)
+
+        if args.dry_run:
+            transaction.rollback()
+            print(f"Dry run: would assign {assigned} heights and reset {shards} chain head(s)")
+            return
+        transaction.commit()
+    except BaseException:
+        if transaction.is_active:
+            transaction.rollback()
+        raise
+    finally:
+        connection.close()
+
+    print(f"Assigned {assigned} block heights and reset {shards} chain head(s) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
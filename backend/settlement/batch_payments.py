@@ -0,0 +1,212 @@
+# --- Imports ---
+import os
+from collections import defaultdict
+from datetime import datetime
+from hashlib import sha256
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from ..blockchain.block_builder import enqueue_blocks
+from ..encryption.lwc_speck import decrypt_speck
+from ..encryption.password_context import verify_pin
+from ..models.merchant_model import MerchantModel
+from ..models.offline_intent_model import OfflineIntentModel
+from ..models.transaction_model import TransactionModel
+from ..models.user_model import UserModel
+from ..utils.id_generator import next_id
+from .rollups import record_payments
+
+# --- Largest batch accepted in one sync ---
+OFFLINE_BATCH_MAX_INTENTS = int(os.getenv("OFFLINE_BATCH_MAX_INTENTS", "500"))
+
+# --- Core tables for the executemany balance updates ---
+USERS = UserModel.__table__
+MERCHANTS = MerchantModel.__table__
+
+
+# --- Map the batch's MMIDs to UIDs in one pass over the users table ---
+def _resolve_mmids(db: Session, mmids: set[str]) -> dict:
+    # MMID = sha256(uid + mobile)[:16] is not stored, so it has to be computed;
+    # doing it once per batch replaces one full scan per payment.
+    resolved = {}
+    rows = db.execute(select(UserModel.id, UserModel.mobile_number).execution_options(yield_per=10000))
+    for uid, mobile in rows:
+        mmid = sha256((uid + mobile).encode()).hexdigest()[:16]
+        if mmid in mmids:
+            resolved[mmid] = uid
+            if len(resolved) == len(mmids):
+                break
+    rows.close()
+    return resolved
+
+
+# --- SQLSTATEs of conflicts that succeed when the batch is re-sent (deadlock, serialization failure) ---
+RETRYABLE_SQLSTATES = {"40P01", "40001"}
+
+
+# --- Whether a failed settlement only lost a race with concurrent writers ---
+def is_retryable_conflict(error: DBAPIError) -> bool:
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return code in RETRYABLE_SQLSTATES or "database is locked" in str(error.orig)
+
+
+# --- Settle a decrypted batch of offline payment intents ---
+def settle_offline_batch(db: Session, terminal_id: str, intents: list) -> dict:
+    """
+    Settles every new intent in the batch with a fixed number of statements
+    regardless of batch size: one dedup lookup, one MMID pass, one read of
+    the payers' PIN hashes, one locked read each of users and merchants,
+    then executemany balance updates and multi-row inserts of transactions,
+    queued blocks, rollups and intent outcomes, all committed together.
+
+    PINs are verified with bcrypt before any row is locked, so a large
+    batch never holds up online payments to the same accounts; rows are
+    then locked in ID order, so overlapping batches cannot deadlock.
+
+    Intents are checked in order against running balances, so several
+    payments by the same user within a batch cannot overdraw the account.
+    Only final outcomes are recorded for dedup. Intents rejected for a
+    balance shortfall (or an account changed mid-settlement) come back with
+    "retryable": True and can be re-sent in a later batch.
+
+    Args:
+        db (Session): DB session
+        terminal_id (str): Terminal the (already authenticated) batch came from
+        intents (list): OfflineIntent objects in the order they were queued
+
+    Returns:
+        dict: per-intent results (in input order) and the user / merchant IDs
+              whose balances changed
+
+    Raises:
+        IntegrityError: If the same intents are being settled concurrently
+        OperationalError: On lock conflicts (see is_retryable_conflict)
+    """
+    results = [None] * len(intents)
+
+    # --- Step 1: Replays are answered from the dedup table ---
+    processed = {
+        row.intent_id: row
+        for row in db.execute(
+            select(OfflineIntentModel)
+            .where(OfflineIntentModel.terminal_id == terminal_id,
+                   OfflineIntentModel.intent_id.in_({intent.intent_id for intent in intents}))
+        ).scalars()
+    }
+    pending = []
+    batch_ids = set()
+    for index, intent in enumerate(intents):
+        previous = processed.get(intent.intent_id)
+        if previous is not None:
+            results[index] = {"intent_id": intent.intent_id, "status": "duplicate",
+                              "original_status": previous.status, "transaction_id": previous.transaction_id,
+                              "detail": previous.detail, "retryable": False}
+        elif intent.intent_id in batch_ids:
+            results[index] = {"intent_id": intent.intent_id, "status": "rejected", "transaction_id": None,
+                              "detail": "Intent ID repeated within the batch", "retryable": False}
+        else:
+            batch_ids.add(intent.intent_id)
+            pending.append((index, intent))
+
+    # --- Step 2: Decrypt each distinct encrypted MID once ---
+    merchant_ids = {}
+    for encrypted_mid in {intent.encrypted_mid for _, intent in pending}:
+        try:
+            merchant_ids[encrypted_mid] = decrypt_speck(encrypted_mid)
+        except Exception:
+            merchant_ids[encrypted_mid] = None
+
+    # --- Step 3: Resolve MMIDs and verify each distinct (payer, PIN) once, before taking any lock ---
+    uid_by_mmid = _resolve_mmids(db, {intent.mmid for _, intent in pending}) if pending else {}
+    pin_hashes = dict(db.execute(
+        select(UserModel.id, UserModel.pin).where(UserModel.id.in_(set(uid_by_mmid.values())))
+    ).all())
+    pin_checks = {}                         # (uid, pin) -> bool; bcrypt runs once per pair
+    for _, intent in pending:
+        uid = uid_by_mmid.get(intent.mmid)
+        if uid is not None and (uid, intent.pin) not in pin_checks:
+            pin_checks[(uid, intent.pin)] = verify_pin(intent.pin, pin_hashes[uid])
+
+    # --- Step 4: Lock the payers, then the payees, in ID order ---
+    users = {
+        row.id: row
+        for row in db.execute(
+            select(UserModel.id, UserModel.pin, UserModel.balance)
+            .where(UserModel.id.in_({uid for (uid, _), valid in pin_checks.items() if valid}))
+            .order_by(UserModel.id)
+            .with_for_update()
+        )
+    }
+    merchants = set(db.execute(
+        select(MerchantModel.id)
+        .where(MerchantModel.id.in_({mid for mid in merchant_ids.values() if mid}))
+        .order_by(MerchantModel.id)
+        .with_for_update()
+    ).scalars())
+
+    # --- Step 5: Check intents in order against running balances ---
+    now = datetime.now()
+    balances = {uid: row.balance or 0.0 for uid, row in users.items()}
+    user_deltas = defaultdict(float)
+    merchant_deltas = defaultdict(float)
+    transactions = []
+    outcomes = []
+    for index, intent in pending:
+        uid = uid_by_mmid.get(intent.mmid)
+        mid = merchant_ids[intent.encrypted_mid]
+        detail, retryable = None, False
+        if intent.amount <= 0:
+            detail = "Amount must be positive"
+        elif mid is None:
+            detail = "Invalid encrypted MID"
+        elif uid is None:
+            detail = "User with MMID not found"
+        elif not pin_checks[(uid, intent.pin)]:
+            detail = "Invalid PIN"
+        elif uid not in users or users[uid].pin != pin_hashes[uid]:
+            detail, retryable = "Account changed during settlement", True   # PIN reset or user removed after the check
+        elif balances[uid] < intent.amount:
+            detail, retryable = "Insufficient balance", True
+        elif mid not in merchants:
+            detail = "Merchant not found"
+
+        tid = None
+        if detail is None:
+            tid = next_id()
+            balances[uid] -= intent.amount
+            user_deltas[uid] += intent.amount
+            merchant_deltas[mid] += intent.amount
+            transactions.append({"id": tid, "uid": uid, "mid": mid, "amount": intent.amount, "timestamp": now})
+
+        status = "rejected" if detail else "settled"
+        results[index] = {"intent_id": intent.intent_id, "status": status, "transaction_id": tid,
+                          "detail": detail, "retryable": retryable}
+        if not retryable:
+            outcomes.append({"terminal_id": terminal_id, "intent_id": intent.intent_id, "status": status,
+                             "transaction_id": tid, "detail": detail, "created_at": intent.created_at,
+                             "processed_at": now})
+
+    # --- Step 6: Apply everything with set-based statements in one DB transaction ---
+    try:
+        if user_deltas:
+            db.execute(
+                update(USERS).where(USERS.c.id == bindparam("b_id")).values(balance=USERS.c.balance - bindparam("b_delta")),
+                [{"b_id": uid, "b_delta": delta} for uid, delta in user_deltas.items()]
+            )
+            db.execute(
+                update(MERCHANTS).where(MERCHANTS.c.id == bindparam("b_id")).values(balance=MERCHANTS.c.balance + bindparam("b_delta")),
+                [{"b_id": mid, "b_delta": delta} for mid, delta in merchant_deltas.items()]
+            )
+            db.execute(insert(TransactionModel), transactions)
+            enqueue_blocks(db, [(row["id"], now, row["mid"]) for row in transactions])
+            record_payments(db, [(row["mid"], row["amount"], now) for row in transactions])
+        if outcomes:
+            db.execute(insert(OfflineIntentModel), outcomes)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"results": results, "users": set(user_deltas), "merchants": set(merchant_deltas)}
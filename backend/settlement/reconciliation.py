@@ -0,0 +1,163 @@
+# --- Imports ---
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.user_model import UserModel
+from ..models.merchant_model import MerchantModel
+from ..models.transaction_model import TransactionModel
+
+# --- Account kinds: balance table and the transactions column naming the account ---
+# Payments debit the user (uid) and credit the merchant (mid)
+ACCOUNT_KINDS = {
+    "user": (UserModel, TransactionModel.uid, -1.0),
+    "merchant": (MerchantModel, TransactionModel.mid, 1.0),
+}
+
+
+# --- Read all stored balances for one account kind, sorted by account ID ---
+def load_balances(db: Session, kind: str) -> tuple[np.ndarray, np.ndarray]:
+    model = ACCOUNT_KINDS[kind][0]
+    rows = db.execute(select(model.id, model.balance)).all()
+    ids = np.array([row[0] for row in rows], dtype=str)
+    balances = np.array([row[1] or 0.0 for row in rows], dtype=np.float64)
+    # Sorted in NumPy, not by ORDER BY: searchsorted needs NumPy's code-point order, not the DB collation's
+    order = np.argsort(ids, kind="stable")
+    return ids[order], balances[order]
+
+
+# --- Sum transaction amounts per account, streaming the table in chunks ---
+def net_flows(db: Session, account_ids: dict, chunk_rows: int = 100000) -> tuple[dict, dict, int]:
+    """
+    Aggregates the signed net flow of every account in one pass over the
+    transactions table. Each chunk is mapped onto the sorted account ID
+    arrays with searchsorted and summed with bincount, so memory stays at
+    one chunk plus one float per account however large the table is.
+
+    Args:
+        db (Session): DB session
+        account_ids (dict): Kind -> sorted array of account IDs
+        chunk_rows (int): Rows fetched and aggregated per chunk
+
+    Returns:
+        tuple: (kind -> net flow array aligned with account_ids[kind],
+                kind -> {unknown account ID: net flow}, rows processed)
+    """
+    flows = {kind: np.zeros(len(ids), dtype=np.float64) for kind, ids in account_ids.items()}
+    orphans = {kind: {} for kind in account_ids}
+    processed = 0
+
+    result = db.execute(
+        select(TransactionModel.uid, TransactionModel.mid, TransactionModel.amount)
+        .execution_options(stream_results=True, yield_per=chunk_rows)
+    )
+    for partition in result.partitions(chunk_rows):
+        uids, mids, amounts = zip(*partition)
+        amounts = np.array(amounts, dtype=np.float64)
+        processed += len(amounts)
+
+        for kind, column in (("user", uids), ("merchant", mids)):
+            ids, sign = account_ids[kind], ACCOUNT_KINDS[kind][2]
+            keys = np.array(column, dtype=str)
+            positions = np.searchsorted(ids, keys)
+            known = positions < len(ids)
+            known[known] = ids[positions[known]] == keys[known]
+
+            flows[kind] += sign * np.bincount(positions[known], weights=amounts[known], minlength=len(ids))
+
+            # Transactions naming accounts that no longer exist
+            if not known.all():
+                unknown_ids, inverse = np.unique(keys[~known], return_inverse=True)
+                sums = np.bincount(inverse, weights=amounts[~known])
+                for account_id, total in zip(unknown_ids.tolist(), sums.tolist()):
+                    orphans[kind][account_id] = orphans[kind].get(account_id, 0.0) + sign * total
+
+    return flows, orphans, processed
+
+
+# --- Read balances and flows from one consistent view of the database ---
+def _consistent_read(db: Session, chunk_rows: int) -> tuple[dict, dict, dict, int]:
+    if db.get_bind().dialect.name == "postgresql":
+        # Balances and transactions must come from the same snapshot
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    try:
+        balances = {kind: load_balances(db, kind) for kind in ACCOUNT_KINDS}
+        flows, orphans, processed = net_flows(db, {kind: ids for kind, (ids, _) in balances.items()}, chunk_rows)
+    finally:
+        db.rollback()
+    return balances, flows, orphans, processed
+
+
+# --- Record opening balances (balance minus all recorded flows) as the baseline ---
+def build_baseline(db: Session, previous: dict | None = None, chunk_rows: int = 100000) -> tuple[dict, int]:
+    """
+    Opening balance = stored balance - net flow of every transaction so far.
+    Later checks expect balance == opening + net flow, so the baseline never
+    needs a transaction watermark.
+
+    Args:
+        db (Session): DB session
+        previous (dict | None): Existing baseline; its accounts keep their
+            openings and only accounts missing from it are added
+        chunk_rows (int): Transactions aggregated per chunk
+
+    Returns:
+        tuple: (baseline dict of "<kind>_ids" / "<kind>_opening" arrays, rows processed)
+    """
+    balances, flows, _, processed = _consistent_read(db, chunk_rows)
+    baseline = {"created_at": np.array(datetime.now().isoformat())}
+
+    for kind, (ids, stored) in balances.items():
+        opening = stored - flows[kind]
+        if previous is not None:
+            old_ids, old_opening = previous[f"{kind}_ids"], previous[f"{kind}_opening"]
+            keep = np.isin(ids, old_ids)
+            opening[keep] = old_opening[np.searchsorted(old_ids, ids[keep])]
+        baseline[f"{kind}_ids"] = ids
+        baseline[f"{kind}_opening"] = opening
+    return baseline, processed
+
+
+# --- Compare stored balances with baseline + net flows ---
+def reconcile(db: Session, baseline: dict, tolerance: float = 0.005, chunk_rows: int = 100000) -> dict:
+    """
+    Args:
+        db (Session): DB session
+        baseline (dict): Output of build_baseline (or the loaded .npz file)
+        tolerance (float): Largest absolute difference treated as rounding
+        chunk_rows (int): Transactions aggregated per chunk
+
+    Returns:
+        dict: rows processed, discrepancies (kind, id, stored, expected,
+              difference) sorted by size, accounts without a baseline and
+              flows to accounts that no longer exist
+    """
+    balances, flows, orphans, processed = _consistent_read(db, chunk_rows)
+    discrepancies = []
+    unbaselined = {}
+
+    for kind, (ids, stored) in balances.items():
+        base_ids, base_opening = baseline[f"{kind}_ids"], baseline[f"{kind}_opening"]
+        positions = np.minimum(np.searchsorted(base_ids, ids), max(len(base_ids) - 1, 0))
+        has_base = (base_ids[positions] == ids) if len(base_ids) else np.zeros(len(ids), dtype=bool)
+        unbaselined[kind] = int((~has_base).sum())
+
+        expected = base_opening[positions[has_base]] + flows[kind][has_base]
+        difference = stored[has_base] - expected
+        bad = np.abs(difference) > tolerance
+        for account_id, actual, wanted, diff in zip(
+            ids[has_base][bad].tolist(), stored[has_base][bad].tolist(),
+            expected[bad].tolist(), difference[bad].tolist()
+        ):
+            discrepancies.append({"kind": kind, "id": account_id, "stored": actual,
+                                  "expected": wanted, "difference": diff})
+
+    discrepancies.sort(key=lambda item: abs(item["difference"]), reverse=True)
+    return {
+        "transactions": processed,
+        "discrepancies": discrepancies,
+        "unbaselined": unbaselined,
+        "orphan_flows": orphans,
+    }
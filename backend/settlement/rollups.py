@@ -0,0 +1,156 @@
+# --- Imports ---
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from ..models.settlement_model import SettlementRollupModel
+from ..models.transaction_model import TransactionModel
+
+# --- Supported bucket sizes ---
+GRANULARITIES = ("hour", "day")
+
+
+# --- Truncate a timestamp to the start of its bucket ---
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """
+    Returns the start of the hour/day bucket the timestamp falls into.
+
+    Args:
+        timestamp (datetime): Transaction timestamp
+        granularity (str): "hour" or "day"
+    """
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+# --- Collapse payments into per-bucket deltas ---
+def _aggregate(payments, deltas=None) -> dict:
+    if deltas is None:
+        deltas = defaultdict(lambda: [0.0, 0])
+    for mid, amount, timestamp in payments:
+        for granularity in GRANULARITIES:
+            delta = deltas[(mid, granularity, bucket_start(timestamp, granularity))]
+            delta[0] += amount
+            delta[1] += 1
+    return deltas
+
+
+# --- Turn aggregated deltas into insertable rows ---
+def _rows(deltas: dict) -> list[dict]:
+    return [
+        {
+            "mid": mid,
+            "granularity": granularity,
+            "bucket_start": start,
+            "total_amount": amount,
+            "transaction_count": count,
+        }
+        for (mid, granularity, start), (amount, count) in deltas.items()
+    ]
+
+
+# --- Dialect-specific INSERT ... ON CONFLICT DO UPDATE, if available ---
+def _upsert_statement(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(SettlementRollupModel)
+    return stmt.on_conflict_do_update(
+        index_elements=["mid", "granularity", "bucket_start"],
+        set_={
+            "total_amount": SettlementRollupModel.total_amount + stmt.excluded.total_amount,
+            "transaction_count": SettlementRollupModel.transaction_count + stmt.excluded.transaction_count,
+        },
+    )
+
+
+# --- Apply payments to the rollup table (caller owns the commit) ---
+def record_payments(db: Session, payments) -> None:
+    """
+    Adds a batch of payments to the hourly and daily rollups.
+
+    Runs inside the caller's DB transaction so the rollups commit (or roll
+    back) together with the payments themselves.
+
+    Args:
+        db (Session): Active DB session
+        payments (iterable): (mid, amount, timestamp) tuples
+    """
+    deltas = _aggregate(payments)
+    if not deltas:
+        return
+
+    rows = _rows(deltas)
+
+    upsert = _upsert_statement(db.get_bind().dialect.name)
+    if upsert is not None:
+        db.execute(upsert, rows)
+        return
+
+    # --- Fallback: increment in place, insert the buckets that don't exist yet ---
+    for row in rows:
+        result = db.execute(
+            update(SettlementRollupModel)
+            .where(
+                SettlementRollupModel.mid == row["mid"],
+                SettlementRollupModel.granularity == row["granularity"],
+                SettlementRollupModel.bucket_start == row["bucket_start"],
+            )
+            .values(
+                total_amount=SettlementRollupModel.total_amount + row["total_amount"],
+                transaction_count=SettlementRollupModel.transaction_count + row["transaction_count"],
+            )
+        )
+        if result.rowcount == 0:
+            db.execute(insert(SettlementRollupModel), [row])
+
+
+# --- Single-payment convenience wrapper ---
+def record_payment(db: Session, mid: str, amount: float, timestamp: datetime) -> None:
+    record_payments(db, [(mid, amount, timestamp)])
+
+
+# --- Recompute every rollup from the transactions table ---
+def rebuild_rollups(db: Session, batch_size: int = 10000) -> int:
+    """
+    Rebuilds the rollup table from scratch by streaming all transactions.
+
+    Existing rollups are replaced in the same DB transaction, so readers see
+    either the old or the new totals. Run it while payments are paused, or
+    payments committed during the rebuild may be miscounted.
+
+    Args:
+        db (Session): Active DB session
+        batch_size (int): Rows fetched per round trip
+
+    Returns:
+        int: Number of transactions aggregated
+    """
+    query = (
+        db.query(TransactionModel.mid, TransactionModel.amount, TransactionModel.timestamp)
+        .execution_options(stream_results=True)
+        .yield_per(batch_size)
+    )
+
+    deltas = defaultdict(lambda: [0.0, 0])
+    processed = 0
+    for payment in query:
+        _aggregate([payment], deltas)
+        processed += 1
+
+    db.execute(delete(SettlementRollupModel))
+    rows = _rows(deltas)
+    for i in range(0, len(rows), batch_size):
+        db.execute(insert(SettlementRollupModel), rows[i:i + batch_size])
+
+    db.commit()
+    return processed
@@ -0,0 +1,36 @@
+# --- Shared test setup: one throwaway SQLite database for the whole run ---
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/backend_test.db")
+os.environ.setdefault("UPI_TERMINAL_MASTER_KEY", "00112233445566778899aabbccddeeff")
+
+import pytest
+
+from backend.database.database import Base, SessionLocal, engine
+from backend.models import (anchor_model, block_model, chain_head_model, checkpoint_model,  # noqa: F401 (register tables)
+                            ledger_queue_model, merchant_model, offline_intent_model, settlement_model,
+                            transaction_model, user_model)
+
+
+# --- Every table recreated empty, and a session on it ---
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+# --- Switch the process's local time zone (restored after the test) ---
+@pytest.fixture
+def local_zone(monkeypatch):
+    def switch(name: str):
+        monkeypatch.setenv("TZ", name)
+        time.tzset()
+
+    yield switch
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,42 @@
+# --- Tests that binary-preimage blocks validate whatever the local time zone ---
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from backend.models.transaction_model import TransactionModel
+from backend.blockchain.chain_writer import append_blocks
+from backend.blockchain.validation import validate_shard
+from backend.utils.id_generator import next_id
+
+
+def _append_payments(db, times: list[datetime]) -> None:
+    entries = [(next_id(), moment) for moment in times]
+    db.execute(insert(TransactionModel), [{"id": tid, "uid": "u", "mid": "m", "amount": 1.0, "timestamp": moment}
+                                          for tid, moment in entries])
+    db.commit()
+    append_blocks(db, entries)
+
+
+# --- A chain written in one zone must still validate in another ---
+def test_chain_validates_after_time_zone_change(db, local_zone):
+    local_zone("Asia/Kolkata")
+    now = datetime.now()
+    _append_payments(db, [now + timedelta(milliseconds=i) for i in range(50)])
+    assert validate_shard(db, 0)["valid"]
+
+    local_zone("America/New_York")
+    result = validate_shard(db, 0)
+    assert result["valid"], result["message"]
+    assert result["blocks"] == 50
+
+
+# --- Payments in the repeated hour when clocks go back keep their fold only until stored ---
+def test_blocks_in_the_repeated_dst_hour_validate(db, local_zone):
+    local_zone("America/New_York")
+    first = datetime(2025, 11, 2, 1, 30)                # 05:30 UTC
+    second = datetime(2025, 11, 2, 1, 30, fold=1)       # 06:30 UTC, same wall clock
+    _append_payments(db, [first, second])
+
+    local_zone("Europe/London")
+    result = validate_shard(db, 0)
+    assert result["valid"], result["message"]
@@ -0,0 +1,87 @@
+# --- Tests for bulk transaction ingestion (POST /transactions/bulk) ---
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text
+
+from backend.api import transaction_routes
+from backend.models.settlement_model import SettlementRollupModel
+from backend.models.transaction_model import TransactionModel
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(transaction_routes.router)
+    return TestClient(app)
+
+
+def record(i: int, **fields) -> dict:
+    return {"uid": f"u{i}", "mid": "m0", "amount": 10.0, "timestamp": f"2026-10-01T10:00:{i % 60:02d}", **fields}
+
+
+def daily_total(db) -> tuple:
+    db.expire_all()
+    rollup = db.execute(
+        select(SettlementRollupModel.total_amount, SettlementRollupModel.transaction_count)
+        .where(SettlementRollupModel.mid == "m0", SettlementRollupModel.granularity == "day")
+    ).one()
+    return tuple(rollup)
+
+
+# --- A JSON array is inserted chunk by chunk, with one result per record in order ---
+def test_json_array_reports_each_record(client, db):
+    records = [record(i) for i in range(25)]
+    records[3] = {"uid": "u3"}                                   # Missing fields
+    records[7] = "not an object"
+
+    body = client.post("/transactions/bulk?chunk_size=10", json=records).json()
+    assert (body["received"], body["created"], body["duplicates"], body["rejected"]) == (25, 23, 0, 2)
+    assert [result["index"] for result in body["results"]] == list(range(25))
+    assert {result["index"] for result in body["results"] if result["status"] == "rejected"} == {3, 7}
+    assert db.scalar(select(func.count()).select_from(TransactionModel)) == 23
+    assert daily_total(db) == (230.0, 23)
+
+
+# --- NDJSON streams line by line; a malformed line only rejects itself ---
+def test_ndjson_stream_rejects_only_bad_lines(client, db):
+    lines = [json.dumps(record(i)) for i in range(12)]
+    lines[5] = "{not json"
+    body = client.post("/transactions/bulk?chunk_size=4", content="\n".join(lines) + "\n\n",
+                       headers={"content-type": "application/x-ndjson"}).json()
+
+    assert (body["received"], body["created"], body["rejected"]) == (12, 11, 1)
+    assert body["results"][5]["status"] == "rejected" and body["results"][5]["detail"].startswith("Invalid JSON")
+    assert daily_total(db) == (110.0, 11)
+
+
+# --- Partner IDs make re-imports idempotent: repeats are reported, not inserted or counted twice ---
+def test_duplicate_partner_ids_do_not_reject_the_chunk(client, db):
+    first = client.post("/transactions/bulk", json=[record(i, id=f"partner-{i}") for i in range(5)]).json()
+    assert first["created"] == 5
+
+    again = [record(i, id=f"partner-{i}") for i in range(3, 8)] + [record(9, id="partner-7")]
+    body = client.post("/transactions/bulk", json=again).json()
+    assert [result["status"] for result in body["results"]] == [
+        "duplicate", "duplicate", "created", "created", "created", "duplicate"
+    ]
+    assert body["results"][5]["detail"] == "Same transaction ID as record 4"
+    assert db.scalar(select(func.count()).select_from(TransactionModel)) == 8
+    assert daily_total(db) == (80.0, 8)
+
+
+# --- A record the database refuses is isolated; the rest of its chunk still commits ---
+def test_database_rejection_only_fails_the_offending_record(client, db):
+    db.execute(text("CREATE TRIGGER limit_amount BEFORE INSERT ON transactions WHEN NEW.amount > 1000 "
+                    "BEGIN SELECT RAISE(ABORT, 'amount over limit'); END"))
+    db.commit()
+
+    records = [record(i) for i in range(6)]
+    records[2]["amount"] = 5000.0
+    body = client.post("/transactions/bulk", json=records).json()
+
+    assert (body["created"], body["rejected"]) == (5, 1)
+    assert body["results"][2] == {"index": 2, "status": "rejected", "detail": "Insert failed: amount over limit"}
+    assert daily_total(db) == (50.0, 5)
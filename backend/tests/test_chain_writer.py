@@ -0,0 +1,39 @@
+# --- Tests that concurrent appenders extend a shard's chain without forking it ---
+import threading
+from datetime import datetime
+
+from backend.database.database import SessionLocal
+from backend.blockchain.chain_writer import append_block
+from backend.blockchain.validation import validate_shard
+from backend.scripts.stress_chain_append import check_chain
+from backend.utils.id_generator import next_id
+
+WORKERS = 8
+APPENDS = 25
+
+
+def test_concurrent_appends_to_one_shard_stay_linear(db):
+    barrier = threading.Barrier(WORKERS)
+    errors = []
+
+    def worker():
+        session = SessionLocal()             # One connection per appender, as API workers have
+        try:
+            barrier.wait()
+            for _ in range(APPENDS):
+                append_block(session, next_id(), datetime.now())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert check_chain(db, WORKERS * APPENDS) == []
+    result = validate_shard(db, 0)
+    assert result["valid"] and result["blocks"] == WORKERS * APPENDS
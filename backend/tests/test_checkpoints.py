@@ -0,0 +1,95 @@
+# --- Tests for localizing tampering with checkpoints (every 10 blocks here) ---
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from backend.blockchain import chain_writer
+from backend.blockchain.chain_writer import append_blocks, compute_block_digest
+from backend.blockchain.checkpoints import localize_tampering
+from backend.blockchain.validation import validate_shard
+from backend.models.block_model import BlockModel
+from backend.utils.id_generator import next_id
+
+SHARD = 1
+BLOCKS = 35          # Checkpoints at 10, 20 and 30
+
+
+@pytest.fixture
+def ledger(db, monkeypatch):
+    monkeypatch.setattr(chain_writer, "LEDGER_CHECKPOINT_INTERVAL", 10)
+    start = datetime.now()
+    append_blocks(db, [(next_id(), start + timedelta(milliseconds=i)) for i in range(BLOCKS)], shard=SHARD)
+    return db
+
+
+def edit_in_place(db, height: int) -> None:
+    db.execute(update(BlockModel).where(BlockModel.shard == SHARD, BlockModel.height == height)
+               .values(transaction_id=next_id()))
+    db.commit()
+
+
+# --- Swap one block's transaction and re-hash it and every later block, so the chain still links ---
+def rewrite_history(db, height: int) -> None:
+    blocks = db.execute(
+        select(BlockModel.id, BlockModel.height, BlockModel.transaction_id, BlockModel.prev_hash,
+               BlockModel.prev_digest, BlockModel.ts_micros)
+        .where(BlockModel.shard == SHARD, BlockModel.height >= height)
+        .order_by(BlockModel.height)
+    ).all()
+    prev_hash, prev_digest = blocks[0].prev_hash, blocks[0].prev_digest
+    for block in blocks:
+        transaction_id = next_id() if block.height == height else block.transaction_id
+        digest = compute_block_digest(transaction_id, prev_digest, block.ts_micros)
+        db.execute(update(BlockModel).where(BlockModel.id == block.id).values(
+            id=digest.hex(), transaction_id=transaction_id, prev_hash=prev_hash, prev_digest=prev_digest,
+            digest=digest
+        ))
+        prev_hash, prev_digest = digest.hex(), digest
+    db.commit()
+
+
+def test_intact_chain_only_rehashes_blocks_after_the_last_checkpoint(ledger):
+    result = localize_tampering(ledger, SHARD)
+    assert not result["tampered"]
+    assert (result["checkpoints_checked"], result["blocks_scanned"]) == (3, 5)
+    assert "blocks 1-30 were not re-hashed" in result["message"]
+
+
+# --- A re-hashed rewrite links perfectly, but the next checkpoint no longer matches ---
+def test_rewritten_history_is_localized_to_its_checkpointed_segment(ledger):
+    rewrite_history(ledger, 16)
+    assert validate_shard(ledger, SHARD)["valid"] is False       # Only the checkpoints give it away
+
+    result = localize_tampering(ledger, SHARD)
+    assert result["tampered"] and result["shard"] == SHARD
+    assert result["segment"] == [11, 20]
+    assert result["first_bad_height"] is None
+    assert result["message"].startswith("History rewritten between heights 11 and 20")
+
+
+# --- Editing the checkpointed block itself is pinned to its height ---
+def test_edit_to_a_checkpointed_block_is_pinned_to_its_height(ledger):
+    edit_in_place(ledger, 20)
+    result = localize_tampering(ledger, SHARD)
+    assert result["tampered"] and result["shard"] == SHARD
+    assert (result["first_bad_height"], result["segment"], result["blocks_scanned"]) == (20, [11, 20], 10)
+
+
+def test_edit_after_the_last_checkpoint_is_pinned_to_its_height(ledger):
+    edit_in_place(ledger, 33)
+    result = localize_tampering(ledger, SHARD)
+    assert result["tampered"] and result["first_bad_height"] == 33
+    assert result["segment"] == [31, None]
+
+
+# --- Documented blind spot: an in-place edit that keeps the block ID, inside an older segment ---
+def test_in_place_edit_in_an_older_segment_needs_full_validation(ledger):
+    edit_in_place(ledger, 14)
+
+    result = localize_tampering(ledger, SHARD)
+    assert not result["tampered"]
+    assert "blocks 1-30 were not re-hashed" in result["message"]
+
+    full = validate_shard(ledger, SHARD)
+    assert not full["valid"] and full["height"] == 14
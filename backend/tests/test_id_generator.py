@@ -0,0 +1,46 @@
+# --- Tests for the time-ordered ID generator ---
+import os
+
+from backend.utils import id_generator
+
+
+# --- Forked workers must never mint the same ID, even with WORKER_ID set ---
+def test_forked_workers_lease_distinct_worker_ids(tmp_path, monkeypatch):
+    monkeypatch.setenv("WORKER_ID", "64")
+    monkeypatch.setattr(id_generator, "WORKER_ID_LOCK_DIR", str(tmp_path))
+    id_generator._generator = id_generator.IdGenerator()
+    id_generator.next_id()                      # Parent leases an ID before forking
+
+    children = []
+    for _ in range(8):
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            ids = "\n".join(id_generator.next_id() for _ in range(250))
+            os.write(write_end, ids.encode())
+            os._exit(0)
+        os.close(write_end)
+        children.append((pid, read_end))
+
+    ids = [id_generator.next_id() for _ in range(250)]
+    for pid, read_end in children:
+        with os.fdopen(read_end) as pipe:
+            ids.extend(pipe.read().split())
+        os.waitpid(pid, 0)
+    assert len(ids) == 9 * 250
+    assert len(set(ids)) == len(ids)
+
+
+def test_exhausted_worker_id_range_fails_loudly(tmp_path, monkeypatch):
+    monkeypatch.setenv("WORKER_ID", "0")
+    monkeypatch.setattr(id_generator, "WORKER_ID_LOCK_DIR", str(tmp_path))
+    monkeypatch.setattr(id_generator, "WORKER_ID_SLOTS", 1)
+    first = id_generator.IdGenerator()
+    assert first.lease() == 0
+    try:
+        id_generator.IdGenerator().lease()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("second lease of a one-slot range should fail")
@@ -0,0 +1,114 @@
+# --- Tests for offline UPI machine batch settlement (/bank/process-batch/) ---
+from hashlib import sha256
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import bank_routes
+from backend.encryption.lwc_speck import encrypt_speck
+from backend.encryption.offline_batch import seal_batch
+from backend.models.merchant_model import MerchantModel
+from backend.models.offline_intent_model import OfflineIntentModel
+from backend.models.transaction_model import TransactionModel
+from backend.models.user_model import UserModel
+
+PIN = "1234"
+
+
+@pytest.fixture
+def client(db):
+    for i in range(2):
+        db.add(UserModel(id=f"user{i}", name=f"User {i}", ifsc="TEST0000001", balance=100.0, password="x",
+                         mobile_number=f"900000000{i}", pin=sha256(PIN.encode()).hexdigest()))
+    db.add(MerchantModel(id="merchant0", name="Merchant", ifsc="TEST0000001", balance=0.0, password="x"))
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(bank_routes.router)
+    return TestClient(app)
+
+
+def mmid(i: int) -> str:
+    return sha256(f"user{i}900000000{i}".encode()).hexdigest()[:16]
+
+
+def intent(intent_id: str, payer: int, amount: float, pin: str = PIN) -> dict:
+    return {"intent_id": intent_id, "mmid": mmid(payer), "pin": pin, "amount": amount,
+            "encrypted_mid": encrypt_speck("merchant0")}
+
+
+def post(client, intents: list, terminal_id: str = "T1", batch_id: str = "b1"):
+    return client.post("/bank/process-batch/", json=seal_batch(terminal_id, {"batch_id": batch_id, "intents": intents}))
+
+
+def balances(db) -> tuple:
+    db.expire_all()
+    return (db.get(UserModel, "user0").balance, db.get(UserModel, "user1").balance,
+            db.get(MerchantModel, "merchant0").balance)
+
+
+# --- Valid intents settle while bad ones are rejected individually ---
+def test_partial_rejection_settles_the_valid_intents(client, db):
+    response = post(client, [
+        intent("a", 0, 30.0),
+        intent("b", 1, 20.0, pin="0000"),
+        intent("c", 0, 80.0),                    # Only 70 left after "a"
+        intent("d", 1, -5.0),
+        intent("a", 1, 1.0),                     # Same intent ID twice in one batch
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["settled"], body["rejected"]) == (1, 4)
+    assert [result["detail"] for result in body["results"]] == [
+        None, "Invalid PIN", "Insufficient balance", "Amount must be positive", "Intent ID repeated within the batch"
+    ]
+    assert balances(db) == (70.0, 100.0, 30.0)
+    assert db.query(TransactionModel).count() == 1
+
+
+# --- Re-sending a batch returns the stored outcomes and moves no money ---
+def test_replayed_batch_is_answered_from_the_dedup_table(client, db):
+    first = post(client, [intent("a", 0, 10.0), intent("b", 1, 5.0, pin="0000")]).json()
+    replay = post(client, [intent("a", 0, 10.0), intent("b", 1, 5.0, pin="0000")], batch_id="b1-resent").json()
+
+    assert replay["duplicates"] == 2 and replay["settled"] == 0
+    assert [result["original_status"] for result in replay["results"]] == ["settled", "rejected"]
+    assert replay["results"][0]["transaction_id"] == first["results"][0]["transaction_id"]
+    assert balances(db) == (90.0, 100.0, 10.0)
+    assert db.query(TransactionModel).count() == 1
+
+
+# --- A balance shortfall is not final: the same intent can be sent again later ---
+def test_insufficient_balance_is_retryable(client, db):
+    rejected = post(client, [intent("big", 0, 150.0)]).json()["results"][0]
+    assert rejected["status"] == "rejected" and rejected["retryable"] is True
+    assert db.query(OfflineIntentModel).count() == 0
+
+    db.get(UserModel, "user0").balance = 200.0
+    db.commit()
+    retried = post(client, [intent("big", 0, 150.0)], batch_id="b2").json()["results"][0]
+    assert retried["status"] == "settled"
+    assert balances(db) == (50.0, 100.0, 150.0)
+
+
+# --- Intent IDs are deduplicated per terminal ---
+def test_intent_ids_are_scoped_to_the_terminal(client, db):
+    post(client, [intent("a", 0, 10.0)], terminal_id="T1")
+    other = post(client, [intent("a", 0, 10.0)], terminal_id="T2").json()
+    assert other["settled"] == 1
+    assert balances(db) == (80.0, 100.0, 20.0)
+
+
+# --- An envelope only opens for the terminal that sealed it, and only unaltered ---
+def test_wrong_terminal_and_tampered_envelopes_are_refused(client, db):
+    envelope = seal_batch("T1", {"batch_id": "b1", "intents": [intent("a", 0, 10.0)]})
+
+    moved = {**envelope, "terminal_id": "T2"}
+    assert client.post("/bank/process-batch/", json=moved).status_code == 401
+
+    flipped = "1" if envelope["ciphertext"][0] == "0" else "0"
+    tampered = {**envelope, "ciphertext": flipped + envelope["ciphertext"][1:]}
+    assert client.post("/bank/process-batch/", json=tampered).status_code == 401
+
+    assert balances(db) == (100.0, 100.0, 0.0)
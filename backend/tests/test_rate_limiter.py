@@ -0,0 +1,56 @@
+# --- Tests for payment admission control and client addresses behind proxies ---
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from backend.api import bank_routes
+from backend.utils import rate_limiter
+from backend.utils.rate_limiter import InMemoryBucketStore, client_address, parse_networks
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(rate_limiter.payment_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter.payment_limiter, "store", InMemoryBucketStore())
+    monkeypatch.setattr(rate_limiter.payment_limiter, "limits", {**rate_limiter.PAYMENT_LIMITS, "mmid": (0.5, 3)})
+    app = FastAPI()
+    app.include_router(bank_routes.router)
+    return TestClient(app)
+
+
+def request_from(peer: str, forwarded_for: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers, "client": (peer, 40000)})
+
+
+# --- A flood from one MMID is turned away before any PIN check, with a hint when to retry ---
+def test_flood_gets_429_with_retry_after(client):
+    payment = {"mmid": "0123456789abcdef", "pin": "1234", "amount": 1.0, "encrypted_mid": "00"}
+    statuses = [client.post("/bank/process-transaction/", json=payment).status_code for _ in range(3)]
+    assert 429 not in statuses
+
+    response = client.post("/bank/process-transaction/", json=payment)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"            # One token at 0.5 tokens/s
+
+    other = client.post("/bank/process-transaction/", json={**payment, "mmid": "fedcba9876543210"})
+    assert other.status_code != 429                          # Other payers keep their own bucket
+
+
+# --- X-Forwarded-For only counts when the connection comes from one of our proxies ---
+def test_forwarded_for_is_ignored_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "TRUSTED_PROXIES", [])
+    assert client_address(request_from("10.0.0.5", "203.0.113.7")) == "10.0.0.5"
+
+
+def test_forwarded_for_is_used_only_from_a_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "TRUSTED_PROXIES", parse_networks("10.0.0.0/24, 192.168.1.10"))
+
+    assert client_address(request_from("10.0.0.5", "203.0.113.7")) == "203.0.113.7"
+    # Spoofed hops to the left of the real client are skipped; our own proxies on the right are peeled off
+    assert client_address(request_from("10.0.0.5", "6.6.6.6, 203.0.113.7, 192.168.1.10")) == "203.0.113.7"
+    # A client talking to us directly cannot pick its own bucket
+    assert client_address(request_from("198.51.100.9", "203.0.113.7")) == "198.51.100.9"
+    # Nothing but proxies in the chain: the left-most hop is the best guess
+    assert client_address(request_from("10.0.0.5", "10.0.0.9")) == "10.0.0.9"
@@ -0,0 +1,60 @@
+# --- Tests for routing reads to a replica, with a second SQLite file standing in for it ---
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import database
+from backend.database.database import ReplicaMonitor, get_read_db
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    replica_engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    monitor = ReplicaMonitor(replica_engine, max_lag_seconds=5, check_seconds=60, probe_timeout_seconds=1)
+    monkeypatch.setattr(database, "replica_monitor", monitor)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=replica_engine))
+    yield monitor
+    replica_engine.dispose()
+
+
+def read_database(monitor: ReplicaMonitor) -> str:
+    if monitor.probe_thread is not None:
+        monitor.probe_thread.join()
+    dependency = get_read_db()
+    db = next(dependency)
+    try:
+        return db.get_bind().url.database
+    finally:
+        dependency.close()
+
+
+# --- Reads start on the primary and move to the replica once a probe has succeeded ---
+def test_reads_use_the_replica_once_it_is_known_healthy(replica):
+    assert read_database(replica) == database.engine.url.database      # Still probing
+    assert read_database(replica).endswith("replica.db")
+    assert replica.lag_seconds == 0.0
+
+
+# --- A lagging or unreachable replica sends reads back to the primary ---
+@pytest.mark.parametrize("lag", [30.0, None])
+def test_stale_or_unreachable_replica_falls_back_to_the_primary(replica, monkeypatch, lag):
+    monkeypatch.setattr(replica, "probe", lambda: lag)
+    read_database(replica)
+    assert read_database(replica) == database.engine.url.database
+
+
+# --- A hung replica never holds up a request, and its old verdict expires ---
+def test_slow_probe_does_not_block_requests(replica, monkeypatch):
+    read_database(replica)
+    assert read_database(replica).endswith("replica.db")
+
+    monkeypatch.setattr(replica, "probe", lambda: time.sleep(3) or 0.0)
+    replica.check_seconds = 0
+    start = time.monotonic()
+    assert replica.usable()                                  # Cached verdict, refresh started in the background
+    assert time.monotonic() - start < 0.5
+
+    replica._checked_at -= 2                                 # Refresh now overdue by more than the timeout
+    assert not replica.usable()
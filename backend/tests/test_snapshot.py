@@ -0,0 +1,102 @@
+# --- Tests for ledger snapshots: export, verify, restore, and refusing damaged chunks ---
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from hashlib import sha256
+
+import pytest
+from sqlalchemy import insert, select
+
+from backend.database.database import Base, engine
+from backend.blockchain import chain_writer
+from backend.blockchain.chain_writer import append_blocks
+from backend.blockchain.snapshot import SNAPSHOT_TABLES, export_snapshot, restore_snapshot, verify_snapshot
+from backend.blockchain.validation import validate_ledger
+from backend.models.chain_head_model import ChainHeadModel
+from backend.models.transaction_model import TransactionModel
+from backend.utils.id_generator import next_id
+
+
+@pytest.fixture
+def snapshot(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(chain_writer, "LEDGER_CHECKPOINT_INTERVAL", 10)
+    start = datetime.now()
+    for shard in range(2):
+        entries = [(next_id(), start + timedelta(milliseconds=i)) for i in range(25)]
+        db.execute(insert(TransactionModel), [{"id": tid, "uid": "u", "mid": f"m{shard}", "amount": 1.0,
+                                               "timestamp": moment} for tid, moment in entries])
+        db.commit()
+        append_blocks(db, entries, shard=shard)
+
+    directory = str(tmp_path / "snapshot")
+    manifest = export_snapshot(db, directory, chunk_rows=10)
+    return db, directory, manifest
+
+
+# --- Every restored row, minus the surrogate keys the target database generates ---
+def ledger_contents(db) -> dict:
+    contents = {}
+    for model in [model for model, _ in SNAPSHOT_TABLES.values()] + [ChainHeadModel]:
+        columns = [column for column in model.__table__.columns if column.autoincrement is not True]
+        contents[model.__tablename__] = sorted(tuple(row) for row in db.execute(select(*columns)))
+    return contents
+
+
+def empty_ledger(db) -> None:
+    db.close()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def test_snapshot_round_trip(snapshot):
+    db, directory, manifest = snapshot
+    assert {shard: head["height"] for shard, head in manifest["heads"].items()} == {"0": 25, "1": 25}
+    assert len(manifest["tables"]["blockchain"]["chunks"]) == 5
+    assert verify_snapshot(directory, manifest) == []
+
+    before = ledger_contents(db)
+    empty_ledger(db)
+    restore_snapshot(db, directory)
+
+    assert ledger_contents(db) == before
+    result = validate_ledger(db, processes=False)
+    assert result["valid"], result["message"]
+
+
+# --- A chunk altered on disk fails its checksum, and nothing is restored ---
+def test_restore_rejects_a_corrupted_chunk(snapshot):
+    db, directory, manifest = snapshot
+    path = os.path.join(directory, manifest["tables"]["blockchain"]["chunks"][2]["file"])
+    with open(path, "r+b") as handle:
+        handle.seek(20)
+        byte = handle.read(1)
+        handle.seek(20)
+        handle.write(bytes([byte[0] ^ 0xFF]))
+
+    empty_ledger(db)
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        restore_snapshot(db, directory)
+    assert db.scalar(select(ChainHeadModel.shard)) is None
+
+
+# --- A chunk rewritten with a matching checksum still fails the block hashes ---
+def test_restore_rejects_a_rewritten_chunk_with_a_valid_checksum(snapshot):
+    db, directory, manifest = snapshot
+    chunk = manifest["tables"]["blockchain"]["chunks"][1]
+    columns = manifest["tables"]["blockchain"]["columns"]
+    path = os.path.join(directory, chunk["file"])
+
+    with open(path, "rb") as handle:
+        rows = [json.loads(line) for line in gzip.decompress(handle.read()).splitlines()]
+    rows[3][columns.index("transaction_id")] = next_id()
+    payload = gzip.compress(("\n".join(json.dumps(row, separators=(",", ":")) for row in rows) + "\n").encode())
+    with open(path, "wb") as handle:
+        handle.write(payload)
+    chunk["sha256"] = sha256(payload).hexdigest()
+    with open(os.path.join(directory, "manifest.json"), "w") as handle:
+        json.dump(manifest, handle)
+
+    empty_ledger(db)
+    with pytest.raises(ValueError, match="hash does not match its contents"):
+        restore_snapshot(db, directory)
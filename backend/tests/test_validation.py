@@ -0,0 +1,40 @@
+# --- Tests for whole-ledger validation across shards ---
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models.block_model import BlockModel
+from backend.blockchain.chain_writer import append_blocks
+from backend.blockchain.validation import validate_ledger
+from backend.utils.id_generator import next_id
+
+
+@pytest.fixture
+def sharded_ledger(db):
+    start = datetime.now()
+    for shard in range(3):
+        append_blocks(db, [(next_id(), start + timedelta(milliseconds=i)) for i in range(20)], shard=shard)
+    return db
+
+
+# --- Threads and processes agree on an intact ledger ---
+@pytest.mark.parametrize("processes", [None, False])
+def test_sharded_ledger_is_valid(sharded_ledger, processes):
+    result = validate_ledger(sharded_ledger, processes=processes)
+    assert result["valid"], result["message"]
+    assert [shard["blocks"] for shard in result["shards"]] == [20, 20, 20]
+
+
+# --- The report names the shard and the block height, not a position in the scan ---
+@pytest.mark.parametrize("processes", [None, False])
+def test_tampering_is_reported_by_shard_and_height(sharded_ledger, processes):
+    sharded_ledger.query(BlockModel).filter(BlockModel.shard == 1, BlockModel.height == 7).update(
+        {"transaction_id": next_id()}
+    )
+    sharded_ledger.commit()
+
+    result = validate_ledger(sharded_ledger, processes=processes)
+    assert not result["valid"]
+    assert result["message"].startswith("Tampering detected in shard 1 at height 7 ")
+    assert [shard["valid"] for shard in result["shards"]] == [True, False, True]
+    assert result["shards"][1]["height"] == 7
@@ -0,0 +1,136 @@
+# --- Time-ordered 64-bit ID generator (snowflake layout) ---
+import fcntl
+import os
+import tempfile
+import threading
+import time
+
+# --- Bit layout: 41 bits of milliseconds | 10 bits of worker ID | 12 bits of sequence ---
+EPOCH_MS = 1704067200000            # 2024-01-01T00:00:00Z, custom epoch (~69 years of range)
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# --- Worker IDs reserved per host: WORKER_ID is the first, each process locks one of the range ---
+WORKER_ID_SLOTS = int(os.getenv("WORKER_ID_SLOTS", "32"))
+WORKER_ID_LOCK_DIR = os.getenv("WORKER_ID_LOCK_DIR", os.path.join(tempfile.gettempdir(), "upi-worker-ids"))
+
+
+# --- Lease a worker ID no other live process on this host holds ---
+def claim_worker_id() -> tuple[int, object]:
+    """
+    Locks the first free ID in [WORKER_ID, WORKER_ID + WORKER_ID_SLOTS)
+    with an exclusive flock on a per-ID lock file. The lock is released
+    when the process exits, so forked workers (gunicorn/uvicorn --workers)
+    and restarted workers never share an ID on one host. Hosts sharing a
+    database need disjoint ranges (e.g. WORKER_ID=0, 32, 64, ...).
+
+    Returns:
+        tuple: (worker ID, open lock file that must stay open while IDs are issued)
+
+    Raises:
+        ValueError: If the configured range does not fit in the worker bits
+        RuntimeError: If every ID in the range is held by a live process
+    """
+    base = int(os.getenv("WORKER_ID", "0"))
+    if base < 0 or WORKER_ID_SLOTS < 1 or base + WORKER_ID_SLOTS - 1 > MAX_WORKER_ID:
+        raise ValueError(f"WORKER_ID range {base}..{base + WORKER_ID_SLOTS - 1} must lie within 0-{MAX_WORKER_ID}")
+
+    os.makedirs(WORKER_ID_LOCK_DIR, exist_ok=True)
+    for worker_id in range(base, base + WORKER_ID_SLOTS):
+        handle = open(os.path.join(WORKER_ID_LOCK_DIR, f"worker-{worker_id}.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            continue
+        return worker_id, handle
+    raise RuntimeError(
+        f"All {WORKER_ID_SLOTS} worker IDs from {base} are in use on this host; "
+        f"raise WORKER_ID_SLOTS or run fewer processes"
+    )
+
+
+class IdGenerator:
+    """
+    Generates unique, monotonic, time-sortable IDs without touching the DB.
+
+    IDs are rendered as 16 hex characters, the same width as the old
+    truncated SHA-256 IDs, so string order equals creation order and new
+    rows land at the right-hand edge of primary-key indexes.
+    """
+
+    def __init__(self, worker_id=None):
+        """
+        Args:
+            worker_id (int): 0-1023; by default a host-unique ID is leased
+                with claim_worker_id() when the first ID is generated
+        """
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._lease = None          # Lock file holding the leased worker ID
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def lease(self) -> int:
+        """
+        Leases the worker ID now (if not yet done) and returns it.
+        """
+        with self._lock:
+            if self.worker_id is None:
+                self.worker_id, self._lease = claim_worker_id()
+            return self.worker_id
+
+    def next_int(self) -> int:
+        """
+        Returns the next ID as a 63-bit integer.
+        """
+        with self._lock:
+            if self.worker_id is None:
+                self.worker_id, self._lease = claim_worker_id()
+            # Never step backwards, even if the wall clock does
+            now_ms = max(int(time.time() * 1000) - EPOCH_MS, self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # Sequence exhausted for this millisecond: borrow the next one
+                    now_ms += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (now_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_id(self) -> str:
+        """
+        Returns the next ID as a 16-character, zero-padded hex string.
+        """
+        return f"{self.next_int():016x}"
+
+
+# --- Process-wide generator shared by all routes ---
+_generator = IdGenerator()
+
+
+# --- Forked workers (e.g. gunicorn --preload) lease their own worker ID ---
+def _reset_after_fork():
+    global _generator
+    if _generator._lease is not None:
+        _generator._lease.close()       # The parent still holds its lock; the child must not reuse its ID
+    _generator = IdGenerator()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# --- Lease this process's worker ID up front, so exhaustion fails at startup rather than on a payment ---
+def reserve_worker_id() -> int:
+    return _generator.lease()
+
+
+# --- Convenience wrapper used for UIDs, MIDs and transaction IDs ---
+def next_id() -> str:
+    return _generator.next_id()
@@ -1,7 +1,7 @@
 # --- QR code scanner using pyzbar and OpenCV ---
 from pyzbar.pyzbar import decode
 from PIL import Image
-from encryption.lwc_speck import decrypt_speck
+from ..encryption.lwc_speck import decrypt_speck
 
 # --- Function to decode QR image and decrypt the MID ---
 def scan_qr_and_decrypt(image: Image.Image) -> str:
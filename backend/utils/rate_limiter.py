@@ -0,0 +1,238 @@
+# --- Token-bucket admission control for hot endpoints ---
+import ipaddress
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+
+# --- Parse a "rate,burst" setting (tokens per second, bucket capacity) ---
+def parse_limit(value: str) -> tuple[float, float]:
+    rate, burst = (float(part) for part in value.split(","))
+    if rate <= 0 or burst < 1:
+        raise ValueError(f"Invalid rate limit {value!r}: rate must be > 0 and burst >= 1")
+    return rate, burst
+
+
+# --- Parse TRUSTED_PROXIES: comma-separated addresses or CIDR ranges of our own proxies ---
+def parse_networks(value: str) -> list:
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in value.split(",") if part.strip()]
+
+
+# --- Limiter settings (from environment; off unless explicitly enabled and sized for the deployment) ---
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "0") == "1"
+TRUSTED_PROXIES = parse_networks(os.getenv("TRUSTED_PROXIES", ""))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")     # memory | redis
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+PAYMENT_LIMITS = {
+    "mmid": parse_limit(os.getenv("RATE_LIMIT_MMID", "1,5")),
+    "merchant": parse_limit(os.getenv("RATE_LIMIT_MERCHANT", "500,1000")),
+    "client": parse_limit(os.getenv("RATE_LIMIT_CLIENT", "10,20")),
+    "terminal": parse_limit(os.getenv("RATE_LIMIT_TERMINAL", "5,10")),
+}
+SCAN_LIMITS = {
+    "client": parse_limit(os.getenv("RATE_LIMIT_SCAN_CLIENT", "10,20")),
+    "terminal": parse_limit(os.getenv("RATE_LIMIT_SCAN_TERMINAL", "5,10")),
+}
+
+
+# --- In-process bucket store ---
+class InMemoryBucketStore:
+    """
+    Keeps one (tokens, last_refill) tuple per key in a bounded LRU map, so
+    each check is O(1) and memory stays capped even when keys are spoofed.
+    An evicted key simply starts again with a full bucket.
+    """
+
+    def __init__(self, max_keys=100000):
+        """
+        Args:
+            max_keys (int): Buckets kept before the least recently used is dropped
+        """
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()       # key -> (tokens, last_refill)
+        self._lock = threading.Lock()
+
+    def acquire(self, buckets, cost=1.0):
+        """
+        Takes `cost` tokens from every bucket, or from none of them.
+
+        Args:
+            buckets (list): (key, rate, capacity) tuples
+            cost (float): Tokens required per bucket
+
+        Returns:
+            float: 0.0 if admitted, otherwise seconds until all buckets could admit
+        """
+        now = time.monotonic()
+        with self._lock:
+            refilled = []
+            wait = 0.0
+            for key, rate, capacity in buckets:
+                tokens, last = self._buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - last) * rate)
+                refilled.append((key, tokens))
+                if tokens < cost:
+                    wait = max(wait, (cost - tokens) / rate)
+
+            if wait:
+                return wait
+
+            for key, tokens in refilled:
+                self._buckets[key] = (tokens - cost, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+
+# --- Shared store for multi-worker deployments (Redis protocol) ---
+class RedisBucketStore:
+    """
+    Runs the same all-or-nothing bucket update atomically inside Redis with a
+    Lua script, using the Redis server clock so workers never disagree on time.
+    """
+
+    SCRIPT = """
+    local now_parts = redis.call('TIME')
+    local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+    local cost = tonumber(ARGV[1])
+    local wait = 0
+    local levels = {}
+    for i, key in ipairs(KEYS) do
+        local rate = tonumber(ARGV[i * 2])
+        local capacity = tonumber(ARGV[i * 2 + 1])
+        local state = redis.call('HMGET', key, 'tokens', 'ts')
+        local tokens = tonumber(state[1]) or capacity
+        local last = tonumber(state[2]) or now
+        tokens = math.min(capacity, tokens + (now - last) * rate)
+        levels[i] = tokens
+        if tokens < cost then
+            wait = math.max(wait, (cost - tokens) / rate)
+        end
+    end
+    if wait == 0 then
+        for i, key in ipairs(KEYS) do
+            local rate = tonumber(ARGV[i * 2])
+            local capacity = tonumber(ARGV[i * 2 + 1])
+            redis.call('HSET', key, 'tokens', levels[i] - cost, 'ts', now)
+            redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+        end
+    end
+    return tostring(wait)
+    """
+
+    def __init__(self, client, prefix="upi:rl:"):
+        """
+        Args:
+            client: Redis client exposing register_script()
+            prefix (str): Namespace prepended to every bucket key
+        """
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    def acquire(self, buckets, cost=1.0):
+        keys = [self.prefix + key for key, _, _ in buckets]
+        args = [cost]
+        for _, rate, capacity in buckets:
+            args.extend([rate, capacity])
+        return float(self._script(keys=keys, args=args))
+
+
+# --- Limiter applying one limit per key kind ---
+class TokenBucketLimiter:
+    """
+    Admits a request only if every bucket it maps to (e.g. MMID, merchant,
+    client) has a token left; otherwise responds 429 with Retry-After.
+    """
+
+    def __init__(self, scope, limits, store, enabled=True):
+        """
+        Args:
+            scope (str): Prefix separating this limiter's buckets from others
+            limits (dict): Key kind -> (tokens per second, burst capacity)
+            store: InMemoryBucketStore, RedisBucketStore or compatible object
+            enabled (bool): When False every request is admitted
+        """
+        self.scope = scope
+        self.limits = limits
+        self.store = store
+        self.enabled = enabled
+
+    def enforce(self, identities):
+        """
+        Raises HTTP 429 if any bucket for the given identities is empty.
+
+        Args:
+            identities (dict): Key kind -> identifier; None values are skipped
+        """
+        if not self.enabled:
+            return
+        buckets = [
+            (f"{self.scope}:{kind}:{identifier}", *self.limits[kind])
+            for kind, identifier in identities.items()
+            if identifier is not None
+        ]
+        wait = self.store.acquire(buckets)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))}
+            )
+
+
+# --- Whether an address belongs to one of TRUSTED_PROXIES ---
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+# --- Resolve the real client address behind our own reverse proxies ---
+def client_address(request: Request) -> str | None:
+    """
+    Returns the TCP peer, unless it is one of TRUSTED_PROXIES. In that
+    case X-Forwarded-For is walked from the right, and the first hop that
+    is not a trusted proxy is returned. Without TRUSTED_PROXIES the header
+    is ignored, since any client could forge it.
+    """
+    peer = request.client.host if request.client else None
+    if peer is None or not TRUSTED_PROXIES or not _is_trusted_proxy(peer):
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+# --- Identify the caller: client address and optional terminal header ---
+def client_identities(request: Request) -> dict:
+    return {
+        "client": client_address(request),
+        "terminal": request.headers.get("x-terminal-id"),
+    }
+
+
+# --- Build the configured bucket store ---
+def build_store(name=RATE_LIMIT_BACKEND):
+    if name == "memory":
+        return InMemoryBucketStore(max_keys=RATE_LIMIT_MAX_KEYS)
+    if name == "redis":
+        import redis  # Optional dependency, only needed for the shared store
+        return RedisBucketStore(redis.Redis.from_url(REDIS_URL))
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+
+# --- Shared limiters used by the routes ---
+_store = build_store()
+payment_limiter = TokenBucketLimiter("pay", PAYMENT_LIMITS, _store, enabled=RATE_LIMIT_ENABLED)
+scan_limiter = TokenBucketLimiter("scan", SCAN_LIMITS, _store, enabled=RATE_LIMIT_ENABLED)